@@ -5,6 +5,10 @@ from .tasks import router as tasks_router
 from .teams import router as teams_router
 from .users import router as users_router
 from .activities import router as activities_router
+from .documents import router as documents_router
+from .search import router as search_router
+from .admin import router as admin_router
+from .bootstrap import router as bootstrap_router
 
 router = APIRouter()
 
@@ -13,4 +17,8 @@ router.include_router(users_router)
 router.include_router(projects_router)
 router.include_router(tasks_router)
 router.include_router(teams_router)
-router.include_router(activities_router)
\ No newline at end of file
+router.include_router(activities_router)
+router.include_router(documents_router)
+router.include_router(search_router)
+router.include_router(admin_router)
+router.include_router(bootstrap_router)
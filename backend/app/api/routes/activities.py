@@ -2,10 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 from ...models.activity import ActivityResponse
 from ...services.activity_service import ActivityService
-from ...dependencies import get_current_user
-from ...database import get_supabase_client
-from supabase import Client
-from gotrue import User
+from ...dependencies import User, get_current_user, get_profile_loader
+from ...services.profile_loader import ProfileLoader
+from ...database import Client, get_supabase_client
+from ...core.instrumentation import query_budget
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,17 +13,19 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/activities", tags=["Activities"])
 
 @router.get("/recent", response_model=List[ActivityResponse])
+@query_budget(2)
 async def get_recent_activities(
     limit: int = 10,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: Client = Depends(get_supabase_client),
+    profiles: ProfileLoader = Depends(get_profile_loader)
 ):
     """Get recent activities for the current user"""
     try:
         if limit > 50:
             limit = 50  # Cap the limit to prevent excessive queries
             
-        service = ActivityService(supabase)
+        service = ActivityService(supabase, profiles)
         activities = await service.get_recent_activities(
             user_id=current_user.id,
             limit=limit
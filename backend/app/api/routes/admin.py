@@ -0,0 +1,78 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+from typing import Any, Iterable, Iterator, Optional, Tuple
+from ...config import get_settings
+from ...dependencies import User, get_current_admin
+from ...core.instrumentation import query_budget
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+def _api_routes(routes: Iterable[Any], prefix: str = "") -> Iterator[Tuple[str, APIRoute]]:
+    """(full path, route) for every APIRoute, descending into included routers"""
+    for candidate in routes:
+        included = getattr(candidate, "original_router", None)
+        if included is not None:
+            # Newer FastAPI keeps included routers as nodes instead of copying their routes
+            yield from _api_routes(included.routes, prefix + candidate.include_context.prefix)
+        elif isinstance(candidate, APIRoute):
+            yield prefix + candidate.path, candidate
+
+@router.post("/profile", response_class=PlainTextResponse)
+@query_budget(0)
+async def profile_worker(
+    request: Request,
+    seconds: float = 10.0,
+    interval_ms: Optional[float] = Query(None, ge=1),
+    route: Optional[str] = None,
+    method: str = "GET",
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Sample this worker's stacks for `seconds` and return a collapsed-stack file
+    (feed it to flamegraph.pl or speedscope). With `route` (the full path
+    template, e.g. /api/v1/tasks/), only samples doing work for that route's
+    requests are kept, including work it handed to worker threads.
+    """
+    if seconds <= 0 or seconds > settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be between 0 and {settings.PROFILE_MAX_SECONDS}"
+        )
+
+    scope_route = None
+    if route:
+        for path, candidate in _api_routes(request.app.routes):
+            if path == route and method.upper() in candidate.methods:
+                scope_route = candidate
+                break
+        if scope_route is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No route {method.upper()} {route}"
+            )
+
+    # Imported here so cold starts don't pay for a route that is rarely called
+    from ...core.profiler import run_profile
+
+    interval = (interval_ms or settings.PROFILE_INTERVAL_MS) / 1000
+    logger.info("Profile requested by %s for %s", current_user.id, route or "all routes")
+
+    # Sample from a worker thread so this event loop keeps serving the traffic being profiled
+    output = await asyncio.to_thread(run_profile, seconds, interval, scope_route)
+    if output is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running"
+        )
+
+    return PlainTextResponse(
+        output,
+        headers={"Content-Disposition": f'attachment; filename="profile-{int(seconds)}s.collapsed"'}
+    )
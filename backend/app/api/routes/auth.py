@@ -2,18 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status, Form
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Any, Dict
 from ...models.user import UserCreate, UserResponse
-from ...database import get_supabase_client
-from supabase.client import Client
+from ...database import Client, get_auth_client
+from ...services.profile_loader import invalidate_profile
+from ...services.user_search import user_search_cache
+from ...core.instrumentation import query_budget
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=Dict[str, Any])
-async def register_user(user_data: UserCreate, supabase: Client = Depends(get_supabase_client)):
+@query_budget(1)
+async def register_user(user_data: UserCreate, supabase: Client = Depends(get_auth_client)):
     try:
         # Register user in Supabase Auth
         auth_response = supabase.auth.sign_up({
@@ -33,6 +34,8 @@ async def register_user(user_data: UserCreate, supabase: Client = Depends(get_su
             }
             
             supabase.table("profiles").insert(profile_data).execute()
+            invalidate_profile(auth_response.user.id)
+            user_search_cache.clear()
             
             return {
                 "message": "User registered successfully",
@@ -45,24 +48,25 @@ async def register_user(user_data: UserCreate, supabase: Client = Depends(get_su
             )
             
     except Exception as e:
-        logger.error(f"Registration error: {str(e)}")
+        logger.error("Registration error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Registration failed: {str(e)}"
         )
 
 @router.post("/login")
+@query_budget(0)
 async def login(
     email: str = Form(...),
     password: str = Form(...),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: Client = Depends(get_auth_client)
 ):
     """
     Login endpoint that accepts form data directly.
     This is a simpler version that's easier to test.
     """
     try:
-        logger.debug(f"Attempting login for email: {email}")
+        logger.debug("Attempting login for email: %s", email)
         
         # Try to sign in
         auth_response = supabase.auth.sign_in_with_password({
@@ -78,7 +82,7 @@ async def login(
             "user_id": auth_response.user.id
         }
     except Exception as e:
-        logger.error(f"Login error: {str(e)}")
+        logger.error("Login error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
@@ -87,9 +91,10 @@ async def login(
 
 # Keep the token endpoint for OAuth compatibility
 @router.post("/token")
+@query_budget(0)
 async def token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: Client = Depends(get_auth_client)
 ):
     """
     OAuth2 compatible token login, get an access token for future requests
@@ -97,7 +102,8 @@ async def token(
     return await login(email=form_data.username, password=form_data.password, supabase=supabase)
 
 @router.post("/logout")
-async def logout(supabase: Client = Depends(get_supabase_client)):
+@query_budget(0)
+async def logout(supabase: Client = Depends(get_auth_client)):
     try:
         supabase.auth.sign_out()
         return {"message": "Successfully logged out"}
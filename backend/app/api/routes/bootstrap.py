@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import datetime, timezone
+from typing import List
+from ...models.dashboard import BootstrapResponse
+from ...models.project import ProjectStatus
+from ...models.task import TaskStatus
+from ...dependencies import User, get_current_user, get_profile_loader
+from ...database import Client, get_supabase_client
+from ...services.access import get_user_team_ids, select_active_tasks, task_access_filter
+from ...services.activity_service import ActivityService
+from ...services.profile_loader import ProfileLoader
+from ...core.responses import validated_response
+from ...core.instrumentation import query_budget
+from pydantic import TypeAdapter
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/bootstrap", tags=["Bootstrap"])
+
+bootstrap_adapter = TypeAdapter(BootstrapResponse)
+
+TASK_SUMMARY_COLUMNS = "id, title, status, priority, project_id, assignee_id, due_date, updated_at"
+
+@router.get("/", response_model=BootstrapResponse)
+@query_budget(8)
+async def get_bootstrap(
+    activity_limit: int = Query(10, ge=1, le=50),
+    task_limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client),
+    profiles: ProfileLoader = Depends(get_profile_loader)
+):
+    """Everything the dashboard renders on first load, with its stats, in one response"""
+    try:
+        # Resolve the access scope once for every section
+        team_ids = get_user_team_ids(supabase, current_user.id)
+
+        def load_projects():
+            # Owned and team projects in one query, same rows as GET /projects/
+            query_str = f"owner_id.eq.{current_user.id}"
+            if team_ids:
+                query_str += f",team_id.in.({','.join(team_ids)})"
+            response = supabase.table("projects").select("*").or_(query_str).is_("deleted_at", "null").execute()
+            return response.data or []
+
+        def load_teams():
+            if not team_ids:
+                return []
+            return supabase.table("teams").select("*").in_("id", team_ids).execute().data or []
+
+        def accessible_tasks(project_ids: List[str], columns: str = "id", head: bool = False):
+            # Same access rules as GET /tasks/
+            return select_active_tasks(supabase, columns, count="exact", head=head).or_(task_access_filter(current_user.id, project_ids))
+
+        def load_recent_tasks(project_ids: List[str]):
+            # The most recently updated summaries; the count covers every accessible task
+            response = accessible_tasks(project_ids, TASK_SUMMARY_COLUMNS).order("updated_at", desc=True).limit(task_limit).execute()
+            return response.data or [], response.count or 0
+
+        def count_completed(project_ids: List[str]) -> int:
+            return accessible_tasks(project_ids, head=True).eq("status", TaskStatus.DONE.value).execute().count or 0
+
+        def count_overdue(project_ids: List[str]) -> int:
+            now = datetime.now(timezone.utc).isoformat()
+            query = accessible_tasks(project_ids, head=True).neq("status", TaskStatus.DONE.value).lt("due_date", now)
+            return query.execute().count or 0
+
+        projects_future = asyncio.ensure_future(asyncio.to_thread(load_projects))
+
+        async def tasks_after_projects():
+            # Tasks need the project ids; everything else runs alongside
+            project_ids = [p["id"] for p in await projects_future]
+            return await asyncio.gather(
+                asyncio.to_thread(load_recent_tasks, project_ids),
+                asyncio.to_thread(count_completed, project_ids),
+                asyncio.to_thread(count_overdue, project_ids)
+            )
+
+        projects, task_results, teams, activities = await asyncio.gather(
+            projects_future,
+            tasks_after_projects(),
+            asyncio.to_thread(load_teams),
+            ActivityService(supabase, profiles).get_recent_activities(user_id=current_user.id, limit=activity_limit)
+        )
+        (tasks, total_tasks), completed_tasks, overdue_tasks = task_results
+
+        return validated_response(bootstrap_adapter, {
+            "projects": projects,
+            "tasks": tasks,
+            "teams": teams,
+            "activities": activities,
+            "stats": {
+                "total_projects": len(projects),
+                "active_projects": sum(1 for p in projects if p["status"] == ProjectStatus.IN_PROGRESS.value),
+                "total_tasks": total_tasks,
+                "completed_tasks": completed_tasks,
+                "overdue_tasks": overdue_tasks
+            }
+        })
+
+    except Exception as e:
+        logger.error("Error loading bootstrap data: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load dashboard: {str(e)}"
+        )
@@ -0,0 +1,310 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Optional, Tuple
+from ...models.document import DocumentChunkUpdate, DocumentCommentThreadPage, DocumentManifest
+from ...dependencies import User, get_current_user
+from ...database import Client, get_supabase_client
+from ...services.access import get_project_row, is_team_member
+from ...services.comment_service import CommentService
+from ...services.document_storage import DocumentStorage
+from ...core.instrumentation import query_budget
+from ...core.presence import presence_manager
+from ...core.websocket import manager
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/documents", tags=["Documents"])
+
+def _get_accessible_document(
+    document_id: str,
+    user_id: str,
+    supabase: Client,
+    require_edit: bool = False
+) -> Dict[str, Any]:
+    """Fetch a document and check the user owns it, was shared it, or belongs to its team"""
+    document = supabase.table("documents").select(
+        "id, owner_id, project_id, team_id"
+    ).eq("id", document_id).execute()
+
+    if not document.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+
+    document_data = document.data[0]
+    if document_data["owner_id"] == user_id:
+        return document_data
+
+    share = supabase.table("document_shares").select("permission").eq("document_id", document_id).eq("user_id", user_id).execute()
+    if share.data and (not require_edit or share.data[0]["permission"] == "edit"):
+        return document_data
+
+    team_id = document_data.get("team_id")
+    if not team_id and document_data.get("project_id"):
+        project = get_project_row(supabase, document_data["project_id"])
+        if project:
+            if project["owner_id"] == user_id:
+                return document_data
+            team_id = project["team_id"]
+
+    if team_id and is_team_member(supabase, team_id, user_id):
+        return document_data
+
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not authorized to access this document"
+    )
+
+@router.get("/{document_id}/comments", response_model=DocumentCommentThreadPage)
+@query_budget(5)
+async def get_document_comments(
+    document_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    include_resolved: bool = False,
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Get a page of top-level comment threads with all their replies"""
+    try:
+        _get_accessible_document(document_id, current_user.id, supabase)
+
+        service = CommentService(supabase)
+        threads, total = await service.get_comment_threads(
+            document_id=document_id,
+            limit=limit,
+            offset=offset,
+            include_resolved=include_resolved
+        )
+
+        return DocumentCommentThreadPage(
+            threads=threads,
+            total=total,
+            limit=limit,
+            offset=offset
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching document comments: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch document comments: {str(e)}"
+        )
+
+def _parse_range(range_header: str, total: int) -> Optional[Tuple[int, int]]:
+    """Parse a single `bytes=start-end` range into inclusive offsets, or None if unsatisfiable"""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+
+    start_str, _, end_str = spec.strip().partition("-")
+    try:
+        if not start_str:
+            # Suffix range: the last N bytes
+            length = int(end_str)
+            if length <= 0:
+                return None
+            return max(total - length, 0), total - 1
+        start = int(start_str)
+        end = int(end_str) if end_str else total - 1
+    except ValueError:
+        return None
+
+    if start >= total or start > end:
+        return None
+
+    return start, min(end, total - 1)
+
+@router.get("/{document_id}/manifest", response_model=DocumentManifest)
+@query_budget(8)
+async def get_document_manifest(
+    document_id: str,
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Get the chunk layout of a document so clients can fetch only what they render"""
+    try:
+        _get_accessible_document(document_id, current_user.id, supabase)
+
+        return DocumentStorage(supabase).get_manifest(document_id)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching document manifest: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch document manifest: {str(e)}"
+        )
+
+@router.get("/{document_id}/content")
+@query_budget(8)
+async def get_document_content(
+    document_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Stream a document body, honouring a single HTTP byte Range"""
+    try:
+        _get_accessible_document(document_id, current_user.id, supabase)
+
+        storage = DocumentStorage(supabase)
+        manifest = storage.get_manifest(document_id)
+        total = manifest.total_bytes
+
+        headers = {"Accept-Ranges": "bytes"}
+        range_header = request.headers.get("range")
+
+        if range_header and total > 0:
+            byte_range = _parse_range(range_header, total)
+            if byte_range is None:
+                return Response(
+                    status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={"Content-Range": f"bytes */{total}"}
+                )
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                storage.iter_range(manifest, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type="text/plain; charset=utf-8",
+                headers=headers
+            )
+
+        headers["Content-Length"] = str(total)
+        return StreamingResponse(
+            storage.iter_range(manifest, 0, total - 1),
+            media_type="text/plain; charset=utf-8",
+            headers=headers
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming document content: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch document content: {str(e)}"
+        )
+
+@router.get("/{document_id}/chunks/{chunk_index}")
+@query_budget(5)
+async def get_document_chunk(
+    document_id: str,
+    chunk_index: int,
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Get a single chunk of a document by index"""
+    try:
+        _get_accessible_document(document_id, current_user.id, supabase)
+
+        content = DocumentStorage(supabase).get_chunk(document_id, chunk_index)
+        if content is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chunk not found"
+            )
+
+        return Response(content=content, media_type="text/plain; charset=utf-8")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching document chunk: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch document chunk: {str(e)}"
+        )
+
+@router.put("/{document_id}/chunks/{chunk_index}", response_model=DocumentManifest)
+@query_budget(11)
+async def update_document_chunk(
+    document_id: str,
+    chunk_index: int,
+    chunk_data: DocumentChunkUpdate,
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Rewrite one chunk of a document, or append a new chunk at the end"""
+    try:
+        _get_accessible_document(document_id, current_user.id, supabase, require_edit=True)
+
+        storage = DocumentStorage(supabase)
+        manifest = storage.get_manifest(document_id, convert_legacy=True)
+
+        if chunk_index < 0 or chunk_index > len(manifest.chunks):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Chunk index out of range"
+            )
+
+        storage.write_chunk(document_id, chunk_index, chunk_data.content)
+        supabase.table("documents").update({
+            "last_modified_by": current_user.id
+        }).eq("id", document_id).execute()
+
+        return storage.get_manifest(document_id)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating document chunk: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update document chunk: {str(e)}"
+        )
+
+@router.websocket("/{document_id}/ws")
+async def document_room(
+    websocket: WebSocket,
+    document_id: str,
+    token: str,
+    supabase: Client = Depends(get_supabase_client)
+):
+    """
+    Live room for a document. Clients send
+    {"type": "presence", "cursor_position": ..., "selection_range": ...}
+    and receive the room's presence on join, then rate-limited deltas.
+    """
+    # Browsers cannot set headers on a WebSocket, so the token comes as a query parameter
+    try:
+        response = await asyncio.to_thread(supabase.auth.get_user, token)
+        user_id = response.user.id
+        await asyncio.to_thread(_get_accessible_document, document_id, user_id, supabase)
+    except HTTPException as e:
+        await websocket.close(code=4403 if e.status_code == status.HTTP_403_FORBIDDEN else 4404)
+        return
+    except Exception:
+        await websocket.close(code=4401)
+        return
+
+    await manager.connect(websocket, document_id, user_id)
+    try:
+        await websocket.send_json({
+            "type": "presence_state",
+            "users": presence_manager.get_room_state(document_id)
+        })
+        while True:
+            message = await websocket.receive_json()
+            if message.get("type") == "presence":
+                await presence_manager.update(
+                    document_id,
+                    user_id,
+                    cursor_position=message.get("cursor_position"),
+                    selection_range=message.get("selection_range")
+                )
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("Document room %s closed for user %s: %s", document_id, user_id, e)
+    finally:
+        manager.disconnect(websocket, document_id, user_id)
+        await presence_manager.leave(document_id, user_id)
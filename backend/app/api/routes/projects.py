@@ -1,20 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from ...models.project import ProjectCreate, ProjectResponse, ProjectUpdate, PublicProjectResponse
-from ...dependencies import get_current_user, get_current_user_optional
-from ...database import get_supabase_client
+from ...models.project import ExportFormat, ProjectCreate, ProjectResponse, ProjectUpdate, PublicProjectResponse
+from ...dependencies import get_current_user
+from ...core.logging import payload
+from ...config import get_settings
+from ...core.responses import conditional_response, validated_response
+from ...database import Client, get_supabase_client
 from ...services.activity_service import log_project_created
-from supabase.client import Client
+from ...services.access import get_project_row, invalidate_project, is_team_member, user_can_access_project
+from ...services.cache import task_cache
+from ...services.public_snapshots import PUBLIC_VISIBILITIES, PublicSnapshot, public_snapshots
+from ...services.purge import project_purger
+from ...services.export import csv_lines, iter_project_tasks, ndjson_lines
+from ...core.instrumentation import query_budget
+from pydantic import TypeAdapter
 import logging
 import uuid
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+project_list_adapter = TypeAdapter(List[ProjectResponse])
+
 @router.post("/", response_model=ProjectResponse)
+@query_budget(1)
 async def create_project(
     project_data: ProjectCreate, 
     current_user: dict = Depends(get_current_user),
@@ -33,11 +46,10 @@ async def create_project(
         
         if len(response.data) > 0:
             # Log activity
-            await log_project_created(
+            log_project_created(
                 user_id=current_user.id,
                 project_id=response.data[0]["id"],
-                project_name=response.data[0]["name"],
-                supabase=supabase
+                project_name=response.data[0]["name"]
             )
             return response.data[0]
         else:
@@ -52,28 +64,29 @@ async def create_project(
         )
 
 @router.get("/", response_model=List[ProjectResponse])
+@query_budget(3)
 async def get_projects(
     current_user: dict = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        logger.debug(f"Fetching projects for user: {current_user.id}")
+        logger.debug("Fetching projects for user: %s", current_user.id)
         
         # Get all projects where user is owner
-        owned_projects = supabase.table("projects").select("*").eq("owner_id", current_user.id).execute()
-        logger.debug(f"Owned projects: {owned_projects.data}")
+        owned_projects = supabase.table("projects").select("*").eq("owner_id", current_user.id).is_("deleted_at", "null").execute()
+        logger.debug("Owned projects: %s", payload(owned_projects.data))
         
         # Get all team memberships
         team_memberships = supabase.table("team_members").select("team_id").eq("user_id", current_user.id).execute()
-        logger.debug(f"Team memberships: {team_memberships.data}")
+        logger.debug("Team memberships: %s", payload(team_memberships.data))
         
         # Get all projects where user is a team member
         team_projects = []
         if team_memberships.data:
             team_ids = [tm["team_id"] for tm in team_memberships.data]
-            team_projects_response = supabase.table("projects").select("*").in_("team_id", team_ids).execute()
+            team_projects_response = supabase.table("projects").select("*").in_("team_id", team_ids).is_("deleted_at", "null").execute()
             team_projects = team_projects_response.data or []
-            logger.debug(f"Team projects: {team_projects}")
+            logger.debug("Team projects: %s", payload(team_projects))
         
         # Combine and deduplicate projects
         all_projects = owned_projects.data or []
@@ -81,37 +94,37 @@ async def get_projects(
             if project["owner_id"] != current_user.id:
                 all_projects.append(project)
         
-        logger.debug(f"All projects: {all_projects}")
-        return all_projects
+        logger.debug("All projects: %s", payload(all_projects))
+        return validated_response(project_list_adapter, all_projects)
         
     except Exception as e:
-        logger.error(f"Error fetching projects: {str(e)}")
+        logger.error("Error fetching projects: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch projects: {str(e)}"
         )
 
 @router.get("/{project_id}", response_model=ProjectResponse)
+@query_budget(2)
 async def get_project(
     project_id: str,
     current_user: dict = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        project = supabase.table("projects").select("*").eq("id", project_id).execute()
+        project = get_project_row(supabase, project_id)
         
-        if not project.data:
+        if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
             
         # Check if user is owner or team member
-        if project.data[0]["owner_id"] != current_user.id:
+        if project["owner_id"] != current_user.id:
             # Check if user is in the project's team
-            if project.data[0]["team_id"]:
-                team_member = supabase.table("team_members").select("*").eq("team_id", project.data[0]["team_id"]).eq("user_id", current_user.id).execute()
-                if not team_member.data:
+            if project["team_id"]:
+                if not is_team_member(supabase, project["team_id"], current_user.id):
                     raise HTTPException(
                         status_code=status.HTTP_403_FORBIDDEN,
                         detail="Not authorized to access this project"
@@ -122,7 +135,7 @@ async def get_project(
                     detail="Not authorized to access this project"
                 )
                 
-        return project.data[0]
+        return project
     except HTTPException:
         raise
     except Exception as e:
@@ -132,6 +145,7 @@ async def get_project(
         )
 
 @router.put("/{project_id}", response_model=ProjectResponse)
+@query_budget(2)
 async def update_project(
     project_id: str,
     project_data: ProjectUpdate,
@@ -139,25 +153,32 @@ async def update_project(
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        # Check if project exists and user is owner
-        project = supabase.table("projects").select("*").eq("id", project_id).execute()
+        # Update only if the user is the owner, in one round trip
+        update_data = {k: v for k, v in project_data.model_dump().items() if v is not None}
         
-        if not project.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-            
-        if project.data[0]["owner_id"] != current_user.id:
+        response = supabase.table("projects").update(update_data).eq("id", project_id).eq("owner_id", current_user.id).is_("deleted_at", "null").execute()
+        invalidate_project(project_id)
+        
+        if not response.data:
+            # Nothing matched: only now tell a missing project from someone else's
+            if not get_project_row(supabase, project_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to update this project"
             )
-            
-        # Update project
-        update_data = {k: v for k, v in project_data.model_dump().items() if v is not None}
         
-        response = supabase.table("projects").update(update_data).eq("id", project_id).execute()
+        public_id = response.data[0].get("public_id")
+        if public_id:
+            if response.data[0].get("visibility") in PUBLIC_VISIBILITIES:
+                public_snapshots.forget(public_id)
+                public_snapshots.schedule_rebuild(supabase, project_id)
+            else:
+                # Unshared: stop serving the snapshot before responding, not after the rebuild
+                public_snapshots.remove(public_id)
         
         return response.data[0]
     except HTTPException:
@@ -169,32 +190,39 @@ async def update_project(
         )
 
 @router.delete("/{project_id}")
+@query_budget(1)
 async def delete_project(
     project_id: str,
     current_user: dict = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        # Check if project exists and user is owner
-        project = supabase.table("projects").select("*").eq("id", project_id).execute()
+        # Ownership check and delete in one transaction; large projects are soft-deleted (migration 006)
+        result = supabase.rpc("delete_project_checked", {
+            "p_project_id": project_id,
+            "p_user_id": current_user.id,
+            "p_soft_delete_threshold": settings.PROJECT_SOFT_DELETE_THRESHOLD
+        }).execute().data
         
-        if not project.data:
+        if result["outcome"] == "not_found":
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
             
-        if project.data[0]["owner_id"] != current_user.id:
+        if result["outcome"] == "forbidden":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to delete this project"
             )
-            
-        # Delete project tasks first
-        supabase.table("tasks").delete().eq("project_id", project_id).execute()
         
-        # Delete project
-        supabase.table("projects").delete().eq("id", project_id).execute()
+        task_cache.invalidate(*result["task_ids"])
+        invalidate_project(project_id)
+        if result["soft"]:
+            # Too many tasks to delete in one statement; they are removed in batches
+            project_purger.ensure_running(supabase)
+        if result.get("public_id"):
+            public_snapshots.remove(result["public_id"])
         
         return {"message": "Project and all associated tasks deleted successfully"}
     except HTTPException:
@@ -205,8 +233,53 @@ async def delete_project(
             detail=f"Failed to delete project: {str(e)}"
         )
 
+@router.get("/{project_id}/export")
+@query_budget(2)
+async def export_project_tasks(
+    project_id: str,
+    format: ExportFormat = ExportFormat.NDJSON,
+    current_user: dict = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Stream every task of a project as NDJSON or CSV with flat memory use"""
+    try:
+        project = get_project_row(supabase, project_id)
+        
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+            
+        if not user_can_access_project(supabase, project, current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this project"
+            )
+        
+        # Sync generator: Starlette iterates it in a worker thread, one keyset page at a time
+        pages = iter_project_tasks(supabase, project_id)
+        if format == ExportFormat.CSV:
+            body, media_type = csv_lines(pages), "text/csv; charset=utf-8"
+        else:
+            body, media_type = ndjson_lines(pages), "application/x-ndjson"
+        
+        return StreamingResponse(
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="project-{project_id}-tasks.{format.value}"'}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export project tasks: {str(e)}"
+        )
+
 # Public/Guest Routes
 @router.post("/{project_id}/share")
+@query_budget(2)
 async def share_project(
     project_id: str,
     current_user: dict = Depends(get_current_user),
@@ -215,28 +288,33 @@ async def share_project(
     """Generate a shareable public link for a project"""
     try:
         # Check if project exists and user is owner
-        project = supabase.table("projects").select("*").eq("id", project_id).execute()
+        project = get_project_row(supabase, project_id)
         
-        if not project.data:
+        if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
             
-        if project.data[0]["owner_id"] != current_user.id:
+        if project["owner_id"] != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only project owner can share projects"
             )
         
         # Generate public ID if not exists
-        public_id = project.data[0].get("public_id")
+        public_id = project.get("public_id")
         if not public_id:
             public_id = str(uuid.uuid4())
             supabase.table("projects").update({
                 "public_id": public_id,
                 "visibility": "link_only"
             }).eq("id", project_id).execute()
+            invalidate_project(project_id)
+        
+        # Materialized off the request path; views arriving first build it on demand
+        public_snapshots.forget(public_id)
+        public_snapshots.schedule_rebuild(supabase, project_id)
         
         return {
             "public_id": public_id,
@@ -252,41 +330,35 @@ async def share_project(
             detail=f"Failed to share project: {str(e)}"
         )
 
+async def _get_public_snapshot(supabase: Client, public_id: str) -> PublicSnapshot:
+    snapshot, outcome = await public_snapshots.lookup(supabase, public_id)
+    
+    if outcome == "forbidden":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Project is not publicly accessible"
+        )
+    
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found or not publicly accessible"
+        )
+    
+    return snapshot
+
 @router.get("/public/{public_id}", response_model=PublicProjectResponse)
+@query_budget(2)
 async def get_public_project(
     public_id: str,
-    current_user: dict = Depends(get_current_user_optional),
+    request: Request,
     supabase: Client = Depends(get_supabase_client)
 ):
     """Get public project by shareable ID - no authentication required"""
     try:
-        # Find project by public_id
-        project = supabase.table("projects").select("*").eq("public_id", public_id).execute()
-        
-        if not project.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found or not publicly accessible"
-            )
+        snapshot = await _get_public_snapshot(supabase, public_id)
         
-        project_data = project.data[0]
-        
-        # Check if project is actually public/shareable
-        if project_data.get("visibility") not in ["public", "link_only"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Project is not publicly accessible"
-            )
-        
-        # Return limited project info for public viewing
-        return PublicProjectResponse(
-            id=project_data["id"],
-            name=project_data["name"],
-            description=project_data["description"],
-            status=project_data["status"],
-            created_at=project_data["created_at"],
-            updated_at=project_data["updated_at"]
-        )
+        return conditional_response(request, snapshot.project_body, snapshot.project_etag, settings.PUBLIC_SNAPSHOT_MAX_AGE_SECONDS)
         
     except HTTPException:
         raise
@@ -297,37 +369,17 @@ async def get_public_project(
         )
 
 @router.get("/public/{public_id}/tasks")
+@query_budget(2)
 async def get_public_project_tasks(
     public_id: str,
-    current_user: dict = Depends(get_current_user_optional),
+    request: Request,
     supabase: Client = Depends(get_supabase_client)
 ):
     """Get public project tasks - no authentication required"""
     try:
-        # Find project by public_id
-        project = supabase.table("projects").select("*").eq("public_id", public_id).execute()
+        snapshot = await _get_public_snapshot(supabase, public_id)
         
-        if not project.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found or not publicly accessible"
-            )
-        
-        project_data = project.data[0]
-        
-        # Check if project is actually public/shareable
-        if project_data.get("visibility") not in ["public", "link_only"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Project is not publicly accessible"
-            )
-        
-        # Get tasks for this project (limited info for public viewing)
-        tasks = supabase.table("tasks").select(
-            "id, title, description, status, priority, due_date, created_at"
-        ).eq("project_id", project_data["id"]).execute()
-        
-        return tasks.data or []
+        return conditional_response(request, snapshot.tasks_body, snapshot.tasks_etag, settings.PUBLIC_SNAPSHOT_MAX_AGE_SECONDS)
         
     except HTTPException:
         raise
@@ -335,4 +387,4 @@ async def get_public_project_tasks(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch public project tasks: {str(e)}"
-        )
\ No newline at end of file
+        )
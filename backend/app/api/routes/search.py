@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from ...models.search import SearchResponse, SearchResult, SearchResultType
+from ...dependencies import User, get_current_user
+from ...database import Client, get_supabase_client
+from ...services.access import get_accessible_project_ids, get_user_team_ids
+from ...core.instrumentation import query_budget
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+@router.get("/", response_model=SearchResponse)
+@query_budget(4)
+async def search(
+    q: str,
+    types: Optional[List[SearchResultType]] = Query(None),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Full-text search over the tasks, projects and documents the user can access"""
+    try:
+        if not q or len(q.strip()) < 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search query must be at least 2 characters long"
+            )
+
+        # Same access rules as GET /tasks/
+        team_ids = get_user_team_ids(supabase, current_user.id)
+        project_ids = get_accessible_project_ids(supabase, current_user.id, team_ids=team_ids)
+
+        response = supabase.rpc("search_workspace", {
+            "p_query": q.strip(),
+            "p_user_id": current_user.id,
+            "p_project_ids": project_ids,
+            "p_team_ids": team_ids,
+            "p_types": [t.value for t in (types or list(SearchResultType))],
+            "p_limit": limit,
+            "p_offset": offset,
+        }).execute()
+
+        rows = response.data or []
+        return SearchResponse(
+            results=[SearchResult(**row) for row in rows],
+            total=rows[0]["total_count"] if rows else 0,
+            limit=limit,
+            offset=offset
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching for '{q}': {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search"
+        )
@@ -1,49 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
 from typing import List, Optional
-from ...models.task import TaskCreate, TaskResponse, TaskUpdate, TaskStatus
-from ...dependencies import get_current_user
-from ...database import get_supabase_client
+from ...models.task import TaskCreate, TaskImportJob, TaskResponse, TaskUpdate, TaskStatus
+from ...dependencies import User, get_current_user, get_profile_loader
+from ...core.logging import payload
+from ...core.responses import validated_response
+from ...database import Client, get_supabase_client
 from ...services.activity_service import log_task_created, log_task_completed
-from supabase.client import Client
-from gotrue import User
+from ...services.access import get_accessible_project_ids, get_project_row, get_task_row, is_team_member, select_active_tasks, task_access_filter, user_can_access_project
+from ...services.cache import task_cache
+from ...services.profile_loader import ProfileLoader
+from ...services.public_snapshots import public_snapshots
+from ...services.singleflight import task_list_flight
+from ...core.instrumentation import query_budget
+from pydantic import TypeAdapter
+import asyncio
 import logging
+import shutil
+import tempfile
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+def _spool_upload(upload, suffix: str) -> str:
+    """Copy an upload to a temp file the background job owns; returns its path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        shutil.copyfileobj(upload, tmp, 1024 * 1024)
+    return tmp.name
+
+task_list_adapter = TypeAdapter(List[TaskResponse])
+
 @router.post("/", response_model=TaskResponse)
+@query_budget(3)
 async def create_task(
     task_data: TaskCreate,
     current_user: User = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        logger.debug(f"Creating task with data: {task_data}")
-        logger.debug(f"Current user: {current_user}")
+        logger.debug("Creating task with data: %s", payload(task_data))
+        logger.debug("Current user: %s", current_user.id)
         
         # Check if project exists and user has access
-        project_query = supabase.table("projects").select("*").eq("id", task_data.project_id).execute()
-        logger.debug(f"Project query result: {project_query.data}")
+        project = get_project_row(supabase, task_data.project_id)
         
-        if not project_query.data:
+        if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Project not found"
             )
             
-        project = project_query.data[0]
-        logger.debug(f"Found project: {project}")
+        logger.debug("Found project: %s", payload(project))
         
         # Check if user has access to the project
         if project["owner_id"] != current_user.id:
             # Check if user is a team member
             if project["team_id"]:
-                team_member_query = supabase.table("team_members").select("*").eq("team_id", project["team_id"]).eq("user_id", current_user.id).execute()
-                logger.debug(f"Team member query result: {team_member_query.data}")
-                if not team_member_query.data:
+                if not is_team_member(supabase, project["team_id"], current_user.id):
                     raise HTTPException(
                         status_code=status.HTTP_403_FORBIDDEN,
                         detail="You don't have access to this project"
@@ -66,11 +79,11 @@ async def create_task(
             "assignee_id": str(task_data.assignee_id) if task_data.assignee_id else None
         }
         
-        logger.debug(f"Attempting to insert task with data: {task}")
+        logger.debug("Attempting to insert task with data: %s", payload(task))
         
         try:
             response = supabase.table("tasks").insert(task).execute()
-            logger.debug(f"Task creation response: {response.data}")
+            logger.debug("Task creation response: %s", payload(response.data))
             
             if not response.data:
                 raise HTTPException(
@@ -79,145 +92,203 @@ async def create_task(
                 )
                 
             created_task = response.data[0]
-            logger.debug(f"Successfully created task: {created_task}")
+            logger.debug("Successfully created task: %s", payload(created_task))
+            if project.get("public_id"):
+                public_snapshots.schedule_rebuild(supabase, project["id"])
             
             # Log activity
-            await log_task_created(
+            log_task_created(
                 user_id=current_user.id,
                 task_id=created_task["id"],
                 task_title=created_task["title"],
-                project_name=project["name"],
-                supabase=supabase
+                project_name=project["name"]
             )
             
             return created_task
             
         except Exception as insert_error:
-            logger.error(f"Database error during task creation: {str(insert_error)}")
+            logger.error("Database error during task creation: %s", insert_error)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Database error: {str(insert_error)}"
             )
         
     except HTTPException as he:
-        logger.error(f"HTTP error during task creation: {str(he)}")
+        logger.error("HTTP error during task creation: %s", he)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during task creation: {str(e)}")
+        logger.error("Unexpected error during task creation: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Task creation failed: {str(e)}"
         )
 
 @router.get("/", response_model=List[TaskResponse])
+@query_budget(5)
 async def get_tasks(
     project_id: Optional[str] = None,
     task_status: Optional[TaskStatus] = None,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: Client = Depends(get_supabase_client),
+    profiles: ProfileLoader = Depends(get_profile_loader)
 ):
     try:
-        logger.debug(f"GET /tasks/ endpoint called")
-        logger.debug(f"Query params - project_id: {project_id}, task_status: {task_status}")
-        logger.debug(f"Current user: {current_user}")
-        
-        # Build the base query for tasks
-        query = supabase.table("tasks").select("*")
-        logger.debug("Base query created")
+        logger.debug("GET /tasks/ endpoint called")
+        logger.debug("Query params - project_id: %s, task_status: %s", project_id, task_status)
+        logger.debug("Current user: %s", current_user.id)
         
-        # Add filters if specified
-        if project_id:
-            query = query.eq("project_id", project_id)
-            logger.debug(f"Added project filter: {project_id}")
-        if task_status:
-            query = query.eq("status", task_status)
-            logger.debug(f"Added status filter: {task_status}")
+        def load_tasks():
+            # Build the base query for tasks
+            query = select_active_tasks(supabase)
+            logger.debug("Base query created")
+            
+            # Add filters if specified
+            if project_id:
+                query = query.eq("project_id", project_id)
+                logger.debug("Added project filter: %s", project_id)
+            if task_status:
+                query = query.eq("status", task_status)
+                logger.debug("Added status filter: %s", task_status)
+            
+            # Resolve every project the user can reach through ownership or a team
+            accessible_project_ids = get_accessible_project_ids(supabase, current_user.id)
+            logger.debug("Accessible project IDs: %s", payload(accessible_project_ids))
+            
+            # Get tasks where user has access
+            query_str = task_access_filter(current_user.id, accessible_project_ids)
+            logger.debug("Query string: %s", query_str)
+            query = query.or_(query_str)
+                
+            logger.debug("Executing final query")
+            tasks_response = query.execute()
+            return tasks_response.data or []
         
-        # Get all projects where user is owner
-        logger.debug("Fetching owned projects")
-        owned_projects = supabase.table("projects").select("id").eq("owner_id", current_user.id).execute()
-        owned_project_ids = [p["id"] for p in (owned_projects.data or [])]
-        logger.debug(f"Owned project IDs: {owned_project_ids}")
+        # Duplicate list requests from the same user (e.g. several widgets mounting) share one load
+        flight_key = f"{current_user.id}:{project_id or ''}:{task_status.value if task_status else ''}"
+        tasks = [dict(task) for task in await task_list_flight.do(flight_key, load_tasks)]
+        logger.debug("All tasks: %s", payload(tasks))
         
-        # Get all team memberships
-        logger.debug("Fetching team memberships")
-        team_memberships = supabase.table("team_members").select("team_id").eq("user_id", current_user.id).execute()
-        team_ids = [tm["team_id"] for tm in (team_memberships.data or [])]
-        logger.debug(f"Team IDs: {team_ids}")
+        # Resolve assignee names in one batched lookup rather than one request per card
+        assignees = await profiles.load_many(task.get("assignee_id") for task in tasks)
+        for task in tasks:
+            task["assignee"] = assignees.get(task.get("assignee_id"))
         
-        # Get all projects where user is a team member
-        team_projects = []
-        if team_ids:
-            logger.debug("Fetching team projects")
-            team_projects_response = supabase.table("projects").select("id").in_("team_id", team_ids).execute()
-            team_projects = team_projects_response.data or []
-        team_project_ids = [p["id"] for p in team_projects]
-        logger.debug(f"Team project IDs: {team_project_ids}")
+        return validated_response(task_list_adapter, tasks)
         
-        # Combine all accessible project IDs
-        accessible_project_ids = list(set(owned_project_ids + team_project_ids))
-        logger.debug(f"Accessible project IDs: {accessible_project_ids}")
+    except Exception as e:
+        logger.error("Error fetching tasks: %s", e)
+        logger.exception("Full traceback:")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch tasks: {str(e)}"
+        )
+
+@router.post("/import", response_model=TaskImportJob, status_code=status.HTTP_202_ACCEPTED)
+@query_budget(4)
+async def import_tasks(
+    background_tasks: BackgroundTasks,
+    project_id: str = Form(...),
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Import tasks from a CSV or NDJSON upload; poll the returned job for progress"""
+    from ...services.task_import import import_jobs, run_import
+    
+    try:
+        project = get_project_row(supabase, project_id)
         
-        # Get tasks where user has access
-        if accessible_project_ids:
-            # Use Postgrest syntax for multiple conditions
-            query_str = f"creator_id.eq.{current_user.id},assignee_id.eq.{current_user.id},project_id.in.({','.join(accessible_project_ids)})"
-            logger.debug(f"Query string: {query_str}")
-            query = query.or_(query_str)
-        else:
-            query_str = f"creator_id.eq.{current_user.id},assignee_id.eq.{current_user.id}"
-            logger.debug(f"Query string: {query_str}")
-            query = query.or_(query_str)
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
             
-        logger.debug("Executing final query")
-        tasks_response = query.execute()
-        tasks = tasks_response.data or []
-        logger.debug(f"Query response: {tasks_response}")
-        logger.debug(f"All tasks: {tasks}")
+        if not user_can_access_project(supabase, project, current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You don't have access to this project"
+            )
+        
+        filename = (file.filename or "").lower()
+        file_format = "csv" if filename.endswith(".csv") or file.content_type == "text/csv" else "ndjson"
         
-        return tasks
+        # The upload is closed once the response is sent, so hand the job its own copy.
+        # Copied in a thread: large uploads would otherwise block the event loop
+        tmp_path = await asyncio.to_thread(_spool_upload, file.file, f".{file_format}")
         
+        job = import_jobs.create(supabase, project_id=project_id, user_id=current_user.id)
+        background_tasks.add_task(run_import, job, tmp_path, file_format, project, supabase)
+        
+        return job
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching tasks: {str(e)}")
-        logger.exception("Full traceback:")
+        logger.error("Error starting task import: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch tasks: {str(e)}"
+            detail=f"Failed to start task import: {str(e)}"
         )
 
+@router.get("/import/{job_id}", response_model=TaskImportJob)
+@query_budget(1)
+async def get_import_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    supabase: Client = Depends(get_supabase_client)
+):
+    """Get progress and row-level errors of a task import"""
+    from ...services.task_import import import_jobs
+    
+    job = import_jobs.get(supabase, job_id)
+    
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+        
+    return job
+
 @router.get("/{task_id}", response_model=TaskResponse)
+@query_budget(3)
 async def get_task(
     task_id: str,
     current_user: User = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        logger.debug(f"Fetching task: {task_id}")
+        logger.debug("Fetching task: %s", task_id)
         
-        query = supabase.table("tasks").select("*").eq("id", task_id).or_(
-            f"creator_id.eq.{current_user.id},"
-            f"assignee_id.eq.{current_user.id},"
-            f"project_id.in.(select id from projects where owner_id.eq.{current_user.id} or team_id.in.(select team_id from team_members where user_id.eq.{current_user.id}))"
-        ).execute()
+        # Task, project and membership all come from caches once warm
+        task = get_task_row(supabase, task_id)
+        project = get_project_row(supabase, task["project_id"]) if task else None
         
-        if not query.data:
+        has_access = project is not None and (
+            task["creator_id"] == current_user.id
+            or task.get("assignee_id") == current_user.id
+            or user_can_access_project(supabase, project, current_user.id)
+        )
+        if not has_access:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found or access denied"
             )
             
-        return query.data[0]
+        return task
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching task: {str(e)}")
+        logger.error("Error fetching task: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch task: {str(e)}"
         )
 
 @router.put("/{task_id}", response_model=TaskResponse)
+@query_budget(1)
 async def update_task(
     task_id: str,
     task_data: TaskUpdate,
@@ -225,49 +296,44 @@ async def update_task(
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        logger.debug(f"Updating task: {task_id}")
+        logger.debug("Updating task: %s", task_id)
         
-        # Check access
-        task_query = supabase.table("tasks").select("*, projects!tasks_project_id_fkey(name)").eq("id", task_id).or_(
-            f"creator_id.eq.{current_user.id},"
-            f"assignee_id.eq.{current_user.id},"
-            f"project_id.in.(select id from projects where owner_id.eq.{current_user.id})"
-        ).execute()
+        # Access check and update in one round trip (migration 005)
+        update_data = {k: v for k, v in task_data.model_dump(mode="json").items() if v is not None}
+        result = supabase.rpc("update_task_checked", {
+            "p_task_id": task_id,
+            "p_user_id": current_user.id,
+            "p_changes": update_data
+        }).execute().data
         
-        if not task_query.data:
+        if result["outcome"] == "not_found":
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found or access denied"
+                detail="Task not found"
             )
             
-        original_task = task_query.data[0]
-        original_status = original_task.get("status")
-        
-        # Update task
-        update_data = {k: v for k, v in task_data.model_dump().items() if v is not None}
-        response = supabase.table("tasks").update(update_data).eq("id", task_id).execute()
-        
-        if not response.data:
+        if result["outcome"] == "forbidden":
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to update task"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to update this task"
             )
             
-        updated_task = response.data[0]
+        updated_task = result["task"]
+        task_cache.invalidate(task_id)
+        if result.get("public_id"):
+            public_snapshots.schedule_rebuild(supabase, updated_task["project_id"])
         
         # Log activity if task was completed
-        if (original_status != "done" and 
+        if (result["previous_status"] != "done" and 
             task_data.status and 
             task_data.status.value == "done"):
-            project = original_task.get("projects")
-            project_name = project.get("name") if project else "Unknown Project"
+            project_name = result["project_name"] or "Unknown Project"
             
-            await log_task_completed(
+            log_task_completed(
                 user_id=current_user.id,
                 task_id=task_id,
                 task_title=updated_task["title"],
-                project_name=project_name,
-                supabase=supabase
+                project_name=project_name
             )
             
         return updated_task
@@ -275,42 +341,50 @@ async def update_task(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error updating task: {str(e)}")
+        logger.error("Error updating task: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update task: {str(e)}"
         )
 
 @router.delete("/{task_id}")
+@query_budget(1)
 async def delete_task(
     task_id: str,
     current_user: User = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        logger.debug(f"Deleting task: {task_id}")
+        logger.debug("Deleting task: %s", task_id)
         
-        # Check access
-        task_query = supabase.table("tasks").select("*").eq("id", task_id).or_(
-            f"creator_id.eq.{current_user.id},"
-            f"project_id.in.(select id from projects where owner_id.eq.{current_user.id})"
-        ).execute()
+        # Access check and delete in one round trip (migration 005)
+        result = supabase.rpc("delete_task_checked", {
+            "p_task_id": task_id,
+            "p_user_id": current_user.id
+        }).execute().data
         
-        if not task_query.data:
+        if result["outcome"] == "not_found":
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found or access denied"
+                detail="Task not found"
+            )
+            
+        if result["outcome"] == "forbidden":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to delete this task"
             )
             
-        # Delete task
-        response = supabase.table("tasks").delete().eq("id", task_id).execute()
+        task_cache.invalidate(task_id)
+        if result.get("public_id"):
+            public_snapshots.schedule_rebuild(supabase, result["project_id"])
         
         return {"message": "Task deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting task: {str(e)}")
+        logger.error("Error deleting task: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete task: {str(e)}"
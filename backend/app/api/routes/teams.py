@@ -1,14 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional
 from ...models.team import TeamCreate, TeamResponse, TeamUpdate, TeamMemberAdd
-from ...dependencies import get_current_user
-from ...database import get_supabase_client
+from ...dependencies import get_current_user, get_profile_loader
+from ...database import Client, get_supabase_client
+from ...services.access import get_user_team_ids, invalidate_membership, invalidate_project, is_team_member
+from ...services.profile_loader import ProfileLoader
 from ...services.activity_service import log_team_created, log_team_member_added
-from supabase import Client
+from ...core.responses import trusted_response, validated_response
+from ...core.instrumentation import query_budget
+from pydantic import TypeAdapter
 
 router = APIRouter(prefix="/teams", tags=["Teams"])
 
+team_list_adapter = TypeAdapter(List[TeamResponse])
+
 @router.post("/", response_model=TeamResponse)
+@query_budget(2)
 async def create_team(
     team_data: TeamCreate, 
     current_user: dict = Depends(get_current_user),
@@ -31,13 +38,13 @@ async def create_team(
                 "role": "owner"
             }
             supabase.table("team_members").insert(team_member).execute()
+            invalidate_membership(response.data[0]["id"], [current_user.id])
             
             # Log activity
-            await log_team_created(
+            log_team_created(
                 user_id=current_user.id,
                 team_id=response.data[0]["id"],
-                team_name=response.data[0]["name"],
-                supabase=supabase
+                team_name=response.data[0]["name"]
             )
             
             return response.data[0]
@@ -53,21 +60,21 @@ async def create_team(
         )
 
 @router.get("/", response_model=List[TeamResponse])
+@query_budget(2)
 async def get_teams(
     current_user: dict = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
         # Get teams where user is a member
-        user_teams = supabase.table("team_members").select("team_id").eq("user_id", current_user.id).execute()
-        team_ids = [team["team_id"] for team in user_teams.data]
+        team_ids = get_user_team_ids(supabase, current_user.id)
         
         if not team_ids:
             return []
             
         teams = supabase.table("teams").select("*").in_("id", team_ids).execute()
         
-        return teams.data
+        return validated_response(team_list_adapter, teams.data)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -75,6 +82,7 @@ async def get_teams(
         )
 
 @router.get("/{team_id}", response_model=TeamResponse)
+@query_budget(2)
 async def get_team(
     team_id: str,
     current_user: dict = Depends(get_current_user),
@@ -91,9 +99,7 @@ async def get_team(
             )
             
         # Check if user is a team member
-        team_member = supabase.table("team_members").select("*").eq("team_id", team_id).eq("user_id", current_user.id).execute()
-        
-        if not team_member.data:
+        if not is_team_member(supabase, team_id, current_user.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to access this team"
@@ -109,11 +115,13 @@ async def get_team(
         )
 
 @router.post("/{team_id}/members", status_code=status.HTTP_201_CREATED)
+@query_budget(4)
 async def add_team_member(
     team_id: str,
     member_data: TeamMemberAdd,
     current_user: dict = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: Client = Depends(get_supabase_client),
+    profiles: ProfileLoader = Depends(get_profile_loader)
 ):
     try:
         # Check if team exists
@@ -133,9 +141,9 @@ async def add_team_member(
             )
             
         # Check if user to be added exists
-        user_exists = supabase.table("profiles").select("id").eq("id", member_data.user_id).execute()
+        member_profile = await profiles.load(member_data.user_id)
         
-        if not user_exists.data:
+        if not member_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
@@ -158,18 +166,14 @@ async def add_team_member(
         }
         
         supabase.table("team_members").insert(team_member).execute()
-        
-        # Get user details for activity log
-        user_profile = supabase.table("profiles").select("full_name").eq("id", member_data.user_id).execute()
-        member_name = user_profile.data[0]["full_name"] if user_profile.data else "Unknown User"
+        invalidate_membership(team_id, [member_data.user_id])
         
         # Log activity
-        await log_team_member_added(
+        log_team_member_added(
             user_id=current_user.id,
             team_id=team_id,
             team_name=team.data[0]["name"],
-            member_name=member_name,
-            supabase=supabase
+            member_name=member_profile["full_name"]
         )
         
         return {"message": "Team member added successfully"}
@@ -182,6 +186,7 @@ async def add_team_member(
         )
 
 @router.get("/{team_id}/members", status_code=status.HTTP_200_OK)
+@query_budget(3)
 async def get_team_members(
     team_id: str,
     current_user: dict = Depends(get_current_user),
@@ -198,9 +203,7 @@ async def get_team_members(
             )
             
         # Check if user is a team member
-        team_member = supabase.table("team_members").select("*").eq("team_id", team_id).eq("user_id", current_user.id).execute()
-        
-        if not team_member.data:
+        if not is_team_member(supabase, team_id, current_user.id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to access this team"
@@ -209,7 +212,7 @@ async def get_team_members(
         # Get all team members
         members = supabase.table("team_members").select("*, profiles(id, email, full_name)").eq("team_id", team_id).execute()
         
-        return members.data
+        return trusted_response(members.data)
     except HTTPException:
         raise
     except Exception as e:
@@ -219,6 +222,7 @@ async def get_team_members(
         )
 
 @router.delete("/{team_id}/members/{user_id}", status_code=status.HTTP_200_OK)
+@query_budget(3)
 async def remove_team_member(
     team_id: str,
     user_id: str,
@@ -260,6 +264,7 @@ async def remove_team_member(
             
         # Remove team member
         supabase.table("team_members").delete().eq("team_id", team_id).eq("user_id", user_id).execute()
+        invalidate_membership(team_id, [user_id])
         
         return {"message": "Team member removed successfully"}
     except HTTPException:
@@ -271,6 +276,7 @@ async def remove_team_member(
         )
 
 @router.put("/{team_id}", response_model=TeamResponse)
+@query_budget(2)
 async def update_team(
     team_id: str,
     team_data: TeamUpdate,
@@ -278,26 +284,24 @@ async def update_team(
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        # Check if team exists
-        team = supabase.table("teams").select("*").eq("id", team_id).execute()
+        # Update only if the user is the team owner, in one round trip
+        update_data = {k: v for k, v in team_data.model_dump().items() if v is not None}
         
-        if not team.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Team not found"
-            )
+        response = supabase.table("teams").update(update_data).eq("id", team_id).eq("owner_id", current_user.id).execute()
+        
+        if not response.data:
+            # Nothing matched: only now tell a missing team from someone else's
+            team = supabase.table("teams").select("id").eq("id", team_id).execute()
             
-        # Check if user is the team owner
-        if team.data[0]["owner_id"] != current_user.id:
+            if not team.data:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Team not found"
+                )
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only the team owner can update the team"
             )
-            
-        # Update team
-        update_data = {k: v for k, v in team_data.model_dump().items() if v is not None}
-        
-        response = supabase.table("teams").update(update_data).eq("id", team_id).execute()
         
         return response.data[0]
     except HTTPException:
@@ -309,36 +313,33 @@ async def update_team(
         )
 
 @router.delete("/{team_id}")
+@query_budget(1)
 async def delete_team(
     team_id: str,
     current_user: dict = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
     try:
-        # Check if team exists
-        team = supabase.table("teams").select("*").eq("id", team_id).execute()
+        # Ownership check, detaching projects and removing members in one transaction (migration 005)
+        result = supabase.rpc("delete_team_checked", {
+            "p_team_id": team_id,
+            "p_user_id": current_user.id
+        }).execute().data
         
-        if not team.data:
+        if result["outcome"] == "not_found":
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Team not found"
             )
             
-        # Check if user is the team owner
-        if team.data[0]["owner_id"] != current_user.id:
+        if result["outcome"] == "forbidden":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only the team owner can delete the team"
             )
 
-        # Update projects that use this team
-        supabase.table("projects").update({"team_id": None}).eq("team_id", team_id).execute()
-            
-        # Delete team members
-        supabase.table("team_members").delete().eq("team_id", team_id).execute()
-        
-        # Delete team
-        supabase.table("teams").delete().eq("id", team_id).execute()
+        invalidate_project(*result["project_ids"])
+        invalidate_membership(team_id, result["member_ids"])
         
         return {"message": "Team deleted successfully"}
     except HTTPException:
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Any, Dict, List
 from ...models.user import UserResponse
-from ...database import get_supabase_client
-from supabase import Client
-from ...dependencies import get_current_user
+from ...database import Client, get_supabase_client
+from ...dependencies import get_current_user, get_profile_loader
+from ...services.profile_loader import ProfileLoader, invalidate_profile
+from ...services.user_search import search_profiles, user_search_cache
+from ...core.instrumentation import query_budget
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,17 +13,19 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/profile/{user_id}", response_model=UserResponse)
+@query_budget(2)
 async def get_user_profile(
     user_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase_client)
+    supabase: Client = Depends(get_supabase_client),
+    profiles: ProfileLoader = Depends(get_profile_loader)
 ):
     try:
         # Get user profile from profiles table
-        response = supabase.table("profiles").select("*").eq("id", user_id).execute()
+        profile = await profiles.load(user_id)
         
-        if response.data and len(response.data) > 0:
-            return UserResponse(**response.data[0])
+        if profile:
+            return UserResponse(**profile)
 
         # If profile doesn't exist, create a minimal one automatically
         profile_payload = {
@@ -31,6 +35,8 @@ async def get_user_profile(
         }
 
         create_resp = supabase.table("profiles").insert(profile_payload).execute()
+        invalidate_profile(user_id)
+        user_search_cache.clear()
         if create_resp.data:
             return UserResponse(**create_resp.data[0])
 
@@ -47,12 +53,13 @@ async def get_user_profile(
         )
 
 @router.get("/search", response_model=List[UserResponse])
+@query_budget(1)
 async def search_users_by_email(
     email: str,
     current_user: Dict[str, Any] = Depends(get_current_user),
     supabase: Client = Depends(get_supabase_client)
 ):
-    """Search for users by email address"""
+    """Search for users by email address or name"""
     try:
         if not email or len(email.strip()) < 3:
             raise HTTPException(
@@ -60,13 +67,10 @@ async def search_users_by_email(
                 detail="Email must be at least 3 characters long"
             )
         
-        # Search for users by email (case insensitive, partial match)
-        response = supabase.table("profiles").select("*").ilike("email", f"%{email.strip()}%").limit(10).execute()
-        
-        if response.data:
-            return [UserResponse(**user) for user in response.data]
+        # Search for users by email or name (case insensitive, partial match)
+        profiles = search_profiles(supabase, email, limit=10)
         
-        return []
+        return [UserResponse(**user) for user in profiles]
         
     except HTTPException:
         raise
@@ -1,9 +1,5 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 class Settings(BaseSettings):
     APP_NAME: str = "Collaborative Project Management Platform"
@@ -11,6 +7,94 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     API_PREFIX: str = "/api/v1"
+    # Production frontend origin allowed by CORS
+    FRONTEND_URL: str = ""
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_PAYLOAD_SAMPLE_RATE: float = 0.1
+    LOG_PAYLOAD_MAX_CHARS: int = 2000
+
+    # Request timing instrumentation
+    SERVER_TIMING_ENABLED: bool = True
+    ROUTE_STATS_LOG_INTERVAL_SECONDS: float = 300.0
+    # Per-route query budgets (see core.instrumentation.query_budget); strict raises instead of warning
+    QUERY_BUDGET_ENABLED: bool = True
+    QUERY_BUDGET_STRICT: bool = False
+
+    # Metrics; set a shared directory when running several workers
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # Admin access (comma-separated user ids) and on-demand profiling
+    ADMIN_USER_IDS: str = ""
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_MAX_SECONDS: float = 60.0
+    PROFILE_SIGNAL_ENABLED: bool = False
+    PROFILE_SIGNAL_SECONDS: float = 30.0
+    PROFILE_OUTPUT_DIR: str = "/tmp/profiles"
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # Streaming task export
+    EXPORT_PAGE_SIZE: int = 1000
+
+    # Bulk task import
+    IMPORT_BATCH_SIZE: int = 500
+    IMPORT_MAX_REPORTED_ERRORS: int = 100
+    IMPORT_JOB_RETENTION_DAYS: int = 7
+
+    # Real-time presence (cursors and selections)
+    PRESENCE_MAX_UPDATE_HZ: float = 20.0
+    PRESENCE_SNAPSHOT_INTERVAL_SECONDS: float = 30.0
+
+    # Chunked document storage
+    DOCUMENT_CHUNK_SIZE: int = 64 * 1024
+    DOCUMENT_STREAM_BATCH_CHUNKS: int = 8
+
+    # Read-through cache for project rows, task rows and team membership.
+    # Use "redis" with several workers so invalidations reach all of them.
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = ""
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_TTL_SECONDS: float = 30.0
+    CACHE_NEGATIVE_TTL_SECONDS: float = 5.0
+    # Profiles change rarely and are only shown as names next to other rows
+    PROFILE_CACHE_TTL_SECONDS: float = 60.0
+
+    # Single-flight coalescing of identical concurrent reads
+    SINGLEFLIGHT_RESULT_TTL_SECONDS: float = 1.0
+    SINGLEFLIGHT_MAX_ENTRIES: int = 1024
+
+    # Pre-serialized public project snapshots, shared by workers through this directory
+    PUBLIC_SNAPSHOT_DIR: str = "/tmp/public_snapshots"
+    PUBLIC_SNAPSHOT_MAX_AGE_SECONDS: int = 60
+    PUBLIC_SNAPSHOT_REBUILD_DELAY_SECONDS: float = 0.5
+
+    # Projects with more tasks than this are soft-deleted and purged in batches
+    PROJECT_SOFT_DELETE_THRESHOLD: int = 1000
+    PURGE_BATCH_SIZE: int = 1000
+    PURGE_INTERVAL_SECONDS: float = 0.5
+    PURGE_RETRY_MAX_SECONDS: float = 60.0
+
+    # Background jobs for post-response side effects. Set JOB_STORE_PATH to a
+    # SQLite file to keep queued jobs and idempotency keys across restarts.
+    # Processes sharing the file lease their pending jobs for JOB_LEASE_SECONDS
+    # and take over jobs whose lease lapsed.
+    JOB_WORKERS: int = 4
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 0.5
+    JOB_RETRY_MAX_SECONDS: float = 60.0
+    JOB_IDEMPOTENCY_TTL_SECONDS: float = 24 * 3600
+    JOB_STORE_PATH: str = ""
+    JOB_LEASE_SECONDS: float = 300.0
+
+    # User search
+    USER_SEARCH_CACHE_SIZE: int = 1024
+    USER_SEARCH_CACHE_TTL_SECONDS: float = 30.0
 
     model_config = {
         "env_file": ".env",
@@ -0,0 +1,168 @@
+import os
+import time
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered without it
+    brotli = None
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+# (gzip level, brotli quality) from an idle machine to a saturated one
+_LEVELS = ((6, 5), (4, 4), (1, 1))
+
+class _LoadMonitor:
+    """Picks a compression level from the 1-minute load average, re-read at most once a second"""
+
+    def __init__(self):
+        self._cpus = os.cpu_count() or 1
+        self._checked = 0.0
+        self._tier = 0
+
+    def tier(self) -> int:
+        now = time.monotonic()
+        if now - self._checked >= 1.0:
+            self._checked = now
+            try:
+                load = os.getloadavg()[0] / self._cpus
+            except (AttributeError, OSError):
+                load = 0.0  # getloadavg is not available on every platform
+            self._tier = 0 if load < 0.5 else 1 if load < 0.9 else 2
+        return self._tier
+
+_load_monitor = _LoadMonitor()
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    encodings = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+class _Compressor:
+    def __init__(self, encoding: str, tier: int):
+        gzip_level, brotli_quality = _LEVELS[tier]
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush so each streamed chunk can be decoded as it arrives"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli compression.
+
+    Bodies under `minimum_size` are sent as-is. Streaming responses are
+    compressed chunk by chunk. The level drops as the machine gets busier so
+    compression never becomes the bottleneck under load.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message.get("headers", []))
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                message["status"] in (204, 206, 304)
+                or "content-encoding" in headers
+                or not content_type.startswith(_COMPRESSIBLE_TYPES)
+            )
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+
+            if self.passthrough or (not more_body and len(body) < self.minimum_size):
+                await self._send(start)
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, _load_monitor.tier())
+            headers = MutableHeaders(scope=start)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                compressed = self.compressor.finish(body)
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+            del headers["Content-Length"]
+            await self._send(start)
+
+        if self.compressor is None:
+            await self._send(message)
+            return
+
+        if more_body:
+            data = self.compressor.chunk(body)
+        else:
+            data = self.compressor.finish(body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,252 @@
+import time
+from contextvars import Context, ContextVar, Token
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from .metrics import AUTH_LATENCY, QUERY_BUDGET_EXCEEDED, UPSTREAM_LATENCY, UPSTREAM_QUERIES
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Builder methods that decide which kind of statement a PostgREST query is
+_OPERATIONS = {"select", "insert", "update", "upsert", "delete"}
+
+class Span:
+    """One upstream call made while serving a request"""
+    __slots__ = ("kind", "table", "operation", "duration", "rows")
+
+    def __init__(self, kind: str, table: str, operation: str, duration: float, rows: Optional[int]):
+        self.kind = kind  # "db" or "auth"
+        self.table = table
+        self.operation = operation
+        self.duration = duration
+        self.rows = rows
+
+class RequestTimings:
+    """Upstream spans collected for the request running in the current context"""
+    __slots__ = ("start", "spans", "scope")
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None):
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        # ASGI scope; routing fills in scope["route"] once the request is matched
+        self.scope = scope
+
+    def record(self, kind: str, table: str, operation: str, duration: float, rows: Optional[int] = None):
+        self.spans.append(Span(kind, table, operation, duration, rows))
+
+    def total(self, kind: str) -> float:
+        return sum(span.duration for span in self.spans if span.kind == kind)
+
+    def count(self, kind: str) -> int:
+        return sum(1 for span in self.spans if span.kind == kind)
+
+    def server_timing(self, elapsed: float) -> str:
+        """Render the spans as a Server-Timing header value (durations in ms)"""
+        db_time = self.total("db")
+        auth_time = self.total("auth")
+        per_table: Dict[str, float] = {}
+        for span in self.spans:
+            if span.kind == "db":
+                per_table[span.table] = per_table.get(span.table, 0.0) + span.duration
+
+        entries = [
+            f'db;dur={db_time * 1000:.1f};desc="{self.count("db")} queries"',
+            f"auth;dur={auth_time * 1000:.1f}",
+            f"app;dur={max(elapsed - db_time - auth_time, 0.0) * 1000:.1f}",
+            f"total;dur={elapsed * 1000:.1f}",
+        ]
+        for table, duration in sorted(per_table.items(), key=lambda item: -item[1])[:8]:
+            name = "".join(c if c.isalnum() else "-" for c in table)
+            entries.append(f'db-{name};dur={duration * 1000:.1f}')
+
+        return ", ".join(entries)
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request(scope: Optional[Dict[str, Any]] = None) -> Token:
+    return _current_timings.set(RequestTimings(scope))
+
+def end_request(token: Token):
+    _current_timings.reset(token)
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+def timings_in_context(context: Context) -> Optional[RequestTimings]:
+    """The request timings of another context, e.g. one a worker thread is running in"""
+    return context.get(_current_timings)
+
+def _record(kind: str, table: str, operation: str, started: float, rows: Optional[int] = None):
+    duration = time.perf_counter() - started
+    if kind == "auth":
+        AUTH_LATENCY.observe(duration)
+    else:
+        UPSTREAM_QUERIES.inc(table=table, operation=operation)
+        UPSTREAM_LATENCY.observe(duration, table=table, operation=operation)
+
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.record(kind, table, operation, duration, rows)
+
+class _QueryProxy:
+    """Wraps a PostgREST request builder so `execute()` is timed"""
+    __slots__ = ("_builder", "_table", "_operation")
+
+    def __init__(self, builder: Any, table: str, operation: Optional[str] = None):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+
+    def execute(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self._builder.execute(*args, **kwargs)
+        except Exception:
+            _record("db", self._table, self._operation or "select", started)
+            raise
+        data = getattr(response, "data", None)
+        _record("db", self._table, self._operation or "select", started, len(data) if isinstance(data, list) else None)
+        return response
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        operation = self._operation
+        if name in _OPERATIONS and (operation is None or name != "select"):
+            operation = name
+
+        if not callable(attr):
+            # e.g. the `not_` property returns another builder
+            return _QueryProxy(attr, self._table, operation) if hasattr(attr, "execute") else attr
+
+        def method(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return _QueryProxy(result, self._table, operation)
+            return result
+
+        return method
+
+class _AuthProxy:
+    """Times token verification against the auth server"""
+    __slots__ = ("_auth",)
+
+    def __init__(self, auth: Any):
+        self._auth = auth
+
+    def get_user(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._auth.get_user(*args, **kwargs)
+        finally:
+            _record("auth", "auth", "get_user", started)
+
+    def __getattr__(self, name: str):
+        return getattr(self._auth, name)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request makes more upstream queries than its route allows"""
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declare how many PostgREST calls (rpc included, auth excluded) a route may
+    make per request. Place it under the router decorator:
+
+        @router.get("/{team_id}")
+        @query_budget(2)
+        async def get_team(...):
+
+    For streaming responses only the calls made before the body starts count.
+    """
+    def decorator(endpoint: F) -> F:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+def check_query_budget(route: str, endpoint: Any, timings: RequestTimings, strict: bool = False):
+    """Warn (or raise in strict mode) when the request went over its route's query budget"""
+    budget = getattr(endpoint, "__query_budget__", None)
+    if budget is None:
+        return
+
+    queries = timings.count("db")
+    if queries <= budget:
+        return
+
+    per_table: Dict[str, int] = {}
+    for span in timings.spans:
+        if span.kind == "db":
+            per_table[span.table] = per_table.get(span.table, 0) + 1
+    breakdown = ", ".join(f"{table} x{count}" for table, count in sorted(per_table.items(), key=lambda item: -item[1]))
+
+    QUERY_BUDGET_EXCEEDED.inc(route=route)
+    if strict:
+        raise QueryBudgetExceeded(f"{route} made {queries} queries, budget is {budget} ({breakdown})")
+    logger.warning("%s made %d queries, budget is %d (%s)", route, queries, budget, breakdown)
+
+class InstrumentedClient:
+    """Supabase client wrapper that records a span for every upstream call"""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.auth = _AuthProxy(client.auth)
+
+    def table(self, table_name: str) -> _QueryProxy:
+        return _QueryProxy(self._client.table(table_name), table_name)
+
+    def from_(self, table_name: str) -> _QueryProxy:
+        return self.table(table_name)
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, *args, **kwargs) -> _QueryProxy:
+        return _QueryProxy(self._client.rpc(fn, params or {}, *args, **kwargs), f"rpc:{fn}", "rpc")
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+class RouteStats:
+    """Aggregated per-route latency breakdown, periodically written to the log"""
+
+    def __init__(self, log_interval: float):
+        self.log_interval = log_interval
+        # Format: {route: [requests, total_s, db_s, auth_s, db_calls]}
+        self._stats: Dict[str, List[float]] = {}
+        self._lock = Lock()
+        self._last_logged = time.monotonic()
+
+    def record(self, route: str, timings: RequestTimings, elapsed: float):
+        db_time = timings.total("db")
+        auth_time = timings.total("auth")
+        db_calls = timings.count("db")
+        with self._lock:
+            stats = self._stats.get(route)
+            if stats is None:
+                stats = self._stats[route] = [0, 0.0, 0.0, 0.0, 0]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += db_time
+            stats[3] += auth_time
+            stats[4] += db_calls
+
+        if self.log_interval > 0 and time.monotonic() - self._last_logged >= self.log_interval:
+            self._log_summary()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            items = list(self._stats.items())
+        return {
+            route: {
+                "requests": count,
+                "avg_ms": total / count * 1000,
+                "avg_db_ms": db / count * 1000,
+                "avg_auth_ms": auth / count * 1000,
+                "avg_app_ms": max(total - db - auth, 0.0) / count * 1000,
+                "avg_db_calls": calls / count,
+            }
+            for route, (count, total, db, auth, calls) in items
+            if count
+        }
+
+    def _log_summary(self):
+        self._last_logged = time.monotonic()
+        logger.info("Per-route timing breakdown", extra={"routes": self.snapshot()})
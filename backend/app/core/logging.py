@@ -0,0 +1,105 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Optional
+from ..config import Settings
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats the message in the calling thread so the
+    record can be pickled; the queue here is in-process, so the request path
+    only pays for creating the record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class Payload:
+    """Lazily rendered, truncated repr of a (possibly large) object for log messages"""
+    __slots__ = ("obj", "max_chars")
+
+    def __init__(self, obj: Any, max_chars: int):
+        self.obj = obj
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        text = repr(self.obj)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... <{len(text) - self.max_chars} chars truncated>"
+        return text
+
+    __repr__ = __str__
+
+_payload_sample_rate = 1.0
+_payload_max_chars = 2000
+
+def payload(obj: Any) -> Any:
+    """
+    Wrap an object dumped into a debug log.
+
+    Rendering is deferred until the record is actually emitted, the output is
+    truncated, and only a sample of dumps are kept at all.
+    """
+    if _payload_sample_rate < 1.0 and random.random() >= _payload_sample_rate:
+        return "<payload not sampled>"
+    return Payload(obj, _payload_max_chars)
+
+def configure_logging(settings: Settings):
+    """Configure root logging once: level from settings, output through a background queue"""
+    global _listener, _payload_sample_rate, _payload_max_chars
+
+    _payload_sample_rate = settings.LOG_PAYLOAD_SAMPLE_RATE
+    _payload_max_chars = settings.LOG_PAYLOAD_MAX_CHARS
+
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_JSON:
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # Third-party HTTP clients are very chatty at DEBUG
+    for name in ("httpx", "httpcore", "hpack"):
+        logging.getLogger(name).setLevel(max(root.level, logging.INFO))
@@ -0,0 +1,289 @@
+import glob
+import json
+import math
+import os
+import time
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from ..config import get_settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...], lock: Lock):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = lock
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the (unlabelled) value at scrape time instead of on every change"""
+        self._function = function
+
+    def collect(self) -> Dict[LabelValues, float]:
+        if self._function is not None:
+            try:
+                return {(): float(self._function())}
+            except Exception as e:
+                logger.error("Failed to collect gauge %s: %s", self.name, e)
+                return {}
+        with self._lock:
+            return dict(self.values)
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Format: {labels: [bucket counts..., sum, count]}
+        self.values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+class MetricsRegistry:
+    """
+    In-process Prometheus-style metrics.
+
+    Updates are a dict lookup and an add under one lock. With a
+    `multiprocess_dir`, each worker periodically writes its values to a file
+    there and `/metrics` sums the files of all workers, so any worker can
+    answer a scrape.
+    """
+
+    def __init__(self, multiprocess_dir: Optional[str] = None, flush_interval: float = 5.0):
+        self._lock = Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, self._lock))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, self._lock))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, self._lock, buckets=buckets))
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            return self._metrics[metric.name]
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _snapshot(self) -> Dict[str, Dict[str, list]]:
+        snapshot = {}
+        for metric in self._metrics.values():
+            if isinstance(metric, Gauge):
+                values = metric.collect()
+            else:
+                with self._lock:
+                    values = {key: list(value) if isinstance(value, list) else value for key, value in metric.values.items()}
+            snapshot[metric.name] = {"|".join(key): value for key, value in values.items()}
+        return snapshot
+
+    def maybe_flush(self):
+        """Write this worker's values for the other workers, at most every flush_interval"""
+        if not self.multiprocess_dir:
+            return
+        now = time.monotonic()
+        if now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self._write_snapshot()
+
+    def _write_snapshot(self):
+        path = os.path.join(self.multiprocess_dir, f"metrics_{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(self._snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error("Failed to write metrics snapshot: %s", e)
+
+    def _collect_all(self) -> Dict[str, Dict[str, list]]:
+        if not self.multiprocess_dir:
+            return self._snapshot()
+
+        self._write_snapshot()
+        merged: Dict[str, Dict[str, list]] = {}
+        for path in glob.glob(os.path.join(self.multiprocess_dir, "metrics_*.json")):
+            try:
+                pid = int(os.path.basename(path)[len("metrics_"):-len(".json")])
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(pid)
+            for name, series in snapshot.items():
+                metric = self._metrics.get(name)
+                # Gauges of exited workers no longer describe anything
+                if metric is None or (isinstance(metric, Gauge) and not alive):
+                    continue
+                target = merged.setdefault(name, {})
+                for key, value in series.items():
+                    if isinstance(value, list):
+                        current = target.get(key)
+                        target[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        target[key] = target.get(key, 0.0) + value
+        return merged
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        collected = self._collect_all()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type_name}")
+            for key, value in sorted(collected.get(name, {}).items()):
+                label_values = key.split("|") if metric.labelnames else []
+                if isinstance(metric, Histogram):
+                    cumulative = 0.0
+                    for bound, count in zip(metric.buckets, value):
+                        cumulative += count
+                        le = 'le="' + _format_value(bound) + '"'
+                        lines.append(f"{name}_bucket{_format_labels(metric.labelnames, label_values, le)} {_format_value(cumulative)}")
+                    labels = _format_labels(metric.labelnames, label_values)
+                    lines.append(f"{name}_sum{labels} {_format_value(value[-2])}")
+                    lines.append(f"{name}_count{labels} {_format_value(value[-1])}")
+                else:
+                    lines.append(f"{name}{_format_labels(metric.labelnames, label_values)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+settings = get_settings()
+
+registry = MetricsRegistry(
+    multiprocess_dir=settings.METRICS_MULTIPROC_DIR or None,
+    flush_interval=settings.METRICS_FLUSH_INTERVAL_SECONDS
+)
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+UPSTREAM_QUERIES = registry.counter(
+    "upstream_queries_total",
+    "PostgREST calls by table and operation",
+    ("table", "operation")
+)
+UPSTREAM_LATENCY = registry.histogram(
+    "upstream_query_duration_seconds",
+    "PostgREST call latency by table",
+    ("table", "operation")
+)
+AUTH_LATENCY = registry.histogram(
+    "auth_verification_duration_seconds",
+    "Latency of token verification against the auth server"
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total",
+    "Read-through cache lookups by cache and result (hit or miss)",
+    ("cache", "result")
+)
+SINGLEFLIGHT_REQUESTS = registry.counter(
+    "singleflight_requests_total",
+    "Coalesced reads by flight and result (leader, shared or cached)",
+    ("flight", "result")
+)
+QUERY_BUDGET_EXCEEDED = registry.counter(
+    "query_budget_exceeded_total",
+    "Requests that made more PostgREST calls than their route's budget",
+    ("route",)
+)
+JOB_QUEUE_DEPTH = registry.gauge(
+    "job_queue_depth",
+    "Background jobs queued or waiting to be retried"
+)
+JOBS_PROCESSED = registry.counter(
+    "jobs_processed_total",
+    "Background job attempts by job and result (succeeded, retried, failed or duplicate)",
+    ("job", "result")
+)
+WEBSOCKET_ROOMS = registry.gauge(
+    "websocket_rooms",
+    "Chat and document rooms with at least one connection"
+)
+WEBSOCKET_CONNECTIONS = registry.gauge(
+    "websocket_connections",
+    "Open chat and document WebSocket connections"
+)
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import get_settings
+from ..database import get_supabase_client
+from .websocket import ConnectionManager, manager
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+class _PresenceState:
+    """In-memory cursor and selection state for one user in a document room"""
+    __slots__ = (
+        "cursor_position",
+        "selection_range",
+        "sent_cursor_position",
+        "sent_selection_range",
+        "last_sent",
+        "last_active",
+        "flush_handle",
+        "dirty",
+    )
+
+    def __init__(self):
+        self.cursor_position: Optional[Dict[str, int]] = None
+        self.selection_range: Optional[Dict[str, int]] = None
+        # What the room has already been told, used to compute deltas
+        self.sent_cursor_position: Optional[Dict[str, int]] = None
+        self.sent_selection_range: Optional[Dict[str, int]] = None
+        self.last_sent: float = 0.0
+        self.last_active: datetime = datetime.now(timezone.utc)
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        # Changed since the last "last seen" snapshot was written
+        self.dirty: bool = True
+
+class PresenceManager:
+    """
+    Ephemeral presence for document rooms.
+
+    Cursor and selection updates live in memory and are coalesced to at most
+    `max_update_hz` broadcasts per user. Only changed fields are sent to the
+    room, and `document_collaborators` receives a low-frequency snapshot
+    instead of one UPDATE per keystroke.
+    """
+
+    def __init__(
+        self,
+        connection_manager: ConnectionManager,
+        max_update_hz: float = settings.PRESENCE_MAX_UPDATE_HZ,
+        snapshot_interval: float = settings.PRESENCE_SNAPSHOT_INTERVAL_SECONDS
+    ):
+        self.connection_manager = connection_manager
+        self.min_interval = 1.0 / max_update_hz if max_update_hz > 0 else 0.0
+        self.snapshot_interval = snapshot_interval
+        # Format: {document_id: {user_id: _PresenceState}}
+        self.rooms: Dict[str, Dict[str, _PresenceState]] = {}
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    async def update(
+        self,
+        document_id: str,
+        user_id: str,
+        cursor_position: Optional[Dict[str, int]] = None,
+        selection_range: Optional[Dict[str, int]] = None
+    ):
+        """Record a cursor/selection move and broadcast it within the rate limit"""
+        room = self.rooms.setdefault(document_id, {})
+        state = room.get(user_id)
+        if state is None:
+            state = room[user_id] = _PresenceState()
+
+        if cursor_position is not None:
+            state.cursor_position = cursor_position
+        state.selection_range = selection_range
+        state.last_active = datetime.now(timezone.utc)
+        state.dirty = True
+
+        self._ensure_snapshot_task()
+
+        # A flush is already scheduled; it will pick up the latest state
+        if state.flush_handle is not None:
+            return
+
+        wait = state.last_sent + self.min_interval - time.monotonic()
+        if wait <= 0:
+            await self._flush(document_id, user_id)
+        else:
+            loop = asyncio.get_running_loop()
+            state.flush_handle = loop.call_later(
+                wait,
+                lambda: asyncio.ensure_future(self._flush(document_id, user_id))
+            )
+
+    async def leave(self, document_id: str, user_id: str):
+        """Drop a user's presence and tell the rest of the room"""
+        room = self.rooms.get(document_id)
+        if not room or user_id not in room:
+            return
+
+        state = room.pop(user_id)
+        if state.flush_handle is not None:
+            state.flush_handle.cancel()
+        if not room:
+            del self.rooms[document_id]
+
+        await self.connection_manager.broadcast_to_document(
+            document_id,
+            {"type": "presence_leave", "user_id": user_id},
+            exclude_user=user_id
+        )
+        await asyncio.to_thread(self._write_snapshot, [(document_id, user_id, state)])
+
+    def get_room_state(self, document_id: str) -> Dict[str, Dict[str, Any]]:
+        """Full presence for a room, sent to clients when they join"""
+        return {
+            user_id: {
+                "cursor_position": state.cursor_position,
+                "selection_range": state.selection_range,
+                "last_active": state.last_active.isoformat(),
+            }
+            for user_id, state in self.rooms.get(document_id, {}).items()
+        }
+
+    async def _flush(self, document_id: str, user_id: str):
+        """Broadcast the fields that changed since the last broadcast"""
+        state = self.rooms.get(document_id, {}).get(user_id)
+        if state is None:
+            return
+        state.flush_handle = None
+
+        delta: Dict[str, Any] = {}
+        if state.cursor_position != state.sent_cursor_position:
+            delta["cursor_position"] = state.cursor_position
+        if state.selection_range != state.sent_selection_range:
+            delta["selection_range"] = state.selection_range
+        if not delta:
+            return
+
+        state.sent_cursor_position = state.cursor_position
+        state.sent_selection_range = state.selection_range
+        state.last_sent = time.monotonic()
+
+        await self.connection_manager.broadcast_to_document(
+            document_id,
+            {"type": "presence", "user_id": user_id, **delta},
+            exclude_user=user_id
+        )
+
+    def _ensure_snapshot_task(self):
+        if self._snapshot_task is None or self._snapshot_task.done():
+            self._snapshot_task = asyncio.ensure_future(self._snapshot_loop())
+
+    async def _snapshot_loop(self):
+        """Periodically persist a "last seen" snapshot of changed presence"""
+        while self.rooms:
+            await asyncio.sleep(self.snapshot_interval)
+            dirty = []
+            for document_id, room in self.rooms.items():
+                for user_id, state in room.items():
+                    if state.dirty:
+                        state.dirty = False
+                        dirty.append((document_id, user_id, state))
+            if dirty:
+                await asyncio.to_thread(self._write_snapshot, dirty)
+
+    def _write_snapshot(self, entries: List[Tuple[str, str, "_PresenceState"]]):
+        rows = [
+            {
+                "document_id": document_id,
+                "user_id": user_id,
+                "cursor_position": state.cursor_position,
+                "selection_range": state.selection_range,
+                "last_active": state.last_active.isoformat(),
+            }
+            for document_id, user_id, state in entries
+        ]
+        try:
+            supabase = get_supabase_client()
+            supabase.table("document_collaborators").upsert(rows).execute()
+        except Exception as e:
+            logger.error(f"Failed to write presence snapshot: {str(e)}")
+
+# Shared presence manager for document rooms
+presence_manager = PresenceManager(manager)
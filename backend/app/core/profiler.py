@@ -0,0 +1,144 @@
+import contextvars
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import thread as futures_thread
+from types import CodeType, FrameType
+from typing import Any, Optional
+from ..config import get_settings
+from .instrumentation import timings_in_context
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Only one profile may run at a time; sampling twice doubles the overhead
+_profile_lock = threading.Lock()
+
+def _frame_label(code: CodeType) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _anyio_worker_code() -> Optional[CodeType]:
+    try:
+        from anyio._backends._asyncio import WorkerThread
+    except (ImportError, AttributeError):
+        return None
+    return WorkerThread.run.__code__
+
+# Frames that run a work item inside a copied request context:
+# asyncio.to_thread (via the loop's default executor) and anyio's thread pool
+_EXECUTOR_CODE = futures_thread._WorkItem.run.__code__
+_ANYIO_WORKER_CODE = _anyio_worker_code()
+
+def _worker_context(frame: FrameType) -> Optional[contextvars.Context]:
+    """The context a thread pool frame is running its current work item in"""
+    if frame.f_code is _EXECUTOR_CODE:
+        # asyncio.to_thread submits functools.partial(context.run, func, ...)
+        runner = getattr(frame.f_locals.get("self"), "fn", None)
+        context = getattr(getattr(runner, "func", None), "__self__", None)
+    elif frame.f_code is _ANYIO_WORKER_CODE:
+        context = frame.f_locals.get("context")
+    else:
+        return None
+    return context if isinstance(context, contextvars.Context) else None
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the live process.
+
+    A background thread snapshots every thread's stack with
+    `sys._current_frames()` at a fixed interval and counts identical stacks.
+    Nothing is hooked into the interpreter, so the cost is one stack walk per
+    thread per sample and the process runs unmodified between samples.
+    """
+
+    def __init__(self, interval: float = 0.005, scope_route: Optional[Any] = None):
+        self.interval = interval
+        # When set, keep only stacks doing work for requests to this route
+        self.scope_route = scope_route
+        self.scope_code = getattr(getattr(scope_route, "endpoint", None), "__code__", None)
+        self.samples: Counter = Counter()
+
+    def run(self, seconds: float) -> str:
+        """Sample for `seconds` and return the stacks in collapsed (flamegraph) format"""
+        own_thread = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread:
+                    self._sample(thread_names.get(thread_id, str(thread_id)), frame)
+            time.sleep(self.interval)
+
+        return self.collapsed()
+
+    def _sample(self, thread_name: str, frame: Optional[FrameType]):
+        stack = []
+        in_scope = self.scope_route is None
+        while frame is not None:
+            code = frame.f_code
+            # On the event loop the endpoint itself is on the stack; work it
+            # handed to a thread is matched through the request context instead
+            if not in_scope and (code is self.scope_code or self._in_route_context(frame)):
+                in_scope = True
+            stack.append(_frame_label(code))
+            frame = frame.f_back
+
+        if in_scope and stack:
+            stack.append(thread_name)
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _in_route_context(self, frame: FrameType) -> bool:
+        context = _worker_context(frame)
+        if context is None:
+            return False
+        timings = timings_in_context(context)
+        return timings is not None and timings.scope is not None and timings.scope.get("route") is self.scope_route
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+def run_profile(seconds: float, interval: float, scope_route: Optional[Any] = None) -> Optional[str]:
+    """Run a profile unless another one is already running"""
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        logger.info("Sampling profiler running for %.1fs", seconds)
+        return SamplingProfiler(interval=interval, scope_route=scope_route).run(seconds)
+    finally:
+        _profile_lock.release()
+
+def _profile_to_file():
+    output = run_profile(settings.PROFILE_SIGNAL_SECONDS, settings.PROFILE_INTERVAL_MS / 1000)
+    if output is None:
+        logger.warning("Profile requested by signal while another profile is running")
+        return
+
+    os.makedirs(settings.PROFILE_OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(
+        settings.PROFILE_OUTPUT_DIR,
+        f"profile-{os.getpid()}-{int(time.time())}.collapsed"
+    )
+    with open(path, "w") as f:
+        f.write(output)
+    logger.info("Wrote profile to %s", path)
+
+def install_signal_handler():
+    """Profile the worker for PROFILE_SIGNAL_SECONDS when it receives SIGUSR2"""
+    sigusr2 = getattr(signal, "SIGUSR2", None)
+    if sigusr2 is None:
+        return
+
+    def handler(signum, frame):
+        threading.Thread(target=_profile_to_file, name="sampling-profiler", daemon=True).start()
+
+    try:
+        signal.signal(sigusr2, handler)
+    except ValueError:
+        # Not the main thread (e.g. imported by a test runner); skip the signal hook
+        logger.debug("Not installing profiler signal handler outside the main thread")
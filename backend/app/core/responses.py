@@ -0,0 +1,56 @@
+import json
+from typing import Any
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library encoder
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=str
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def validated_response(adapter: TypeAdapter, data: Any) -> Response:
+    """
+    Validate and serialize with a prebuilt TypeAdapter. Build adapters once,
+    at module level; constructing one compiles its validator.
+
+    Returning a Response skips FastAPI's own response_model handling (which
+    rebuilds the validator and round-trips through jsonable_encoder), while
+    the route keeps response_model for the OpenAPI schema.
+    """
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(data)),
+        media_type="application/json"
+    )
+
+def trusted_response(data: Any) -> Response:
+    """Encode rows whose shape is already fixed by the query, without validation"""
+    return Response(content=dumps(data), media_type="application/json")
+
+def conditional_response(request: Request, body: bytes, etag: str, max_age: int) -> Response:
+    """Serve a pre-serialized body with validators, answering 304 when the client copy is current"""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if_none_match = request.headers.get("if-none-match", "")
+    # Weak comparison: W/"x" and "x" match
+    candidates = {etag, etag[2:] if etag.startswith("W/") else etag, "*"}
+    if any(tag.strip() in candidates for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,9 +1,8 @@
 from fastapi import WebSocket
 from typing import Dict, Set, Optional, Any
+from .metrics import WEBSOCKET_CONNECTIONS, WEBSOCKET_ROOMS
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
@@ -20,7 +19,7 @@ class ConnectionManager:
             self.active_connections[room_id] = {}
             
         self.active_connections[room_id][user_id] = websocket
-        logger.debug(f"User {user_id} connected to room {room_id}")
+        logger.debug("User %s connected to room %s", user_id, room_id)
         
     def disconnect(self, websocket: WebSocket, room_id: str, user_id: str):
         """Disconnect a user from a chat or document room"""
@@ -31,7 +30,7 @@ class ConnectionManager:
             if not self.active_connections[room_id]:
                 del self.active_connections[room_id]
                 
-        logger.debug(f"User {user_id} disconnected from room {room_id}")
+        logger.debug("User %s disconnected from room %s", user_id, room_id)
         
     async def broadcast_to_chat(
         self,
@@ -52,7 +51,7 @@ class ConnectionManager:
             try:
                 await websocket.send_json(message)
             except Exception as e:
-                logger.error(f"Error sending message to user {user_id}: {str(e)}")
+                logger.error("Error sending message to user %s: %s", user_id, e)
                 disconnected_users.add(user_id)
                 
         # Clean up disconnected users
@@ -82,7 +81,7 @@ class ConnectionManager:
             try:
                 await websocket.send_json(message)
             except Exception as e:
-                logger.error(f"Error sending update to user {user_id}: {str(e)}")
+                logger.error("Error sending update to user %s: %s", user_id, e)
                 disconnected_users.add(user_id)
                 
         # Clean up disconnected users
@@ -98,4 +97,12 @@ class ConnectionManager:
         if room_id not in self.active_connections:
             return set()
             
-        return set(self.active_connections[room_id].keys()) 
\ No newline at end of file
+        return set(self.active_connections[room_id].keys())
+
+# Shared connection manager for chat and document rooms
+manager = ConnectionManager()
+
+WEBSOCKET_ROOMS.set_function(lambda: len(manager.active_connections))
+WEBSOCKET_CONNECTIONS.set_function(
+    lambda: sum(len(room) for room in list(manager.active_connections.values()))
+)
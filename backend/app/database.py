@@ -1,12 +1,36 @@
-import os
-from supabase.client import create_client, Client
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 from .config import get_settings
+from .core.instrumentation import InstrumentedClient
+
+if TYPE_CHECKING:
+    from supabase.client import Client
+else:
+    # supabase pulls in httpx, gotrue, postgrest, storage and realtime; keep it
+    # off the import path so a cold start can serve /health before it is needed
+    Client = Any
 
 settings = get_settings()
 
-def get_supabase_client() -> Client:
-    supabase: Client = create_client(
+def _create_client() -> "Client":
+    from supabase.client import create_client
+
+    return create_client(
         settings.SUPABASE_URL,
         settings.SUPABASE_KEY
     )
-    return supabase
\ No newline at end of file
+
+@lru_cache()
+def get_supabase_client() -> Client:
+    """
+    Shared client for data access, built on first use.
+
+    Building a client costs tens of milliseconds, so it is reused across
+    requests. It never holds a user session: tokens are only passed to
+    `auth.get_user`, which does not store them.
+    """
+    return InstrumentedClient(_create_client())
+
+def get_auth_client() -> Client:
+    """Fresh client for sign-up, sign-in and sign-out, which store a session on the client"""
+    return InstrumentedClient(_create_client())
@@ -0,0 +1,4 @@
+-- Comments of a document in creation order. Dropped by 007_comment_threads.sql,
+-- whose root and thread indexes cover the paged reads.
+create index if not exists document_comments_document_id_created_at_idx
+    on document_comments (document_id, created_at);
@@ -0,0 +1,10 @@
+-- Chunked document bodies. The manifest is the ordered (chunk_index, byte_length)
+-- list, so it is served from the primary key without reading chunk content.
+create table if not exists document_chunks (
+    document_id uuid not null references documents (id) on delete cascade,
+    chunk_index integer not null,
+    content text not null,
+    byte_length integer not null,
+    updated_at timestamptz not null default now(),
+    primary key (document_id, chunk_index)
+);
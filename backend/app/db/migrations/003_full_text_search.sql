@@ -0,0 +1,99 @@
+-- Full-text search over tasks, projects and documents.
+--
+-- The search vectors are expression indexes rather than stored columns so that
+-- the existing `select("*")` queries do not start shipping tsvectors to clients.
+-- The functions are IMMUTABLE so the planner can match them against the indexes.
+
+create or replace function tasks_search_vector(title text, description text)
+returns tsvector language sql immutable parallel safe as $$
+    select setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+$$;
+
+create or replace function projects_search_vector(name text, description text)
+returns tsvector language sql immutable parallel safe as $$
+    select setweight(to_tsvector('english', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+$$;
+
+create or replace function documents_search_vector(title text, content text)
+returns tsvector language sql immutable parallel safe as $$
+    select setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(content, '')), 'C')
+$$;
+
+create index if not exists tasks_search_idx
+    on tasks using gin (tasks_search_vector(title, description));
+create index if not exists projects_search_idx
+    on projects using gin (projects_search_vector(name, description));
+create index if not exists documents_search_idx
+    on documents using gin (documents_search_vector(title, content));
+
+-- Ranked, highlighted and paginated search. Access is resolved by the API with
+-- the same rules as GET /tasks/ and passed in as project and team ids.
+create or replace function search_workspace(
+    p_query text,
+    p_user_id uuid,
+    p_project_ids uuid[],
+    p_team_ids uuid[],
+    p_types text[] default array['task', 'project', 'document'],
+    p_limit integer default 20,
+    p_offset integer default 0
+)
+returns table (
+    type text,
+    id uuid,
+    title text,
+    highlight text,
+    project_id uuid,
+    rank real,
+    total_count bigint
+)
+language sql stable as $$
+    with q as (
+        select websearch_to_tsquery('english', p_query) as query
+    ),
+    hits as (
+        select 'task'::text as type, t.id, t.title, t.description as body, t.project_id,
+               ts_rank_cd(tasks_search_vector(t.title, t.description), q.query) as rank
+        from tasks t, q
+        where 'task' = any(p_types)
+          and tasks_search_vector(t.title, t.description) @@ q.query
+          and (t.creator_id = p_user_id
+               or t.assignee_id = p_user_id
+               or t.project_id = any(p_project_ids))
+        union all
+        select 'project', p.id, p.name, p.description, p.id,
+               ts_rank_cd(projects_search_vector(p.name, p.description), q.query)
+        from projects p, q
+        where 'project' = any(p_types)
+          and projects_search_vector(p.name, p.description) @@ q.query
+          and p.id = any(p_project_ids)
+        union all
+        select 'document', d.id, d.title, d.content, d.project_id,
+               ts_rank_cd(documents_search_vector(d.title, d.content), q.query)
+        from documents d, q
+        where 'document' = any(p_types)
+          and documents_search_vector(d.title, d.content) @@ q.query
+          and (d.owner_id = p_user_id
+               or d.project_id = any(p_project_ids)
+               or d.team_id = any(p_team_ids)
+               or exists (
+                   select 1 from document_shares s
+                   where s.document_id = d.id and s.user_id = p_user_id
+               ))
+    ),
+    page as (
+        select hits.*, count(*) over () as total_count
+        from hits
+        order by rank desc, id
+        limit p_limit offset p_offset
+    )
+    -- Highlighting is the expensive part, so only do it for the returned page
+    select page.type, page.id, page.title,
+           ts_headline('english', coalesce(page.body, page.title), q.query,
+                       'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5'),
+           page.project_id, page.rank, page.total_count
+    from page, q
+    order by page.rank desc, page.id
+$$;
@@ -0,0 +1,8 @@
+-- Index-backed substring search on profiles for GET /users/search.
+-- Trigram GIN indexes serve `ilike '%term%'` without a sequential scan.
+create extension if not exists pg_trgm;
+
+create index if not exists profiles_email_trgm_idx
+    on profiles using gin (email gin_trgm_ops);
+create index if not exists profiles_full_name_trgm_idx
+    on profiles using gin (full_name gin_trgm_ops);
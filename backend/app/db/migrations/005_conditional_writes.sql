@@ -0,0 +1,146 @@
+-- Single-round-trip checked writes for the update and delete routes.
+--
+-- Each function locks the target row, applies the same ownership rule the API
+-- used to check with a separate SELECT, and reports the outcome in one call:
+-- {"outcome": "not_found" | "forbidden" | "updated" | "deleted", ...}.
+-- Simple owner-only updates (projects, teams) do not need a function; the API
+-- issues `update ... where id = ? and owner_id = ?` and only looks the row up
+-- again when nothing matched.
+--
+-- p_user_id comes from the verified token, so only the service role may call
+-- these.
+
+-- PUT /tasks/{id}: creator, assignee or project owner.
+-- p_changes holds only the fields being set; returns the previous status and
+-- project name for the completion activity.
+create or replace function update_task_checked(p_task_id uuid, p_user_id uuid, p_changes jsonb)
+returns jsonb language plpgsql as $$
+declare
+    v_task tasks%rowtype;
+    v_new tasks%rowtype;
+    v_project projects%rowtype;
+begin
+    select * into v_task from tasks where id = p_task_id for update;
+    if not found then
+        return jsonb_build_object('outcome', 'not_found');
+    end if;
+
+    select * into v_project from projects where id = v_task.project_id;
+    if not (v_task.creator_id = p_user_id
+            or v_task.assignee_id is not distinct from p_user_id
+            or v_project.owner_id is not distinct from p_user_id) then
+        return jsonb_build_object('outcome', 'forbidden');
+    end if;
+
+    v_new := jsonb_populate_record(v_task, p_changes);
+    update tasks set
+        title = v_new.title,
+        description = v_new.description,
+        status = v_new.status,
+        priority = v_new.priority,
+        due_date = v_new.due_date,
+        assignee_id = v_new.assignee_id
+    where id = p_task_id
+    returning * into v_new;
+
+    return jsonb_build_object(
+        'outcome', 'updated',
+        'task', to_jsonb(v_new),
+        'previous_status', v_task.status,
+        'project_name', v_project.name
+    );
+end;
+$$;
+
+-- DELETE /tasks/{id}: creator or project owner.
+create or replace function delete_task_checked(p_task_id uuid, p_user_id uuid)
+returns jsonb language plpgsql as $$
+declare
+    v_task tasks%rowtype;
+begin
+    select * into v_task from tasks where id = p_task_id for update;
+    if not found then
+        return jsonb_build_object('outcome', 'not_found');
+    end if;
+
+    if not (v_task.creator_id = p_user_id
+            or exists (select 1 from projects where id = v_task.project_id and owner_id = p_user_id)) then
+        return jsonb_build_object('outcome', 'forbidden');
+    end if;
+
+    delete from tasks where id = p_task_id;
+    return jsonb_build_object('outcome', 'deleted', 'project_id', v_task.project_id);
+end;
+$$;
+
+-- DELETE /projects/{id}: owner only. Tasks and the project go in one transaction.
+create or replace function delete_project_checked(p_project_id uuid, p_user_id uuid)
+returns jsonb language plpgsql as $$
+declare
+    v_project projects%rowtype;
+    v_task_ids jsonb;
+begin
+    select * into v_project from projects where id = p_project_id for update;
+    if not found then
+        return jsonb_build_object('outcome', 'not_found');
+    end if;
+    if v_project.owner_id <> p_user_id then
+        return jsonb_build_object('outcome', 'forbidden');
+    end if;
+
+    with deleted as (
+        delete from tasks where project_id = p_project_id returning id
+    )
+    select coalesce(jsonb_agg(id), '[]'::jsonb) into v_task_ids from deleted;
+    delete from projects where id = p_project_id;
+
+    return jsonb_build_object(
+        'outcome', 'deleted',
+        'task_ids', v_task_ids,
+        'public_id', v_project.public_id
+    );
+end;
+$$;
+
+-- DELETE /teams/{id}: owner only. Projects are detached, not deleted.
+create or replace function delete_team_checked(p_team_id uuid, p_user_id uuid)
+returns jsonb language plpgsql as $$
+declare
+    v_owner_id uuid;
+    v_project_ids jsonb;
+    v_member_ids jsonb;
+begin
+    select owner_id into v_owner_id from teams where id = p_team_id for update;
+    if not found then
+        return jsonb_build_object('outcome', 'not_found');
+    end if;
+    if v_owner_id <> p_user_id then
+        return jsonb_build_object('outcome', 'forbidden');
+    end if;
+
+    with detached as (
+        update projects set team_id = null where team_id = p_team_id returning id
+    )
+    select coalesce(jsonb_agg(id), '[]'::jsonb) into v_project_ids from detached;
+    with removed as (
+        delete from team_members where team_id = p_team_id returning user_id
+    )
+    select coalesce(jsonb_agg(user_id), '[]'::jsonb) into v_member_ids from removed;
+    delete from teams where id = p_team_id;
+
+    return jsonb_build_object(
+        'outcome', 'deleted',
+        'project_ids', v_project_ids,
+        'member_ids', v_member_ids
+    );
+end;
+$$;
+
+revoke execute on function update_task_checked(uuid, uuid, jsonb) from public, anon, authenticated;
+revoke execute on function delete_task_checked(uuid, uuid) from public, anon, authenticated;
+revoke execute on function delete_project_checked(uuid, uuid) from public, anon, authenticated;
+revoke execute on function delete_team_checked(uuid, uuid) from public, anon, authenticated;
+grant execute on function update_task_checked(uuid, uuid, jsonb) to service_role;
+grant execute on function delete_task_checked(uuid, uuid) to service_role;
+grant execute on function delete_project_checked(uuid, uuid) to service_role;
+grant execute on function delete_team_checked(uuid, uuid) to service_role;
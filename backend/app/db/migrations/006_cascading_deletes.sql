@@ -0,0 +1,270 @@
+-- Referential cascades, soft delete for large projects and a batched purge.
+--
+-- Deleting a team or project no longer depends on the API issuing child
+-- deletes first: tasks and memberships cascade, projects are detached from a
+-- deleted team. Projects with many tasks are only marked deleted_at by
+-- delete_project_checked; purge_deleted_projects then removes their tasks in
+-- bounded batches so no single statement holds locks on a huge row set.
+-- Until then, search and the checked task writes treat tasks of a
+-- soft-deleted project as gone, like the API's `select_active_tasks`.
+
+create index if not exists tasks_project_id_idx on tasks (project_id);
+
+alter table tasks
+    drop constraint if exists tasks_project_id_fkey,
+    add constraint tasks_project_id_fkey
+        foreign key (project_id) references projects (id) on delete cascade;
+
+alter table team_members
+    drop constraint if exists team_members_team_id_fkey,
+    add constraint team_members_team_id_fkey
+        foreign key (team_id) references teams (id) on delete cascade;
+
+alter table projects
+    drop constraint if exists projects_team_id_fkey,
+    add constraint projects_team_id_fkey
+        foreign key (team_id) references teams (id) on delete set null;
+
+alter table projects add column if not exists deleted_at timestamptz;
+
+-- Only rows waiting for the purge are indexed
+create index if not exists projects_pending_purge_idx
+    on projects (deleted_at) where deleted_at is not null;
+
+-- Replaces the 005 version: soft-deletes projects above p_soft_delete_threshold tasks.
+drop function if exists delete_project_checked(uuid, uuid);
+create or replace function delete_project_checked(
+    p_project_id uuid,
+    p_user_id uuid,
+    p_soft_delete_threshold integer default 1000
+)
+returns jsonb language plpgsql as $$
+declare
+    v_project projects%rowtype;
+    v_task_count integer;
+    v_task_ids jsonb;
+begin
+    select * into v_project from projects
+    where id = p_project_id and deleted_at is null
+    for update;
+    if not found then
+        return jsonb_build_object('outcome', 'not_found');
+    end if;
+    if v_project.owner_id <> p_user_id then
+        return jsonb_build_object('outcome', 'forbidden');
+    end if;
+
+    -- Only count as far as the threshold
+    select count(*) into v_task_count from (
+        select 1 from tasks where project_id = p_project_id limit p_soft_delete_threshold + 1
+    ) t;
+
+    if v_task_count > p_soft_delete_threshold then
+        update projects set deleted_at = now() where id = p_project_id;
+        return jsonb_build_object(
+            'outcome', 'deleted',
+            'soft', true,
+            'task_ids', '[]'::jsonb,
+            'public_id', v_project.public_id
+        );
+    end if;
+
+    -- Small project: delete now, returning task ids for cache invalidation
+    with deleted as (
+        delete from tasks where project_id = p_project_id returning id
+    )
+    select coalesce(jsonb_agg(id), '[]'::jsonb) into v_task_ids from deleted;
+    delete from projects where id = p_project_id;
+
+    return jsonb_build_object(
+        'outcome', 'deleted',
+        'soft', false,
+        'task_ids', v_task_ids,
+        'public_id', v_project.public_id
+    );
+end;
+$$;
+
+-- One bounded purge step for the oldest soft-deleted project. Deletes up to
+-- p_batch_size of its tasks, and the project itself once none are left.
+-- Workers running concurrently skip each other's locked project.
+create or replace function purge_deleted_projects(p_batch_size integer default 1000)
+returns jsonb language plpgsql as $$
+declare
+    v_project_id uuid;
+    v_task_ids jsonb;
+    v_task_count integer;
+begin
+    select id into v_project_id from projects
+    where deleted_at is not null
+    order by deleted_at
+    limit 1
+    for update skip locked;
+    if not found then
+        return jsonb_build_object('project_id', null, 'task_ids', '[]'::jsonb, 'project_deleted', false);
+    end if;
+
+    with deleted as (
+        delete from tasks
+        where id in (select id from tasks where project_id = v_project_id limit p_batch_size)
+        returning id
+    )
+    select count(*), coalesce(jsonb_agg(id), '[]'::jsonb) into v_task_count, v_task_ids from deleted;
+
+    if v_task_count < p_batch_size then
+        delete from projects where id = v_project_id;
+    end if;
+
+    return jsonb_build_object(
+        'project_id', v_project_id,
+        'task_ids', v_task_ids,
+        'project_deleted', v_task_count < p_batch_size
+    );
+end;
+$$;
+
+-- Replaces the 003 version: the tasks branch skips tasks of soft-deleted projects.
+create or replace function search_workspace(
+    p_query text,
+    p_user_id uuid,
+    p_project_ids uuid[],
+    p_team_ids uuid[],
+    p_types text[] default array['task', 'project', 'document'],
+    p_limit integer default 20,
+    p_offset integer default 0
+)
+returns table (
+    type text,
+    id uuid,
+    title text,
+    highlight text,
+    project_id uuid,
+    rank real,
+    total_count bigint
+)
+language sql stable as $$
+    with q as (
+        select websearch_to_tsquery('english', p_query) as query
+    ),
+    hits as (
+        select 'task'::text as type, t.id, t.title, t.description as body, t.project_id,
+               ts_rank_cd(tasks_search_vector(t.title, t.description), q.query) as rank
+        from tasks t
+        join projects p on p.id = t.project_id and p.deleted_at is null, q
+        where 'task' = any(p_types)
+          and tasks_search_vector(t.title, t.description) @@ q.query
+          and (t.creator_id = p_user_id
+               or t.assignee_id = p_user_id
+               or t.project_id = any(p_project_ids))
+        union all
+        select 'project', p.id, p.name, p.description, p.id,
+               ts_rank_cd(projects_search_vector(p.name, p.description), q.query)
+        from projects p, q
+        where 'project' = any(p_types)
+          and projects_search_vector(p.name, p.description) @@ q.query
+          and p.id = any(p_project_ids)
+        union all
+        select 'document', d.id, d.title, d.content, d.project_id,
+               ts_rank_cd(documents_search_vector(d.title, d.content), q.query)
+        from documents d, q
+        where 'document' = any(p_types)
+          and documents_search_vector(d.title, d.content) @@ q.query
+          and (d.owner_id = p_user_id
+               or d.project_id = any(p_project_ids)
+               or d.team_id = any(p_team_ids)
+               or exists (
+                   select 1 from document_shares s
+                   where s.document_id = d.id and s.user_id = p_user_id
+               ))
+    ),
+    page as (
+        select hits.*, count(*) over () as total_count
+        from hits
+        order by rank desc, id
+        limit p_limit offset p_offset
+    )
+    -- Highlighting is the expensive part, so only do it for the returned page
+    select page.type, page.id, page.title,
+           ts_headline('english', coalesce(page.body, page.title), q.query,
+                       'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5'),
+           page.project_id, page.rank, page.total_count
+    from page, q
+    order by page.rank desc, page.id
+$$;
+
+-- Replaces the 005 version: a task of a soft-deleted project is not_found, and
+-- the project's public_id is returned so only shared projects rebuild a snapshot.
+create or replace function update_task_checked(p_task_id uuid, p_user_id uuid, p_changes jsonb)
+returns jsonb language plpgsql as $$
+declare
+    v_task tasks%rowtype;
+    v_new tasks%rowtype;
+    v_project projects%rowtype;
+begin
+    select t.* into v_task from tasks t
+    join projects p on p.id = t.project_id
+    where t.id = p_task_id and p.deleted_at is null
+    for update of t;
+    if not found then
+        return jsonb_build_object('outcome', 'not_found');
+    end if;
+
+    select * into v_project from projects where id = v_task.project_id;
+    if not (v_task.creator_id = p_user_id
+            or v_task.assignee_id is not distinct from p_user_id
+            or v_project.owner_id is not distinct from p_user_id) then
+        return jsonb_build_object('outcome', 'forbidden');
+    end if;
+
+    v_new := jsonb_populate_record(v_task, p_changes);
+    update tasks set
+        title = v_new.title,
+        description = v_new.description,
+        status = v_new.status,
+        priority = v_new.priority,
+        due_date = v_new.due_date,
+        assignee_id = v_new.assignee_id
+    where id = p_task_id
+    returning * into v_new;
+
+    return jsonb_build_object(
+        'outcome', 'updated',
+        'task', to_jsonb(v_new),
+        'previous_status', v_task.status,
+        'project_name', v_project.name,
+        'public_id', v_project.public_id
+    );
+end;
+$$;
+
+-- Replaces the 005 version: a task of a soft-deleted project is not_found, and
+-- the project's public_id is returned as for updates.
+create or replace function delete_task_checked(p_task_id uuid, p_user_id uuid)
+returns jsonb language plpgsql as $$
+declare
+    v_task tasks%rowtype;
+    v_owner_id uuid;
+    v_public_id uuid;
+begin
+    select t.* into v_task from tasks t
+    join projects p on p.id = t.project_id
+    where t.id = p_task_id and p.deleted_at is null
+    for update of t;
+    if not found then
+        return jsonb_build_object('outcome', 'not_found');
+    end if;
+
+    select owner_id, public_id into v_owner_id, v_public_id from projects where id = v_task.project_id;
+    if not (v_task.creator_id = p_user_id or v_owner_id is not distinct from p_user_id) then
+        return jsonb_build_object('outcome', 'forbidden');
+    end if;
+
+    delete from tasks where id = p_task_id;
+    return jsonb_build_object('outcome', 'deleted', 'project_id', v_task.project_id, 'public_id', v_public_id);
+end;
+$$;
+
+revoke execute on function delete_project_checked(uuid, uuid, integer) from public, anon, authenticated;
+revoke execute on function purge_deleted_projects(integer) from public, anon, authenticated;
+grant execute on function delete_project_checked(uuid, uuid, integer) to service_role;
+grant execute on function purge_deleted_projects(integer) to service_role;
@@ -0,0 +1,72 @@
+-- Page comment threads in the database instead of building the whole forest.
+--
+-- thread_id is the id of a comment's top-level ancestor (its own id for a
+-- top-level comment), set on insert. GET /documents/{id}/comments then reads
+-- one page of top-level comments and the replies of just those threads.
+-- Moving a comment to another parent re-threads its replies as well.
+
+alter table document_comments add column if not exists thread_id uuid;
+
+with recursive threads as (
+    select id, id as thread_id from document_comments where parent_id is null
+    union all
+    select c.id, t.thread_id
+    from document_comments c
+    join threads t on c.parent_id = t.id
+)
+update document_comments c set thread_id = t.thread_id
+from threads t
+where c.id = t.id and c.thread_id is null;
+
+create or replace function set_comment_thread_id()
+returns trigger language plpgsql as $$
+begin
+    if new.parent_id is null then
+        new.thread_id := new.id;
+    else
+        select coalesce(thread_id, id) into new.thread_id
+        from document_comments where id = new.parent_id;
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists document_comments_thread_id on document_comments;
+create trigger document_comments_thread_id
+    before insert or update of parent_id on document_comments
+    for each row execute function set_comment_thread_id();
+
+-- Descendants keep their parent_id, so the trigger above does not fire for them
+create or replace function cascade_comment_thread_id()
+returns trigger language plpgsql as $$
+begin
+    with recursive descendants as (
+        select id from document_comments where parent_id = new.id
+        union
+        select c.id
+        from document_comments c
+        join descendants d on c.parent_id = d.id
+    )
+    update document_comments c set thread_id = new.thread_id
+    from descendants d
+    where c.id = d.id and c.thread_id is distinct from new.thread_id;
+    return null;
+end;
+$$;
+
+drop trigger if exists document_comments_thread_id_cascade on document_comments;
+create trigger document_comments_thread_id_cascade
+    after update of parent_id on document_comments
+    for each row
+    when (old.thread_id is distinct from new.thread_id)
+    execute function cascade_comment_thread_id();
+
+-- Top-level comments of a document, in page order
+create index if not exists document_comments_roots_idx
+    on document_comments (document_id, created_at) where parent_id is null;
+-- Replies of the threads on one page
+create index if not exists document_comments_thread_id_created_at_idx
+    on document_comments (thread_id, created_at);
+
+-- The 001 index served whole-document reads, which nothing issues any more
+drop index if exists document_comments_document_id_created_at_idx;
@@ -0,0 +1,125 @@
+-- Search chunked document bodies where they are stored.
+--
+-- Chunked edits only write document_chunks, so documents.content goes stale
+-- once a document is chunked. Each chunk is indexed on its own and
+-- search_workspace ranks a document by its best-matching chunks, so a
+-- one-chunk edit re-indexes one chunk instead of rewriting the whole body.
+-- Documents without chunks are still searched through documents.content.
+-- A phrase split across two chunks does not match as a phrase.
+
+-- An earlier revision rebuilt documents.content from every chunk on each write
+drop trigger if exists document_chunks_content_insert on document_chunks;
+drop trigger if exists document_chunks_content_update on document_chunks;
+drop trigger if exists document_chunks_content_delete on document_chunks;
+drop function if exists refresh_document_content();
+
+create or replace function document_chunks_search_vector(content text)
+returns tsvector language sql immutable parallel safe as $$
+    select setweight(to_tsvector('english', coalesce(content, '')), 'C')
+$$;
+
+create or replace function documents_title_search_vector(title text)
+returns tsvector language sql immutable parallel safe as $$
+    select setweight(to_tsvector('english', coalesce(title, '')), 'A')
+$$;
+
+create index if not exists document_chunks_search_idx
+    on document_chunks using gin (document_chunks_search_vector(content));
+create index if not exists documents_title_search_idx
+    on documents using gin (documents_title_search_vector(title));
+
+-- Replaces the 006 version: document bodies come from their chunks.
+create or replace function search_workspace(
+    p_query text,
+    p_user_id uuid,
+    p_project_ids uuid[],
+    p_team_ids uuid[],
+    p_types text[] default array['task', 'project', 'document'],
+    p_limit integer default 20,
+    p_offset integer default 0
+)
+returns table (
+    type text,
+    id uuid,
+    title text,
+    highlight text,
+    project_id uuid,
+    rank real,
+    total_count bigint
+)
+language sql stable as $$
+    with q as (
+        select websearch_to_tsquery('english', p_query) as query
+    ),
+    document_matches as (
+        -- Chunked bodies, one row per matching chunk
+        select c.document_id as id,
+               ts_rank_cd(document_chunks_search_vector(c.content), q.query) as rank,
+               c.content as body
+        from document_chunks c, q
+        where 'document' = any(p_types)
+          and document_chunks_search_vector(c.content) @@ q.query
+        union all
+        -- Titles of chunked documents
+        select d.id, ts_rank_cd(documents_title_search_vector(d.title), q.query), null
+        from documents d, q
+        where 'document' = any(p_types)
+          and documents_title_search_vector(d.title) @@ q.query
+          and exists (select 1 from document_chunks c where c.document_id = d.id)
+        union all
+        -- Documents not chunked yet, title and body together
+        select d.id, ts_rank_cd(documents_search_vector(d.title, d.content), q.query), d.content
+        from documents d, q
+        where 'document' = any(p_types)
+          and documents_search_vector(d.title, d.content) @@ q.query
+          and not exists (select 1 from document_chunks c where c.document_id = d.id)
+    ),
+    document_hits as (
+        select m.id, sum(m.rank)::real as rank,
+               (array_agg(m.body order by m.rank desc) filter (where m.body is not null))[1] as body
+        from document_matches m
+        group by m.id
+    ),
+    hits as (
+        select 'task'::text as type, t.id, t.title, t.description as body, t.project_id,
+               ts_rank_cd(tasks_search_vector(t.title, t.description), q.query) as rank
+        from tasks t
+        join projects p on p.id = t.project_id and p.deleted_at is null, q
+        where 'task' = any(p_types)
+          and tasks_search_vector(t.title, t.description) @@ q.query
+          and (t.creator_id = p_user_id
+               or t.assignee_id = p_user_id
+               or t.project_id = any(p_project_ids))
+        union all
+        select 'project', p.id, p.name, p.description, p.id,
+               ts_rank_cd(projects_search_vector(p.name, p.description), q.query)
+        from projects p, q
+        where 'project' = any(p_types)
+          and projects_search_vector(p.name, p.description) @@ q.query
+          and p.id = any(p_project_ids)
+        union all
+        select 'document', d.id, d.title, h.body, d.project_id, h.rank
+        from document_hits h
+        join documents d on d.id = h.id
+        where d.owner_id = p_user_id
+           or d.project_id = any(p_project_ids)
+           or d.team_id = any(p_team_ids)
+           or exists (
+               select 1 from document_shares s
+               where s.document_id = d.id and s.user_id = p_user_id
+           )
+    ),
+    page as (
+        select hits.*, count(*) over () as total_count
+        from hits
+        order by rank desc, id
+        limit p_limit offset p_offset
+    )
+    -- Highlighting is the expensive part, so only do it for the returned page
+    select page.type, page.id, page.title,
+           ts_headline('english', coalesce(page.body, page.title), q.query,
+                       'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=20, MinWords=5'),
+           page.project_id, page.rank, page.total_count
+    from page, q
+    order by page.rank desc, page.id
+$$;
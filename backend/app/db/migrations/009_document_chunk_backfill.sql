@@ -0,0 +1,16 @@
+-- One-off conversion of documents stored only in documents.content.
+--
+-- Replaces chunking legacy documents on first read. 16384 characters are at
+-- most 65536 UTF-8 bytes, so every chunk fits DOCUMENT_CHUNK_SIZE (64 KiB);
+-- lower the step if that setting is lowered. Documents that already have
+-- chunks are skipped, so the migration can be re-run.
+
+insert into document_chunks (document_id, chunk_index, content, byte_length)
+select d.id,
+       g.chunk_index,
+       substr(d.content, g.chunk_index * 16384 + 1, 16384),
+       octet_length(substr(d.content, g.chunk_index * 16384 + 1, 16384))
+from documents d
+cross join lateral generate_series(0, (char_length(d.content) - 1) / 16384) as g(chunk_index)
+where coalesce(d.content, '') <> ''
+  and not exists (select 1 from document_chunks c where c.document_id = d.id);
@@ -0,0 +1,19 @@
+-- Task import jobs, so any worker can report an import's progress and jobs
+-- survive restarts. Rows are written when an import starts, after every
+-- batch and when it finishes; finished jobs are deleted after
+-- IMPORT_JOB_RETENTION_DAYS.
+create table if not exists task_imports (
+    id uuid primary key,
+    project_id uuid not null references projects (id) on delete cascade,
+    user_id uuid not null,
+    status text not null default 'pending',
+    processed integer not null default 0,
+    inserted integer not null default 0,
+    failed integer not null default 0,
+    errors jsonb not null default '[]'::jsonb,
+    created_at timestamptz not null default now(),
+    finished_at timestamptz
+);
+
+-- Finished jobs, for the retention delete
+create index if not exists task_imports_finished_at_idx on task_imports (finished_at) where finished_at is not null;
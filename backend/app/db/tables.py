@@ -78,6 +78,16 @@ documents = Table(
     Column("updated_at", DateTime, server_default=func.now(), onupdate=func.now())
 )
 
+document_chunks = Table(
+    "document_chunks",
+    metadata,
+    Column("document_id", String, ForeignKey("documents.id"), primary_key=True),
+    Column("chunk_index", Integer, primary_key=True),
+    Column("content", String, nullable=False),
+    Column("byte_length", Integer, nullable=False),
+    Column("updated_at", DateTime, server_default=func.now(), onupdate=func.now())
+)
+
 document_versions = Table(
     "document_versions",
     metadata,
@@ -1,13 +1,19 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from supabase.client import Client
-from .database import get_supabase_client
+from typing import TYPE_CHECKING, Any
+from .database import Client, get_supabase_client
+from .config import get_settings
+from .services.profile_loader import ProfileLoader
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    from gotrue import User
+else:
+    # Annotation only; importing gotrue is deferred along with supabase (see database.py)
+    User = Any
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
 def get_current_user(token: str = Depends(oauth2_scheme), supabase: Client = Depends(get_supabase_client)):
@@ -23,11 +29,11 @@ def get_current_user(token: str = Depends(oauth2_scheme), supabase: Client = Dep
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-        logger.debug(f"Authenticated user: {response.user.id}")
+        logger.debug("Authenticated user: %s", response.user.id)
         return response.user
         
     except Exception as e:
-        logger.error(f"Authentication error: {str(e)}")
+        logger.error("Authentication error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -48,4 +54,18 @@ def get_current_user_optional(token: str = Depends(oauth2_scheme), supabase: Cli
         return response.user
         
     except Exception:
-        return None
\ No newline at end of file
+        return None
+
+def get_current_admin(current_user = Depends(get_current_user)):
+    """Require the authenticated user to be listed in ADMIN_USER_IDS"""
+    admin_ids = {user_id.strip() for user_id in get_settings().ADMIN_USER_IDS.split(",") if user_id.strip()}
+    if current_user.id not in admin_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+def get_profile_loader(supabase: Client = Depends(get_supabase_client)) -> ProfileLoader:
+    """One loader per request, so every profile lookup made while serving it is batched"""
+    return ProfileLoader(supabase)
@@ -1,17 +1,40 @@
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .api import api_router
 from .config import get_settings
+from .core.logging import configure_logging
+from .core.instrumentation import RouteStats, check_query_budget, current_timings, end_request, start_request
+from .core.metrics import REQUEST_LATENCY, registry
+from .core.responses import FastJSONResponse
+from .core.compression import CompressionMiddleware
+from .database import get_supabase_client
+from .services.jobs import job_queue
+from .services.purge import project_purger
+from contextlib import asynccontextmanager
 import logging
-import os
+import time
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+settings = get_settings()
+
+configure_logging(settings)
 logger = logging.getLogger(__name__)
 
-settings = get_settings()
+if settings.PROFILE_SIGNAL_ENABLED:
+    from .core.profiler import install_signal_handler
+    install_signal_handler()
 
-app = FastAPI(title=settings.APP_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Recover jobs a stopped process left pending before serving requests
+    await job_queue.start()
+    # Finish purging projects soft-deleted before this process started
+    project_purger.ensure_running(get_supabase_client())
+    yield
+    project_purger.stop()
+    job_queue.stop()
+
+app = FastAPI(title=settings.APP_NAME, default_response_class=FastJSONResponse, lifespan=lifespan)
 
 # Add CORS middleware - handles both development and production
 origins = [
@@ -20,12 +43,9 @@ origins = [
     "http://localhost:3000",  # Alternative dev port
 ]
 
-# Add production frontend URL from environment variable
-frontend_url = os.getenv("FRONTEND_URL")
-if frontend_url:
-    origins.append(frontend_url)
-
-
+# Add production frontend URL from settings
+if settings.FRONTEND_URL:
+    origins.append(settings.FRONTEND_URL)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,13 +55,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add request logging middleware
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+route_stats = RouteStats(log_interval=settings.ROUTE_STATS_LOG_INTERVAL_SECONDS)
+
+# Add request timing middleware: upstream spans, Server-Timing and per-route stats
 @app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.debug(f"Incoming request: {request.method} {request.url}")
-    response = await call_next(request)
-    logger.debug(f"Response status: {response.status_code}")
-    return response
+async def request_timing(request: Request, call_next):
+    token = start_request(request.scope)
+    try:
+        timings = current_timings()
+        response = await call_next(request)
+        elapsed = time.perf_counter() - timings.start
+
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        route_stats.record(f"{request.method} {route_path}", timings, elapsed)
+        REQUEST_LATENCY.observe(
+            elapsed,
+            method=request.method,
+            route=route_path,
+            status=str(response.status_code)
+        )
+        registry.maybe_flush()
+
+        if settings.QUERY_BUDGET_ENABLED and route is not None:
+            check_query_budget(
+                f"{request.method} {route_path}",
+                getattr(route, "endpoint", None),
+                timings,
+                strict=settings.QUERY_BUDGET_STRICT
+            )
+
+        if settings.SERVER_TIMING_ENABLED:
+            response.headers["Server-Timing"] = timings.server_timing(elapsed)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s %s -> %s in %.1fms (%d queries)",
+                request.method, request.url.path, response.status_code,
+                elapsed * 1000, timings.count("db")
+            )
+        return response
+    finally:
+        end_request(token)
 
 # Include API routes
 app.include_router(api_router, prefix=settings.API_PREFIX)
@@ -54,6 +111,13 @@ async def root():
 async def health_check():
     return {"status": "healthy", "app_name": settings.APP_NAME}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Vercel handler
 handler = app
 
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List
+from .activity import ActivityResponse
+from .project import ProjectResponse
+from .task import TaskSummary
+from .team import TeamResponse
+
+class DashboardStats(BaseModel):
+    total_projects: int
+    active_projects: int
+    total_tasks: int
+    completed_tasks: int
+    overdue_tasks: int
+
+class BootstrapResponse(BaseModel):
+    projects: List[ProjectResponse]
+    tasks: List[TaskSummary]
+    teams: List[TeamResponse]
+    activities: List[ActivityResponse]
+    stats: DashboardStats
@@ -1,7 +1,10 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
+from ..config import get_settings
+
+settings = get_settings()
 
 class DocumentType(str, Enum):
     TEXT = "text"
@@ -66,4 +69,36 @@ class DocumentCollaborator(BaseModel):
     user_id: str
     cursor_position: Dict[str, int]  # For real-time collaboration
     selection_range: Optional[Dict[str, int]] = None
-    last_active: datetime 
\ No newline at end of file
+    last_active: datetime 
+
+class DocumentCommentThread(DocumentComment):
+    """A comment with its nested replies"""
+    replies: List["DocumentCommentThread"] = []
+
+class DocumentCommentThreadPage(BaseModel):
+    threads: List[DocumentCommentThread]
+    total: int
+    limit: int
+    offset: int
+
+class DocumentChunkInfo(BaseModel):
+    index: int
+    offset: int
+    length: int
+
+class DocumentManifest(BaseModel):
+    document_id: str
+    chunk_size: int
+    total_bytes: int
+    chunks: List[DocumentChunkInfo]
+
+class DocumentChunkUpdate(BaseModel):
+    # Character bound first (cheap), then the real limit in UTF-8 bytes
+    content: str = Field(..., max_length=settings.DOCUMENT_CHUNK_SIZE)
+
+    @field_validator("content")
+    @classmethod
+    def content_fits_one_chunk(cls, value: str) -> str:
+        if len(value.encode("utf-8")) > settings.DOCUMENT_CHUNK_SIZE:
+            raise ValueError(f"Chunk content exceeds {settings.DOCUMENT_CHUNK_SIZE} bytes")
+        return value
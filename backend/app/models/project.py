@@ -51,6 +51,10 @@ class ProjectResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
 class PublicProjectResponse(BaseModel):
     """Limited project info for public/guest viewing"""
     id: str
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from enum import Enum
+
+class SearchResultType(str, Enum):
+    TASK = "task"
+    PROJECT = "project"
+    DOCUMENT = "document"
+
+class SearchResult(BaseModel):
+    type: SearchResultType
+    id: str
+    title: str
+    highlight: Optional[str] = None  # Matching fragments wrapped in <mark>
+    project_id: Optional[str] = None
+    rank: float
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    total: int
+    limit: int
+    offset: int
@@ -34,6 +34,11 @@ class TaskUpdate(TaskBase):
     priority: Optional[TaskPriority] = None
     assignee_id: Optional[str] = None
 
+class TaskAssignee(BaseModel):
+    id: str
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+
 class TaskResponse(TaskBase):
     id: str
     project_id: str
@@ -42,5 +47,41 @@ class TaskResponse(TaskBase):
     created_at: datetime
     updated_at: datetime
     
+    # Related data, resolved by list endpoints
+    assignee: Optional[TaskAssignee] = None
+    
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TaskSummary(BaseModel):
+    """Card-sized task row for dashboard views"""
+    id: str
+    title: str
+    status: TaskStatus
+    priority: TaskPriority
+    project_id: str
+    assignee_id: Optional[str] = None
+    due_date: Optional[datetime] = None
+    updated_at: datetime
+
+class TaskImportStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class TaskImportError(BaseModel):
+    row: int  # 1-based data row (CSV header excluded)
+    message: str
+
+class TaskImportJob(BaseModel):
+    id: str
+    project_id: str
+    user_id: str
+    status: TaskImportStatus = TaskImportStatus.PENDING
+    processed: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[TaskImportError] = []
+    created_at: datetime
+    finished_at: Optional[datetime] = None
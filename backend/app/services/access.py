@@ -0,0 +1,89 @@
+from typing import Any, Dict, Iterable, List, Optional
+from ..database import Client
+from .cache import membership_cache, project_cache, task_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+def get_project_row(supabase: Client, project_id: str) -> Optional[Dict[str, Any]]:
+    """Get a full `projects` row by id, through the project cache"""
+    def load():
+        response = supabase.table("projects").select("*").eq("id", project_id).is_("deleted_at", "null").execute()
+        return response.data[0] if response.data else None
+
+    return project_cache.get_or_load(project_id, load)
+
+def get_task_row(supabase: Client, task_id: str) -> Optional[Dict[str, Any]]:
+    """Get a full `tasks` row by id, through the task cache; pair with `get_project_row` to skip soft-deleted projects"""
+    def load():
+        response = supabase.table("tasks").select("*").eq("id", task_id).execute()
+        return response.data[0] if response.data else None
+
+    return task_cache.get_or_load(task_id, load)
+
+def get_user_team_ids(supabase: Client, user_id: str) -> List[str]:
+    """Get the ids of every team the user belongs to"""
+    def load():
+        team_memberships = supabase.table("team_members").select("team_id").eq("user_id", user_id).execute()
+        return [tm["team_id"] for tm in (team_memberships.data or [])]
+
+    return membership_cache.get_or_load(f"user:{user_id}", load)
+
+def is_team_member(supabase: Client, team_id: str, user_id: str) -> bool:
+    """Check team membership, through the membership cache"""
+    def load():
+        team_member = supabase.table("team_members").select("user_id").eq("team_id", team_id).eq("user_id", user_id).execute()
+        return bool(team_member.data)
+
+    return membership_cache.get_or_load(f"{team_id}:{user_id}", load)
+
+def invalidate_project(*project_ids: str):
+    """Drop cached project rows after they were updated or deleted"""
+    project_cache.invalidate(*project_ids)
+
+def invalidate_membership(team_id: str, user_ids: Iterable[str]):
+    """Drop cached membership for users who joined or left a team"""
+    keys = []
+    for user_id in user_ids:
+        keys += [f"{team_id}:{user_id}", f"user:{user_id}"]
+    membership_cache.invalidate(*keys)
+
+def get_accessible_project_ids(
+    supabase: Client,
+    user_id: str,
+    team_ids: Optional[List[str]] = None
+) -> List[str]:
+    """Get the ids of projects the user owns or can reach through a team"""
+    owned_projects = supabase.table("projects").select("id").eq("owner_id", user_id).is_("deleted_at", "null").execute()
+    owned_project_ids = [p["id"] for p in (owned_projects.data or [])]
+
+    if team_ids is None:
+        team_ids = get_user_team_ids(supabase, user_id)
+
+    team_project_ids = []
+    if team_ids:
+        team_projects = supabase.table("projects").select("id").in_("team_id", team_ids).is_("deleted_at", "null").execute()
+        team_project_ids = [p["id"] for p in (team_projects.data or [])]
+
+    return list(set(owned_project_ids + team_project_ids))
+
+def select_active_tasks(supabase: Client, columns: str = "*", count: Optional[str] = None, head: bool = False):
+    """`tasks` select that skips tasks of soft-deleted projects still waiting for the purge"""
+    return supabase.table("tasks").select(f"{columns}, projects!inner(deleted_at)", count=count, head=head).is_("projects.deleted_at", "null")
+
+def task_access_filter(user_id: str, project_ids: List[str]) -> str:
+    """PostgREST `or` filter matching tasks the user created, is assigned, or can see via a project"""
+    query_str = f"creator_id.eq.{user_id},assignee_id.eq.{user_id}"
+    if project_ids:
+        query_str += f",project_id.in.({','.join(project_ids)})"
+    return query_str
+
+def user_can_access_project(supabase: Client, project: Dict[str, Any], user_id: str) -> bool:
+    """Check the user owns the project or is a member of its team"""
+    if project["owner_id"] == user_id:
+        return True
+
+    if not project.get("team_id"):
+        return False
+
+    return is_team_member(supabase, project["team_id"], user_id)
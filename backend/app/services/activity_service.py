@@ -1,44 +1,53 @@
 from typing import List, Optional, Dict, Any
-from ..models.activity import ActivityType, ActivityCreate, ActivityResponse
-from ..database import get_supabase_client
-from supabase import Client
+from ..models.activity import ActivityType, ActivityResponse
+from ..database import Client
+from .jobs import job_queue
+from .profile_loader import ProfileLoader
+import asyncio
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+def _activity_row(
+    user_id: str,
+    activity_type: ActivityType,
+    target_id: str,
+    target_name: str,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return {
+        "type": activity_type.value,
+        "target_id": target_id,
+        "target_name": target_name,
+        "user_id": user_id,
+        "metadata": json.dumps(metadata) if metadata else None
+    }
+
+@job_queue.handler("log_activity")
+def _insert_activity(supabase: Client, **activity_data):
+    # Raises so the job queue retries failed inserts
+    supabase.table("activities").insert(activity_data).execute()
+
+def enqueue_activity(
+    user_id: str,
+    activity_type: ActivityType,
+    target_id: str,
+    target_name: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    idempotency_key: Optional[str] = None
+) -> bool:
+    """Log an activity after the response instead of inline; must be called on the event loop"""
+    return job_queue.enqueue(
+        "log_activity",
+        _activity_row(user_id, activity_type, target_id, target_name, metadata),
+        idempotency_key=idempotency_key
+    )
+
 class ActivityService:
-    def __init__(self, supabase: Client):
+    def __init__(self, supabase: Client, profiles: Optional[ProfileLoader] = None):
         self.supabase = supabase
-
-    async def log_activity(
-        self, 
-        user_id: str, 
-        activity_type: ActivityType, 
-        target_id: str, 
-        target_name: str,
-        metadata: Optional[Dict[str, Any]] = None
-    ) -> Optional[ActivityResponse]:
-        """Log a new activity to the database"""
-        try:
-            activity_data = {
-                "type": activity_type.value,
-                "target_id": target_id,
-                "target_name": target_name,
-                "user_id": user_id,
-                "metadata": json.dumps(metadata) if metadata else None
-            }
-            
-            response = self.supabase.table("activities").insert(activity_data).execute()
-            
-            if response.data and len(response.data) > 0:
-                return ActivityResponse(**response.data[0])
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Failed to log activity: {str(e)}")
-            return None
+        self.profiles = profiles or ProfileLoader(supabase)
 
     async def get_recent_activities(
         self, 
@@ -47,15 +56,18 @@ class ActivityService:
     ) -> List[ActivityResponse]:
         """Get recent activities for projects/teams the user has access to"""
         try:
-            # Get activities with user profile information
-            response = self.supabase.table("activities").select(
-                "*, profiles!activities_user_id_fkey(full_name, email)"
-            ).order("created_at", desc=True).limit(limit).execute()
+            # Sync client: run the select off the event loop so callers can gather it
+            response = await asyncio.to_thread(
+                self.supabase.table("activities").select("*").order("created_at", desc=True).limit(limit).execute
+            )
+            
+            # One batched (and usually cached) lookup for all authors instead of a join per row
+            profiles = await self.profiles.load_many(activity["user_id"] for activity in response.data)
             
             activities = []
             for activity_data in response.data:
                 # Extract profile data
-                profile = activity_data.get("profiles")
+                profile = profiles.get(activity_data["user_id"])
                 user_name = profile.get("full_name") if profile else None
                 user_email = profile.get("email") if profile else None
                 
@@ -86,29 +98,30 @@ class ActivityService:
             logger.error(f"Failed to get recent activities: {str(e)}")
             return []
 
-# Helper functions for logging specific activities
-async def log_project_created(user_id: str, project_id: str, project_name: str, supabase: Client):
-    service = ActivityService(supabase)
-    await service.log_activity(
+# Helper functions for logging specific activities. These only enqueue a job,
+# keyed by the event so a retried request does not log it twice.
+def log_project_created(user_id: str, project_id: str, project_name: str):
+    enqueue_activity(
         user_id=user_id,
         activity_type=ActivityType.PROJECT_CREATED,
         target_id=project_id,
-        target_name=project_name
+        target_name=project_name,
+        idempotency_key=f"project_created:{project_id}"
     )
 
-async def log_task_created(user_id: str, task_id: str, task_title: str, project_name: str, supabase: Client):
-    service = ActivityService(supabase)
-    await service.log_activity(
+def log_task_created(user_id: str, task_id: str, task_title: str, project_name: str):
+    enqueue_activity(
         user_id=user_id,
         activity_type=ActivityType.TASK_CREATED,
         target_id=task_id,
         target_name=task_title,
-        metadata={"project_name": project_name}
+        metadata={"project_name": project_name},
+        idempotency_key=f"task_created:{task_id}"
     )
 
-async def log_task_completed(user_id: str, task_id: str, task_title: str, project_name: str, supabase: Client):
-    service = ActivityService(supabase)
-    await service.log_activity(
+def log_task_completed(user_id: str, task_id: str, task_title: str, project_name: str):
+    # Not keyed: a task can be reopened and completed again
+    enqueue_activity(
         user_id=user_id,
         activity_type=ActivityType.TASK_COMPLETED,
         target_id=task_id,
@@ -116,21 +129,31 @@ async def log_task_completed(user_id: str, task_id: str, task_title: str, projec
         metadata={"project_name": project_name}
     )
 
-async def log_team_created(user_id: str, team_id: str, team_name: str, supabase: Client):
-    service = ActivityService(supabase)
-    await service.log_activity(
+def log_team_created(user_id: str, team_id: str, team_name: str):
+    enqueue_activity(
         user_id=user_id,
         activity_type=ActivityType.TEAM_CREATED,
         target_id=team_id,
-        target_name=team_name
+        target_name=team_name,
+        idempotency_key=f"team_created:{team_id}"
     )
 
-async def log_team_member_added(user_id: str, team_id: str, team_name: str, member_name: str, supabase: Client):
-    service = ActivityService(supabase)
-    await service.log_activity(
+def log_team_member_added(user_id: str, team_id: str, team_name: str, member_name: str):
+    # Not keyed: a member can leave and be added again
+    enqueue_activity(
         user_id=user_id,
         activity_type=ActivityType.TEAM_MEMBER_ADDED,
         target_id=team_id,
         target_name=team_name,
         metadata={"member_name": member_name}
-    ) 
\ No newline at end of file
+    )
+
+def log_tasks_imported(user_id: str, import_id: str, project_id: str, project_name: str, imported_count: int):
+    enqueue_activity(
+        user_id=user_id,
+        activity_type=ActivityType.PROJECT_UPDATED,
+        target_id=project_id,
+        target_name=project_name,
+        metadata={"imported_tasks": imported_count},
+        idempotency_key=f"task_import:{import_id}"
+    )
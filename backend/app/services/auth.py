@@ -1,10 +1,11 @@
-from ..database import get_supabase_client
+from ..database import get_auth_client
 from ..models.user import UserCreate, UserResponse
+from .profile_loader import invalidate_profile
 from typing import Optional, Dict, Any
 
 class AuthService:
     def __init__(self):
-        self.supabase = get_supabase_client()
+        self.supabase = get_auth_client()
     
     async def register_user(self, user_data: UserCreate) -> Dict[str, Any]:
         # Register user in Supabase Auth
@@ -22,6 +23,7 @@ class AuthService:
             }
             
             self.supabase.table("profiles").insert(profile_data).execute()
+            invalidate_profile(auth_response.user.id)
             
             return {
                 "message": "User registered successfully",
@@ -0,0 +1,179 @@
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from ..config import get_settings
+from ..core.metrics import CACHE_REQUESTS
+from ..core.responses import dumps
+import logging
+import time
+
+try:
+    import redis
+except ImportError:  # Optional: only needed for CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+class MemoryBackend:
+    """Per-process TTL + LRU store"""
+
+    def __init__(self, max_entries: int = settings.CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # Format: {key: (expires_at, value)}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisBackend:
+    """Shared store so every worker sees the same entries and invalidations"""
+
+    def __init__(self, url: str, prefix: str = "cpm:cache:"):
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        raw = self._redis.get(self.prefix + key)
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)["v"]
+
+    def set(self, key: str, value: Any, ttl: float):
+        # Wrapped so a cached "not found" (None) is distinguishable from a miss
+        self._redis.set(self.prefix + key, dumps({"v": value}), px=max(int(ttl * 1000), 1))
+
+    def delete(self, *keys: str):
+        if keys:
+            self._redis.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        for key in self._redis.scan_iter(match=self.prefix + "*"):
+            self._redis.delete(key)
+
+def create_backend():
+    """Backend selected by CACHE_BACKEND; falls back to memory if redis is unavailable"""
+    if settings.CACHE_BACKEND == "redis":
+        if redis is None:
+            logger.warning("CACHE_BACKEND=redis but the redis package is not installed; using the in-memory cache")
+        elif not settings.CACHE_REDIS_URL:
+            logger.warning("CACHE_BACKEND=redis but CACHE_REDIS_URL is not set; using the in-memory cache")
+        else:
+            return RedisBackend(settings.CACHE_REDIS_URL)
+    return MemoryBackend()
+
+class ReadThroughCache:
+    """
+    Named read-through cache over a shared backend.
+
+    Misses call the loader once per key at a time: concurrent misses for the
+    same key wait on a striped lock and then read the value the first caller
+    stored, instead of all querying Supabase. Loaders that return None are
+    cached for `negative_ttl` so repeated lookups of missing rows are cheap too.
+    """
+
+    _STRIPES = 64
+
+    def __init__(
+        self,
+        name: str,
+        backend: Any,
+        ttl: float = settings.CACHE_TTL_SECONDS,
+        negative_ttl: float = settings.CACHE_NEGATIVE_TTL_SECONDS
+    ):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._locks = [Lock() for _ in range(self._STRIPES)]
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        full_key = self._key(key)
+        found, value = self.backend.get(full_key)
+        if found:
+            CACHE_REQUESTS.inc(cache=self.name, result="hit")
+            return value
+
+        with self._locks[hash(full_key) % self._STRIPES]:
+            # Another caller may have loaded it while we waited
+            found, value = self.backend.get(full_key)
+            if found:
+                CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                return value
+
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            value = loader()
+            self.backend.set(full_key, value, self.ttl if value is not None else self.negative_ttl)
+            return value
+
+    def get_many_or_load(
+        self,
+        keys: Iterable[str],
+        loader: Callable[[List[str]], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Batch variant: `loader` receives every missing key at once and returns
+        the values it found; keys it leaves out are cached as not found.
+        """
+        values: Dict[str, Any] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(keys):
+            found, value = self.backend.get(self._key(key))
+            if found:
+                values[key] = value
+            else:
+                missing.append(key)
+        if values:
+            CACHE_REQUESTS.inc(len(values), cache=self.name, result="hit")
+        if not missing:
+            return values
+
+        CACHE_REQUESTS.inc(len(missing), cache=self.name, result="miss")
+        loaded = loader(missing)
+        for key in missing:
+            value = loaded.get(key)
+            self.backend.set(self._key(key), value, self.ttl if value is not None else self.negative_ttl)
+            values[key] = value
+        return values
+
+    def invalidate(self, *keys: str):
+        self.backend.delete(*(self._key(key) for key in keys))
+
+cache_backend = create_backend()
+
+# Full `projects` rows by id
+project_cache = ReadThroughCache("project", cache_backend)
+# Full `tasks` rows by id
+task_cache = ReadThroughCache("task", cache_backend)
+# "team_id:user_id" -> bool, and "user:user_id" -> list of team ids
+membership_cache = ReadThroughCache("membership", cache_backend)
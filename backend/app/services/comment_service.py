@@ -0,0 +1,64 @@
+from typing import List, Dict, Any, Tuple
+from ..models.document import DocumentCommentThread
+from ..database import Client
+import logging
+
+logger = logging.getLogger(__name__)
+
+def build_comment_forest(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Assemble flat comment rows into top-level threads in a single pass.
+
+    Rows must be ordered by created_at so replies keep their chronological
+    order. Comments whose parent is missing are treated as top-level threads.
+    """
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        nodes[row["id"]] = {**row, "replies": []}
+
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node.get("parent_id")) if node.get("parent_id") else None
+        if parent is not None:
+            parent["replies"].append(node)
+        else:
+            roots.append(node)
+
+    return roots
+
+class CommentService:
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+
+    async def get_comment_threads(
+        self,
+        document_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        include_resolved: bool = False
+    ) -> Tuple[List[DocumentCommentThread], int]:
+        """Load one page of top-level threads, then the replies of only those threads"""
+        # Served by the partial index on top-level comments (migration 007)
+        query = self.supabase.table("document_comments").select("*", count="exact").eq(
+            "document_id", document_id
+        ).is_("parent_id", "null")
+        if not include_resolved:
+            query = query.eq("resolved", False)
+        roots = query.order("created_at").range(offset, offset + limit - 1).execute()
+
+        root_rows = roots.data or []
+        total = roots.count or 0
+        if not root_rows:
+            return [], total
+
+        root_ids = [root["id"] for root in root_rows]
+        replies = self.supabase.table("document_comments").select("*").in_(
+            "thread_id", root_ids
+        ).order("created_at").execute()
+
+        # thread_id matches the top-level comments themselves too; keep only replies
+        forest = build_comment_forest(root_rows + [row for row in (replies.data or []) if row.get("parent_id")])
+        page = set(root_ids)
+        threads = [DocumentCommentThread(**root) for root in forest if root["id"] in page]
+
+        return threads, total
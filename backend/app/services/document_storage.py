@@ -0,0 +1,165 @@
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional
+from ..config import get_settings
+from ..models.document import DocumentChunkInfo, DocumentManifest
+from ..database import Client
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+def split_into_chunks(content: str, chunk_size: int) -> List[str]:
+    """Split text into chunks of at most chunk_size UTF-8 bytes without breaking characters"""
+    data = content.encode("utf-8")
+    chunks = []
+    start = 0
+    while start < len(data):
+        end = min(start + chunk_size, len(data))
+        # Back off to the start of a UTF-8 character (continuation bytes are 0b10xxxxxx)
+        while end < len(data) and end > start and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        if end == start:
+            # Chunk size smaller than one character; take the whole character
+            end = start + 1
+            while end < len(data) and (data[end] & 0xC0) == 0x80:
+                end += 1
+        chunks.append(data[start:end].decode("utf-8"))
+        start = end
+    return chunks
+
+class DocumentStorage:
+    """Stores document bodies as fixed-size chunks so reads and edits only touch what they need"""
+
+    def __init__(self, supabase: Client, chunk_size: int = settings.DOCUMENT_CHUNK_SIZE):
+        self.supabase = supabase
+        self.chunk_size = chunk_size
+        # Format: {document_id: [chunk, ...]} for documents not chunked yet, read once per instance
+        self._legacy: Dict[str, List[str]] = {}
+
+    def write_document(self, document_id: str, content: str) -> DocumentManifest:
+        """Replace the whole body of a document"""
+        chunks = split_into_chunks(content, self.chunk_size)
+        rows = [
+            {
+                "document_id": document_id,
+                "chunk_index": index,
+                "content": chunk,
+                "byte_length": len(chunk.encode("utf-8")),
+            }
+            for index, chunk in enumerate(chunks)
+        ]
+
+        if rows:
+            self.supabase.table("document_chunks").upsert(rows).execute()
+
+        # Drop trailing chunks left over from a longer previous version
+        self.supabase.table("document_chunks").delete().eq(
+            "document_id", document_id
+        ).gte("chunk_index", len(rows)).execute()
+
+        return self._build_manifest(document_id, [row["byte_length"] for row in rows])
+
+    def write_chunk(self, document_id: str, chunk_index: int, content: str) -> None:
+        """Rewrite (or append) a single chunk; search indexes chunks directly (migration 008)"""
+        self.supabase.table("document_chunks").upsert({
+            "document_id": document_id,
+            "chunk_index": chunk_index,
+            "content": content,
+            "byte_length": len(content.encode("utf-8")),
+        }).execute()
+
+    def get_manifest(self, document_id: str, convert_legacy: bool = False) -> DocumentManifest:
+        """
+        Get chunk offsets and lengths.
+
+        Documents not chunked yet (migration 009 converts existing ones) are
+        served read-only from documents.content; writers pass convert_legacy
+        to chunk them before editing.
+        """
+        response = self.supabase.table("document_chunks").select(
+            "chunk_index, byte_length"
+        ).eq("document_id", document_id).order("chunk_index").execute()
+
+        if response.data:
+            return self._build_manifest(document_id, [row["byte_length"] for row in response.data])
+
+        chunks = self._legacy_chunks(document_id)
+        if chunks and convert_legacy:
+            logger.info("Chunking legacy document %s before an edit", document_id)
+            self._legacy.pop(document_id, None)
+            return self.write_document(document_id, "".join(chunks))
+        return self._build_manifest(document_id, [len(chunk.encode("utf-8")) for chunk in chunks])
+
+    def _legacy_chunks(self, document_id: str) -> List[str]:
+        if document_id not in self._legacy:
+            document = self.supabase.table("documents").select("content").eq("id", document_id).execute()
+            content = document.data[0].get("content") if document.data else None
+            self._legacy[document_id] = split_into_chunks(content or "", self.chunk_size)
+        return self._legacy[document_id]
+
+    def get_chunk(self, document_id: str, chunk_index: int) -> Optional[str]:
+        response = self.supabase.table("document_chunks").select("content").eq(
+            "document_id", document_id
+        ).eq("chunk_index", chunk_index).execute()
+
+        if response.data:
+            return response.data[0]["content"]
+
+        # A chunked document always has chunk 0, so only other misses need the check
+        if chunk_index == 0 or not self._has_chunks(document_id):
+            chunks = self._legacy_chunks(document_id)
+            if 0 <= chunk_index < len(chunks):
+                return chunks[chunk_index]
+
+        return None
+
+    def _has_chunks(self, document_id: str) -> bool:
+        response = self.supabase.table("document_chunks").select("chunk_index").eq(
+            "document_id", document_id
+        ).limit(1).execute()
+        return bool(response.data)
+
+    def iter_range(self, manifest: DocumentManifest, start: int, end: int) -> Iterator[bytes]:
+        """Yield the bytes in [start, end] inclusive, fetching a few chunks per query"""
+        if not manifest.chunks or start > end:
+            return
+
+        offsets = [chunk.offset for chunk in manifest.chunks]
+        first = bisect_right(offsets, start) - 1
+        last = bisect_right(offsets, end) - 1
+        batch = max(settings.DOCUMENT_STREAM_BATCH_CHUNKS, 1)
+
+        for batch_start in range(first, last + 1, batch):
+            batch_end = min(batch_start + batch - 1, last)
+            response = self.supabase.table("document_chunks").select(
+                "chunk_index, content"
+            ).eq("document_id", manifest.document_id).gte(
+                "chunk_index", batch_start
+            ).lte("chunk_index", batch_end).order("chunk_index").execute()
+
+            rows = response.data
+            if not rows and manifest.document_id in self._legacy:
+                chunks = self._legacy[manifest.document_id]
+                rows = [{"chunk_index": i, "content": chunks[i]} for i in range(batch_start, batch_end + 1)]
+
+            for row in rows or []:
+                info = manifest.chunks[row["chunk_index"]]
+                data = row["content"].encode("utf-8")
+                lo = max(start - info.offset, 0)
+                hi = min(end - info.offset + 1, len(data))
+                yield data[lo:hi]
+
+    def _build_manifest(self, document_id: str, lengths: List[int]) -> DocumentManifest:
+        chunks = []
+        offset = 0
+        for index, length in enumerate(lengths):
+            chunks.append(DocumentChunkInfo(index=index, offset=offset, length=length))
+            offset += length
+
+        return DocumentManifest(
+            document_id=document_id,
+            chunk_size=self.chunk_size,
+            total_bytes=offset,
+            chunks=chunks
+        )
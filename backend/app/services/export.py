@@ -0,0 +1,60 @@
+import csv
+import io
+from typing import Any, Dict, Iterator, List
+from ..config import get_settings
+from ..core.responses import dumps
+from ..database import Client
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+EXPORT_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "project_id",
+    "creator_id",
+    "assignee_id",
+    "created_at",
+    "updated_at",
+]
+
+def iter_project_tasks(
+    supabase: Client,
+    project_id: str,
+    page_size: int = settings.EXPORT_PAGE_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield a project's tasks page by page using keyset pagination on id"""
+    last_id = None
+    while True:
+        query = supabase.table("tasks").select(",".join(EXPORT_COLUMNS)).eq("project_id", project_id)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        page = query.order("id").limit(page_size).execute().data or []
+
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
+
+def ndjson_lines(pages: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    for page in pages:
+        yield b"".join(dumps(row) + b"\n" for row in page)
+
+def csv_lines(pages: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+
+    for page in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([row.get(column) for column in EXPORT_COLUMNS] for row in page)
+        yield buffer.getvalue().encode("utf-8")
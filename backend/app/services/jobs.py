@@ -0,0 +1,290 @@
+import asyncio
+import contextvars
+import json
+import random
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+from ..config import get_settings
+from ..core.metrics import JOB_QUEUE_DEPTH, JOBS_PROCESSED
+from ..database import get_supabase_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+class Job:
+    """One queued side effect: a registered handler name and its JSON payload"""
+    __slots__ = ("id", "name", "payload", "idempotency_key", "attempts")
+
+    def __init__(self, name: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None, attempts: int = 0, job_id: Optional[str] = None):
+        self.id = job_id or str(uuid.uuid4())
+        self.name = name
+        self.payload = payload
+        self.idempotency_key = idempotency_key
+        self.attempts = attempts
+
+class SQLiteJobStore:
+    """
+    Durable job log in a local SQLite file.
+
+    Jobs are written on enqueue and marked done or failed when they finish.
+    Pending jobs are leased to the process running them; several processes
+    can share one file, and a job whose lease lapsed because its process
+    stopped is claimed and run again by another. Finished rows keep their
+    idempotency key until the TTL passes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        idempotency_ttl: float = settings.JOB_IDEMPOTENCY_TTL_SECONDS,
+        lease_seconds: float = settings.JOB_LEASE_SECONDS
+    ):
+        self.idempotency_ttl = idempotency_ttl
+        self.lease_seconds = lease_seconds
+        self.owner = str(uuid.uuid4())
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        # Checkpoints run from `checkpoint`, off the event loop, not inside an enqueue
+        self._conn.execute("pragma wal_autocheckpoint=0")
+        self._conn.execute(
+            """
+            create table if not exists jobs (
+                id text primary key,
+                name text not null,
+                payload text not null,
+                idempotency_key text unique,
+                attempts integer not null default 0,
+                status text not null default 'pending',
+                last_error text,
+                owner text,
+                lease_expires real not null default 0,
+                updated_at real not null
+            )
+            """
+        )
+        self._lock = Lock()
+
+    def add(self, job: Job) -> bool:
+        """Persist a new job leased to this process; False when its idempotency key was already used"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "insert or ignore into jobs (id, name, payload, idempotency_key, owner, lease_expires, updated_at) values (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.name, json.dumps(job.payload), job.idempotency_key, self.owner, now + self.lease_seconds, now)
+            )
+            return cursor.rowcount == 1
+
+    def update(self, job: Job, status: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "update jobs set status = ?, attempts = ?, last_error = ?, updated_at = ? where id = ?",
+                (status, job.attempts, error, time.time(), job.id)
+            )
+
+    def renew(self):
+        """Extend the lease on every pending job this process holds"""
+        with self._lock:
+            self._conn.execute(
+                "update jobs set lease_expires = ? where owner = ? and status = 'pending'",
+                (time.time() + self.lease_seconds, self.owner)
+            )
+
+    def claim(self) -> List[Job]:
+        """Take over pending jobs whose lease lapsed, e.g. left by a stopped process"""
+        now = time.time()
+        with self._lock:
+            # Forget finished jobs whose idempotency window has passed
+            self._conn.execute(
+                "delete from jobs where status != 'pending' and updated_at < ?",
+                (now - self.idempotency_ttl,)
+            )
+            # One statement, so two processes never claim the same row
+            rows = self._conn.execute(
+                """
+                update jobs set owner = ?, lease_expires = ?
+                where status = 'pending' and lease_expires < ?
+                returning id, name, payload, idempotency_key, attempts, updated_at
+                """,
+                (self.owner, now + self.lease_seconds, now)
+            ).fetchall()
+        rows.sort(key=lambda row: row[5])
+        return [Job(name, json.loads(payload), key, attempts, job_id) for job_id, name, payload, key, attempts, _ in rows]
+
+    def checkpoint(self):
+        with self._lock:
+            self._conn.execute("pragma wal_checkpoint(passive)")
+
+class JobQueue:
+    """
+    In-process worker pool for side effects that should not delay a response.
+
+    Routes call `enqueue` and return; workers started on the first enqueue
+    run the registered handler with the shared Supabase client. Failures are
+    retried with capped exponential backoff and jitter up to `max_attempts`.
+    An idempotency key makes repeated enqueues of the same event a no-op.
+    Without a store, queued jobs are lost when the process exits. With one,
+    `start` (run at app startup) recovers jobs left by stopped processes and
+    keeps this process's leases alive.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.JOB_WORKERS,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+        retry_base: float = settings.JOB_RETRY_BASE_SECONDS,
+        retry_max: float = settings.JOB_RETRY_MAX_SECONDS,
+        idempotency_ttl: float = settings.JOB_IDEMPOTENCY_TTL_SECONDS,
+        store: Optional[SQLiteJobStore] = None
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.idempotency_ttl = idempotency_ttl
+        self.store = store
+        # Client handed to handlers; replaceable so benchmarks can inject a fake
+        self.client_factory: Callable[[], Any] = get_supabase_client
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._lease_task: Optional[asyncio.Task] = None
+        self._retrying = 0
+        # Format: {idempotency_key: expires_at}
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+    def handler(self, name: str):
+        """Register the function run for jobs named `name`: fn(supabase, **payload)"""
+        def register(fn: Callable[..., Any]):
+            self._handlers[name] = fn
+            return fn
+        return register
+
+    @property
+    def depth(self) -> int:
+        return (self._queue.qsize() if self._queue is not None else 0) + self._retrying
+
+    def enqueue(self, name: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> bool:
+        """Queue a job from the event loop; False when it duplicates an earlier idempotency key"""
+        if idempotency_key is not None and not self._claim(idempotency_key):
+            JOBS_PROCESSED.inc(job=name, result="duplicate")
+            return False
+
+        self._ensure_workers()
+        job = Job(name, payload, idempotency_key)
+        if self.store is not None and not self.store.add(job):
+            JOBS_PROCESSED.inc(job=name, result="duplicate")
+            return False
+
+        self._queue.put_nowait(job)
+        return True
+
+    def _claim(self, key: str) -> bool:
+        now = time.monotonic()
+        while self._seen:
+            oldest_key, expires_at = next(iter(self._seen.items()))
+            if expires_at > now:
+                break
+            del self._seen[oldest_key]
+        if key in self._seen:
+            return False
+        self._seen[key] = now + self.idempotency_ttl
+        return True
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._worker_tasks = [task for task in self._worker_tasks if not task.done()]
+        while len(self._worker_tasks) < self.workers:
+            # Fresh context: workers outlive the request that started them
+            self._worker_tasks.append(contextvars.Context().run(asyncio.ensure_future, self._work()))
+
+    async def start(self):
+        """Start the workers and, with a store, recover lapsed jobs and keep leases renewed"""
+        self._ensure_workers()
+        if self.store is not None and (self._lease_task is None or self._lease_task.done()):
+            await self._claim_lapsed()
+            self._lease_task = contextvars.Context().run(asyncio.ensure_future, self._keep_leases())
+
+    def stop(self):
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+            self._lease_task = None
+
+    async def _claim_lapsed(self):
+        jobs = await asyncio.to_thread(self.store.claim)
+        if jobs:
+            logger.info("Recovered %d pending jobs", len(jobs))
+        for job in jobs:
+            self._queue.put_nowait(job)
+
+    async def _keep_leases(self):
+        # Renew well inside the lease so a busy loop does not let it lapse
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.store.renew)
+                await self._claim_lapsed()
+                await asyncio.to_thread(self.store.checkpoint)
+            except Exception as e:
+                logger.error("Job lease upkeep failed: %s", e)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error("Job %s (%s) crashed the worker loop: %s", job.id, job.name, e)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.attempts += 1
+        handler = self._handlers.get(job.name)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job {job.name}")
+            if asyncio.iscoroutinefunction(handler):
+                await handler(self.client_factory(), **job.payload)
+            else:
+                await asyncio.to_thread(handler, self.client_factory(), **job.payload)
+        except Exception as e:
+            if handler is None or job.attempts >= self.max_attempts:
+                JOBS_PROCESSED.inc(job=job.name, result="failed")
+                logger.error("Job %s (%s) failed after %d attempts: %s", job.id, job.name, job.attempts, e)
+                if self.store is not None:
+                    self.store.update(job, "failed", str(e))
+                return
+
+            delay = min(self.retry_max, self.retry_base * 2 ** (job.attempts - 1)) * random.uniform(0.5, 1.0)
+            JOBS_PROCESSED.inc(job=job.name, result="retried")
+            logger.warning("Job %s (%s) attempt %d failed, retrying in %.1fs: %s", job.id, job.name, job.attempts, delay, e)
+            if self.store is not None:
+                self.store.update(job, "pending", str(e))
+            self._retrying += 1
+            asyncio.get_running_loop().call_later(delay, self._retry, job)
+            return
+
+        JOBS_PROCESSED.inc(job=job.name, result="succeeded")
+        if self.store is not None:
+            self.store.update(job, "done")
+
+    def _retry(self, job: Job):
+        self._retrying -= 1
+        self._queue.put_nowait(job)
+
+    async def drain(self):
+        """Wait until every queued job has run (retries still waiting on backoff are not awaited)"""
+        if self._queue is not None:
+            await self._queue.join()
+
+job_queue = JobQueue(store=SQLiteJobStore(settings.JOB_STORE_PATH) if settings.JOB_STORE_PATH else None)
+
+JOB_QUEUE_DEPTH.set_function(lambda: job_queue.depth)
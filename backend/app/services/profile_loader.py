@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional
+from ..config import get_settings
+from ..database import Client
+from .cache import ReadThroughCache, cache_backend
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Full `profiles` rows by user id, shared across requests
+profile_cache = ReadThroughCache("profile", cache_backend, ttl=settings.PROFILE_CACHE_TTL_SECONDS)
+
+class ProfileLoader:
+    """
+    Request-scoped batching loader for `profiles` rows.
+
+    Every `load` issued during the same event-loop tick is coalesced into a
+    single `in_("id", ids)` query, duplicate ids are requested once, and rows
+    are served from `profile_cache` when another request already fetched them.
+    """
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+        # Format: {user_id: future resolving to the profile row or None}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._dispatch_scheduled = False
+
+    def load(self, user_id: str) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        future = self._pending.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[user_id] = future
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                # Runs after the current tick, once every sibling load has queued its id
+                loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, user_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id]
+        profiles = await asyncio.gather(*(self.load(user_id) for user_id in ids))
+        return dict(zip(ids, profiles))
+
+    def _dispatch(self):
+        batch, self._pending = self._pending, {}
+        self._dispatch_scheduled = False
+        try:
+            profiles = profile_cache.get_many_or_load(batch, self._fetch)
+        except Exception as e:
+            logger.error("Failed to load profiles: %s", e)
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for user_id, future in batch.items():
+            if not future.done():
+                future.set_result(profiles.get(user_id))
+
+    def _fetch(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        response = self.supabase.table("profiles").select("*").in_("id", user_ids).execute()
+        return {row["id"]: row for row in response.data or []}
+
+def invalidate_profile(*user_ids: str):
+    profile_cache.invalidate(*user_ids)
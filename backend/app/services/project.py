@@ -1,4 +1,6 @@
 from ..database import get_supabase_client
+from .access import get_project_row, invalidate_project
+from .cache import task_cache
 from ..models.project import ProjectCreate, ProjectUpdate
 from typing import List, Dict, Any, Optional
 
@@ -24,7 +26,7 @@ class ProjectService:
     
     async def get_user_projects(self, user_id: str) -> List[Dict[str, Any]]:
         # Get projects owned by user
-        owned_projects = self.supabase.table("projects").select("*").eq("owner_id", user_id).execute()
+        owned_projects = self.supabase.table("projects").select("*").eq("owner_id", user_id).is_("deleted_at", "null").execute()
         
         # Get projects where user is a team member
         user_teams = self.supabase.table("team_members").select("team_id").eq("user_id", user_id).execute()
@@ -32,7 +34,7 @@ class ProjectService:
         
         team_projects = []
         if team_ids:
-            team_projects = self.supabase.table("projects").select("*").in_("team_id", team_ids).execute()
+            team_projects = self.supabase.table("projects").select("*").in_("team_id", team_ids).is_("deleted_at", "null").execute()
         
         # Combine and remove duplicates
         all_projects = owned_projects.data + [p for p in team_projects.data if p["owner_id"] != user_id]
@@ -40,23 +42,21 @@ class ProjectService:
         return all_projects
     
     async def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("projects").select("*").eq("id", project_id).execute()
-        
-        if response.data:
-            return response.data[0]
-        
-        return None
+        return get_project_row(self.supabase, project_id)
     
     async def update_project(self, project_id: str, project_data: ProjectUpdate) -> Dict[str, Any]:
         update_data = {k: v for k, v in project_data.model_dump().items() if v is not None}
         
         response = self.supabase.table("projects").update(update_data).eq("id", project_id).execute()
+        invalidate_project(project_id)
         
         return response.data[0]
     
     async def delete_project(self, project_id: str) -> None:
         # Delete project tasks first
-        self.supabase.table("tasks").delete().eq("project_id", project_id).execute()
+        deleted_tasks = self.supabase.table("tasks").delete().eq("project_id", project_id).execute()
+        task_cache.invalidate(*(task["id"] for task in deleted_tasks.data or []))
         
         # Delete project
-        self.supabase.table("projects").delete().eq("id", project_id).execute()
\ No newline at end of file
+        self.supabase.table("projects").delete().eq("id", project_id).execute()
+        invalidate_project(project_id)
\ No newline at end of file
@@ -0,0 +1,238 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import uuid
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+from ..config import get_settings
+from ..core.responses import dumps
+from ..database import Client
+from ..models.project import PublicProjectResponse
+from .access import get_project_row
+from .singleflight import SingleFlight
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+PUBLIC_VISIBILITIES = ("public", "link_only")
+
+# Columns anonymous viewers may see
+PUBLIC_TASK_COLUMNS = "id, title, description, status, priority, due_date, created_at"
+
+def _etag(body: bytes) -> str:
+    # Weak: the body may be served gzip- or brotli-encoded
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+def _is_public_id(value: str) -> bool:
+    # public_id is a uuid4 and doubles as the snapshot file name
+    try:
+        return str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
+class PublicSnapshot:
+    """Pre-serialized bodies served for one shared project"""
+    __slots__ = ("project_id", "public_id", "project_body", "project_etag", "tasks_body", "tasks_etag", "mtime_ns")
+
+    def __init__(self, project_id: str, public_id: str, project_body: bytes, tasks_body: bytes, mtime_ns: Optional[int] = None):
+        self.project_id = project_id
+        self.public_id = public_id
+        self.project_body = project_body
+        self.project_etag = _etag(project_body)
+        self.tasks_body = tasks_body
+        self.tasks_etag = _etag(tasks_body)
+        self.mtime_ns = mtime_ns
+
+class PublicSnapshotStore:
+    """
+    Materialized responses for the anonymous share-link routes.
+
+    A snapshot is rebuilt when a project is shared or updated and (debounced)
+    when its tasks change, then kept in memory and written to
+    PUBLIC_SNAPSHOT_DIR. The file is the source of truth across workers and
+    restarts: a request only stats it and reloads when another process
+    replaced or removed it, so anonymous viewers never reach the database or
+    the auth server once a snapshot exists.
+    """
+
+    def __init__(
+        self,
+        directory: str = settings.PUBLIC_SNAPSHOT_DIR,
+        rebuild_delay: float = settings.PUBLIC_SNAPSHOT_REBUILD_DELAY_SECONDS
+    ):
+        self.directory = directory
+        self.rebuild_delay = rebuild_delay
+        # Format: {public_id: PublicSnapshot}
+        self._snapshots: Dict[str, PublicSnapshot] = {}
+        # Format: {project_id: TimerHandle} for debounced rebuilds
+        self._pending: Dict[str, asyncio.TimerHandle] = {}
+        self._lock = Lock()
+        # Cold-path lookups by public_id. Outcomes are kept for the flight's
+        # short TTL so unknown or private ids do not query on every request.
+        self.flight = SingleFlight("public_snapshot")
+
+    def _path(self, public_id: str) -> str:
+        return os.path.join(self.directory, f"{public_id}.json")
+
+    def get(self, public_id: str) -> Optional[PublicSnapshot]:
+        if not _is_public_id(public_id):
+            return None
+
+        snapshot = self._snapshots.get(public_id)
+        try:
+            mtime_ns = os.stat(self._path(public_id)).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if mtime_ns is None:
+            # Removed by another worker, unless it was never persisted here
+            if snapshot is not None and snapshot.mtime_ns is not None:
+                self._snapshots.pop(public_id, None)
+                return None
+            return snapshot
+        if snapshot is None or snapshot.mtime_ns != mtime_ns:
+            snapshot = self._load(public_id)
+        return snapshot
+
+    async def lookup(self, supabase: Client, public_id: str) -> Tuple[Optional[PublicSnapshot], str]:
+        """
+        Snapshot for a share link, materializing it on the first view of a
+        project shared before snapshots existed. The outcome is "ok",
+        "not_found" or "forbidden" (the project exists but is not public).
+        """
+        snapshot = self.get(public_id)
+        if snapshot is not None:
+            return snapshot, "ok"
+        if not _is_public_id(public_id):
+            return None, "not_found"
+
+        def resolve() -> str:
+            project = supabase.table("projects").select("*").eq("public_id", public_id).is_("deleted_at", "null").execute()
+            if not project.data:
+                return "not_found"
+            if project.data[0].get("visibility") not in PUBLIC_VISIBILITIES:
+                return "forbidden"
+            self.build(supabase, project.data[0])
+            return "ok"
+
+        outcome = await self.flight.do(public_id, resolve)
+        snapshot = self.get(public_id) if outcome == "ok" else None
+        if snapshot is None and outcome == "ok":
+            # Removed since the lookup was cached
+            outcome = "not_found"
+        return snapshot, outcome
+
+    def forget(self, public_id: str):
+        """Drop a cached lookup outcome after the project's sharing changed"""
+        self.flight.forget(public_id)
+
+    def _load(self, public_id: str) -> Optional[PublicSnapshot]:
+        path = self._path(public_id)
+        try:
+            with open(path, "rb") as f:
+                stored = json.loads(f.read())
+            snapshot = PublicSnapshot(
+                stored["project_id"],
+                public_id,
+                dumps(stored["project"]),
+                dumps(stored["tasks"]),
+                os.stat(path).st_mtime_ns
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable public snapshot %s: %s", path, e)
+            return None
+        self._snapshots[public_id] = snapshot
+        return snapshot
+
+    def build(self, supabase: Client, project: Dict[str, Any]) -> Optional[PublicSnapshot]:
+        """Materialize the snapshot for a project row; drops it if the project is no longer public"""
+        public_id = project.get("public_id")
+        if not public_id:
+            return None
+        if project.get("visibility") not in PUBLIC_VISIBILITIES:
+            self.remove(public_id)
+            return None
+
+        tasks = supabase.table("tasks").select(PUBLIC_TASK_COLUMNS).eq("project_id", project["id"]).execute()
+        project_payload = PublicProjectResponse(
+            id=project["id"],
+            name=project["name"],
+            description=project["description"],
+            status=project["status"],
+            created_at=project["created_at"],
+            updated_at=project["updated_at"]
+        ).model_dump(mode="json")
+        tasks_payload = tasks.data or []
+
+        snapshot = PublicSnapshot(project["id"], public_id, dumps(project_payload), dumps(tasks_payload))
+        self.forget(public_id)
+        with self._lock:
+            snapshot.mtime_ns = self._write(public_id, {
+                "project_id": project["id"],
+                "project": project_payload,
+                "tasks": tasks_payload,
+            })
+            self._snapshots[public_id] = snapshot
+        return snapshot
+
+    def _write(self, public_id: str, content: Dict[str, Any]) -> Optional[int]:
+        path = self._path(public_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(dumps(content))
+            # Atomic, so other workers never read a half-written snapshot
+            os.replace(tmp_path, path)
+            return os.stat(path).st_mtime_ns
+        except OSError as e:
+            logger.error("Failed to persist public snapshot %s: %s", path, e)
+            return None
+
+    def rebuild(self, supabase: Client, project_id: str) -> Optional[PublicSnapshot]:
+        project = get_project_row(supabase, project_id)
+        if not project:
+            return None
+        return self.build(supabase, project)
+
+    def schedule_rebuild(self, supabase: Client, project_id: str):
+        """Rebuild after a short quiet period, so a burst of task writes costs one rebuild"""
+        loop = asyncio.get_running_loop()
+        handle = self._pending.pop(project_id, None)
+        if handle is not None:
+            handle.cancel()
+        # Fresh context: the rebuild's queries must not count against the triggering request
+        self._pending[project_id] = loop.call_later(
+            self.rebuild_delay,
+            self._start_rebuild,
+            supabase,
+            project_id,
+            context=contextvars.Context()
+        )
+
+    def _start_rebuild(self, supabase: Client, project_id: str):
+        self._pending.pop(project_id, None)
+        asyncio.ensure_future(self._rebuild_in_thread(supabase, project_id))
+
+    async def _rebuild_in_thread(self, supabase: Client, project_id: str):
+        try:
+            await asyncio.to_thread(self.rebuild, supabase, project_id)
+        except Exception as e:
+            logger.error("Failed to rebuild public snapshot for project %s: %s", project_id, e)
+
+    def remove(self, public_id: str):
+        self.forget(public_id)
+        with self._lock:
+            self._snapshots.pop(public_id, None)
+            try:
+                os.remove(self._path(public_id))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error("Failed to remove public snapshot %s: %s", public_id, e)
+
+public_snapshots = PublicSnapshotStore()
@@ -0,0 +1,71 @@
+import asyncio
+import contextvars
+from typing import Any, Dict, Optional
+from ..config import get_settings
+from ..database import Client
+from .access import invalidate_project
+from .cache import task_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+class ProjectPurger:
+    """
+    Background removal of soft-deleted projects (migration 006).
+
+    Each step is one `purge_deleted_projects` call that deletes a bounded
+    batch of tasks in its own transaction. The loop is started at app startup,
+    which picks up projects left over by earlier processes, and again by each
+    soft delete; it runs until nothing is pending. Failed steps are retried
+    with capped exponential backoff.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.PURGE_BATCH_SIZE,
+        interval: float = settings.PURGE_INTERVAL_SECONDS,
+        retry_max: float = settings.PURGE_RETRY_MAX_SECONDS
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retry_max = retry_max
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_running(self, supabase: Client):
+        if self._task is None or self._task.done():
+            # Fresh context: the loop outlives the request that started it
+            self._task = contextvars.Context().run(asyncio.ensure_future, self._loop(supabase))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self, supabase: Client):
+        failures = 0
+        while True:
+            try:
+                result = await asyncio.to_thread(self._purge_batch, supabase)
+            except Exception as e:
+                failures += 1
+                delay = min(self.retry_max, self.interval * 2 ** failures)
+                logger.error("Project purge failed (attempt %d), retrying in %.1fs: %s", failures, delay, e)
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            if not result.get("project_id"):
+                return
+
+            task_cache.invalidate(*result["task_ids"])
+            if result["project_deleted"]:
+                invalidate_project(result["project_id"])
+                logger.info("Purged deleted project %s", result["project_id"])
+            # Leave room for foreground queries between batches
+            await asyncio.sleep(self.interval)
+
+    def _purge_batch(self, supabase: Client) -> Dict[str, Any]:
+        return supabase.rpc("purge_deleted_projects", {"p_batch_size": self.batch_size}).execute().data
+
+project_purger = ProjectPurger()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple, Union
+from ..config import get_settings
+from ..core.metrics import SINGLEFLIGHT_REQUESTS
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+def _consume_exception(task: "asyncio.Task"):
+    # Nobody may be left awaiting a flight whose callers all disconnected
+    if not task.cancelled():
+        task.exception()
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads into one upstream call.
+
+    The first caller for a key starts the load; callers arriving while it
+    runs await the same result (or exception) instead of issuing their own
+    queries. Sync loaders run in a worker thread so the event loop keeps
+    accepting the duplicates. Results are kept for `ttl` seconds (0 keeps
+    nothing beyond the in-flight call) in a bounded LRU; `forget` drops them
+    early when the underlying rows change.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = settings.SINGLEFLIGHT_RESULT_TTL_SECONDS,
+        max_entries: int = settings.SINGLEFLIGHT_MAX_ENTRIES
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+        # Format: {key: (expires_at, value)}
+        self._results: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    async def do(self, key: str, fn: Callable[[], Union[Any, Awaitable[Any]]]) -> Any:
+        entry = self._results.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                SINGLEFLIGHT_REQUESTS.inc(flight=self.name, result="cached")
+                return entry[1]
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            SINGLEFLIGHT_REQUESTS.inc(flight=self.name, result="leader")
+            task = asyncio.ensure_future(self._run(key, fn))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+        else:
+            SINGLEFLIGHT_REQUESTS.inc(flight=self.name, result="shared")
+
+        # Shielded so one caller disconnecting does not cancel the load for the others
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, fn: Callable[[], Union[Any, Awaitable[Any]]]) -> Any:
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                value = await fn()
+            else:
+                value = await asyncio.to_thread(fn)
+            if self.ttl > 0:
+                self._results[key] = (time.monotonic() + self.ttl, value)
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def forget(self, *keys: str):
+        for key in keys:
+            self._results.pop(key, None)
+
+# Task lists, keyed by user and filters; in-flight only so users always read their own writes
+task_list_flight = SingleFlight("task_list", ttl=0)
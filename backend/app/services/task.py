@@ -1,4 +1,6 @@
 from ..database import get_supabase_client
+from .access import get_task_row
+from .cache import task_cache
 from ..models.task import TaskCreate, TaskUpdate
 from typing import List, Dict, Any, Optional
 
@@ -23,22 +25,19 @@ class TaskService:
         return response.data
     
     async def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
-        response = self.supabase.table("tasks").select("*").eq("id", task_id).execute()
-        
-        if response.data:
-            return response.data[0]
-        
-        return None
+        return get_task_row(self.supabase, task_id)
     
     async def update_task(self, task_id: str, task_data: TaskUpdate) -> Dict[str, Any]:
         update_data = {k: v for k, v in task_data.model_dump().items() if v is not None}
         
         response = self.supabase.table("tasks").update(update_data).eq("id", task_id).execute()
+        task_cache.invalidate(task_id)
         
         return response.data[0]
     
     async def delete_task(self, task_id: str) -> None:
         self.supabase.table("tasks").delete().eq("id", task_id).execute()
+        task_cache.invalidate(task_id)
     
     async def get_user_assigned_tasks(self, user_id: str) -> List[Dict[str, Any]]:
         response = self.supabase.table("tasks").select("*").eq("assignee_id", user_id).execute()
@@ -0,0 +1,181 @@
+import csv
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from anyio import from_thread
+from pydantic import ValidationError
+from ..config import get_settings
+from ..models.task import TaskCreate, TaskImportError, TaskImportJob, TaskImportStatus
+from .activity_service import log_tasks_imported
+from .public_snapshots import public_snapshots
+from ..database import Client
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+class ImportJobStore:
+    """
+    Import jobs in the `task_imports` table (migration 010), so a poll can land
+    on any worker and progress survives a restart. Finished jobs older than
+    IMPORT_JOB_RETENTION_DAYS are deleted when a new import starts.
+    """
+
+    def __init__(self, retention_days: int = settings.IMPORT_JOB_RETENTION_DAYS):
+        self.retention_days = retention_days
+
+    def create(self, supabase: Client, project_id: str, user_id: str) -> TaskImportJob:
+        now = datetime.now(timezone.utc)
+        job = TaskImportJob(
+            id=str(uuid.uuid4()),
+            project_id=project_id,
+            user_id=user_id,
+            created_at=now
+        )
+        supabase.table("task_imports").delete().lt(
+            "finished_at", (now - timedelta(days=self.retention_days)).isoformat()
+        ).execute()
+        supabase.table("task_imports").insert(job.model_dump(mode="json")).execute()
+        return job
+
+    def save(self, supabase: Client, job: TaskImportJob):
+        """Write a job's progress; failures are logged so they never abort the import"""
+        try:
+            supabase.table("task_imports").update(job.model_dump(
+                mode="json",
+                include={"status", "processed", "inserted", "failed", "errors", "finished_at"}
+            )).eq("id", job.id).execute()
+        except Exception as e:
+            logger.warning("Import %s: failed to save progress: %s", job.id, e)
+
+    def get(self, supabase: Client, job_id: str) -> Optional[TaskImportJob]:
+        try:
+            uuid.UUID(job_id)
+        except ValueError:
+            return None
+        response = supabase.table("task_imports").select("*").eq("id", job_id).execute()
+        return TaskImportJob.model_validate(response.data[0]) if response.data else None
+
+import_jobs = ImportJobStore()
+
+def _iter_rows(path: str, file_format: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (row number, raw row) one line at a time; bad JSON lines yield the error instead"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if file_format == "csv":
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                # Empty CSV cells mean "not set", not an empty string
+                yield number, {k: v for k, v in row.items() if k and v not in ("", None)}
+            return
+
+        number = 0
+        for line in f:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, e
+
+def _task_row(task_data: TaskCreate, user_id: str) -> Dict[str, Any]:
+    # Same shape create_task inserts
+    return {
+        "title": str(task_data.title).strip(),
+        "description": str(task_data.description).strip() if task_data.description else None,
+        "status": str(task_data.status.value),
+        "priority": str(task_data.priority.value),
+        "due_date": task_data.due_date.isoformat() if task_data.due_date else None,
+        "project_id": str(task_data.project_id),
+        "creator_id": str(user_id),
+        "assignee_id": str(task_data.assignee_id) if task_data.assignee_id else None
+    }
+
+def _add_error(job: TaskImportJob, row: int, message: str):
+    job.failed += 1
+    if len(job.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+        job.errors.append(TaskImportError(row=row, message=message))
+
+def _flush(job: TaskImportJob, batch: List[Tuple[int, Dict[str, Any]]], supabase: Client):
+    if not batch:
+        return
+    try:
+        supabase.table("tasks").insert([row for _, row in batch]).execute()
+        job.inserted += len(batch)
+    except Exception as e:
+        # One bad row fails the whole statement; retry row by row to report only the offending ones
+        logger.warning("Import %s: batch insert failed, retrying %d rows one at a time: %s", job.id, len(batch), e)
+        for number, row in batch:
+            try:
+                supabase.table("tasks").insert(row).execute()
+                job.inserted += 1
+            except Exception as row_error:
+                _add_error(job, number, f"Insert failed: {str(row_error)}")
+    batch.clear()
+
+def run_import(
+    job: TaskImportJob,
+    path: str,
+    file_format: str,
+    project: Dict[str, Any],
+    supabase: Client
+):
+    """
+    Validate and insert an uploaded file in batches.
+
+    Runs as a background task in a worker thread. Only one batch of rows is
+    held in memory, and access was checked once before the job was queued.
+    """
+    job.status = TaskImportStatus.RUNNING
+    import_jobs.save(supabase, job)
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    try:
+        for number, raw in _iter_rows(path, file_format):
+            job.processed += 1
+            if isinstance(raw, Exception):
+                _add_error(job, number, f"Invalid JSON: {str(raw)}")
+                continue
+            if not isinstance(raw, dict):
+                _add_error(job, number, "Row must be an object")
+                continue
+
+            try:
+                task_data = TaskCreate(**{**raw, "project_id": project["id"]})
+            except ValidationError as e:
+                _add_error(job, number, "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+
+            batch.append((number, _task_row(task_data, job.user_id)))
+            if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                _flush(job, batch, supabase)
+                import_jobs.save(supabase, job)
+
+        _flush(job, batch, supabase)
+        job.status = TaskImportStatus.COMPLETED
+
+        if job.inserted:
+            if project.get("public_id"):
+                from_thread.run_sync(public_snapshots.schedule_rebuild, supabase, project["id"])
+            from_thread.run_sync(
+                log_tasks_imported,
+                job.user_id,
+                job.id,
+                project["id"],
+                project["name"],
+                job.inserted
+            )
+    except Exception as e:
+        logger.error("Import %s failed: %s", job.id, e)
+        job.status = TaskImportStatus.FAILED
+        _add_error(job, job.processed, f"Import aborted: {str(e)}")
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        import_jobs.save(supabase, job)
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
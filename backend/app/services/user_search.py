@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+from ..config import get_settings
+from ..database import Client
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# PostgREST turns `*` into `%` inside like patterns and has no escape for it
+_UNESCAPABLE_CHARS = str.maketrans("", "", "*")
+
+def normalize_search_term(term: str) -> str:
+    return term.strip().lower().translate(_UNESCAPABLE_CHARS)
+
+def _ilike_filter_value(term: str) -> str:
+    """
+    Quoted PostgREST value for an `ilike` substring match on `term`, so it
+    matches exactly what `_matches` checks: LIKE wildcards are escaped, then
+    the value is quoted so commas and parentheses are not filter syntax.
+    """
+    pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    quoted = pattern.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"*{quoted}*"'
+
+def _matches(profile: Dict[str, Any], term: str) -> bool:
+    return (
+        term in (profile.get("email") or "").lower()
+        or term in (profile.get("full_name") or "").lower()
+    )
+
+class UserSearchCache:
+    """
+    Small TTL + LRU cache of recent user searches.
+
+    Typing "ali" -> "alic" -> "alice" issues one query per keystroke. When an
+    earlier, shorter term returned fewer rows than the limit, the result set
+    is complete, so any longer term containing it can be answered by
+    filtering the cached rows instead of querying again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.USER_SEARCH_CACHE_SIZE,
+        ttl_seconds: float = settings.USER_SEARCH_CACHE_TTL_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Format: {(term, limit): (expires_at, rows)}
+        self._entries: OrderedDict[Tuple[str, int], Tuple[float, List[Dict[str, Any]]]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, term: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((term, limit))
+            if entry and entry[0] > now:
+                self._entries.move_to_end((term, limit))
+                return entry[1]
+
+            # Refine a complete result for a shorter prefix of this term
+            for length in range(len(term) - 1, 0, -1):
+                entry = self._entries.get((term[:length], limit))
+                if entry and entry[0] > now and len(entry[1]) < limit:
+                    return [row for row in entry[1] if _matches(row, term)]
+
+        return None
+
+    def set(self, term: str, limit: int, rows: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries[(term, limit)] = (time.monotonic() + self.ttl_seconds, rows)
+            self._entries.move_to_end((term, limit))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+user_search_cache = UserSearchCache()
+
+def search_profiles(supabase: Client, term: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Search profiles by email or full name substring, served from the trigram indexes"""
+    term = normalize_search_term(term)
+    if not term:
+        return []
+
+    cached = user_search_cache.get(term, limit)
+    if cached is not None:
+        return cached
+
+    value = _ilike_filter_value(term)
+    response = supabase.table("profiles").select("*").or_(
+        f"email.ilike.{value},full_name.ilike.{value}"
+    ).limit(limit).execute()
+
+    rows = response.data or []
+    user_search_cache.set(term, limit, rows)
+    return rows
@@ -0,0 +1,427 @@
+"""
+Endpoint benchmark suite.
+
+Drives every route under /api/v1 through the real app (middleware, auth
+dependency, validation, serialization) with the supabase client replaced by
+benchmarks.fake_supabase. Synthetic data is seeded at each scale, and every
+upstream call pays the injected latency. Reports throughput, p50/p99 and
+upstream calls per request:
+
+    cd backend && python -m benchmarks.endpoints --scales small medium --latency-ms 5
+    cd backend && python -m benchmarks.endpoints --save baseline.json
+    cd backend && python -m benchmarks.endpoints --compare baseline.json
+
+`--compare` exits 1 when a route's p50 regresses by more than --tolerance or
+it makes more upstream calls per request than the baseline.
+`--check-budgets` turns on strict query budgets, so any request over its
+route's @query_budget is reported as an error:
+
+    cd backend && python -m benchmarks.endpoints --check-budgets --latency-ms 0
+
+POST /admin/profile is left out; it runs for a fixed duration by design.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+import httpx
+
+from app.config import get_settings
+from app.core.instrumentation import InstrumentedClient, QueryBudgetExceeded
+from app.database import get_auth_client, get_supabase_client
+from app.main import app
+from app.services.document_storage import DocumentStorage
+from app.services.jobs import job_queue
+from app.services.task_import import import_jobs
+
+from .fake_supabase import FakeSupabase
+
+API = "/api/v1"
+
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": {"users": 20, "teams": 3, "projects": 10, "tasks_per_project": 20,
+              "documents": 5, "document_kb": 16, "comments_per_document": 30, "activities": 200},
+    "medium": {"users": 200, "teams": 10, "projects": 50, "tasks_per_project": 100,
+               "documents": 20, "document_kb": 256, "comments_per_document": 200, "activities": 2000},
+    "large": {"users": 2000, "teams": 40, "projects": 200, "tasks_per_project": 250,
+              "documents": 50, "document_kb": 1024, "comments_per_document": 1000, "activities": 20000},
+}
+
+STATUSES = ["backlog", "todo", "in_progress", "review", "done"]
+PRIORITIES = ["low", "medium", "high", "urgent"]
+WORDS = "plan design review ship deploy fix refactor migrate audit launch budget roadmap sprint".split()
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+@dataclass
+class Context:
+    """Ids of seeded rows that scenarios point their requests at"""
+    fake: FakeSupabase
+    rng: random.Random
+    viewer_id: str = ""
+    token: str = ""
+    user_ids: List[str] = field(default_factory=list)
+    team_ids: List[str] = field(default_factory=list)
+    project_ids: List[str] = field(default_factory=list)
+    public_ids: List[str] = field(default_factory=list)
+    task_ids: List[str] = field(default_factory=list)
+    document_ids: List[str] = field(default_factory=list)
+    counter: itertools.count = field(default_factory=itertools.count)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    def new_row(self, table: str, **values) -> str:
+        """Seed one row outside the measured request (e.g. something for a DELETE to remove)"""
+        now = _iso(datetime.now(timezone.utc))
+        row = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **values}
+        self.fake.seed(table, [row])
+        return row["id"]
+
+def seed(fake: FakeSupabase, scale: Dict[str, int], rng: random.Random) -> Context:
+    """Populate the fake with a workspace centred on one viewer who owns some projects and joins some teams"""
+    ctx = Context(fake=fake, rng=rng)
+    now = datetime.now(timezone.utc)
+
+    profiles = []
+    for i in range(scale["users"]):
+        user_id = str(uuid.uuid4())
+        email = f"user{i}@example.com"
+        token = fake.auth.add_user(user_id, email, full_name=f"User {i}")
+        profiles.append({"id": user_id, "email": email, "full_name": f"User {i}", "created_at": _iso(now)})
+        ctx.user_ids.append(user_id)
+        if i == 0:
+            ctx.viewer_id, ctx.token = user_id, token
+    fake.seed("profiles", profiles)
+
+    teams, members = [], []
+    for i in range(scale["teams"]):
+        owner = ctx.viewer_id if i == 0 else rng.choice(ctx.user_ids)
+        team_id = str(uuid.uuid4())
+        teams.append({"id": team_id, "name": f"Team {i}", "description": _sentence(rng, 6),
+                      "owner_id": owner, "created_at": _iso(now), "updated_at": _iso(now)})
+        member_ids = {owner, *rng.sample(ctx.user_ids, min(8, len(ctx.user_ids)))}
+        if i % 2 == 0:
+            member_ids.add(ctx.viewer_id)
+        members += [{"team_id": team_id, "user_id": member_id, "role": "owner" if member_id == owner else "member",
+                     "created_at": _iso(now)} for member_id in member_ids]
+        ctx.team_ids.append(team_id)
+    fake.seed("teams", teams)
+    fake.seed("team_members", members)
+
+    projects, tasks = [], []
+    for i in range(scale["projects"]):
+        project_id = str(uuid.uuid4())
+        public_id = str(uuid.uuid4()) if i % 5 == 0 else None
+        projects.append({
+            "id": project_id, "name": f"Project {i} {rng.choice(WORDS)}", "description": _sentence(rng, 12),
+            "status": rng.choice(["planning", "in_progress", "on_hold", "completed"]),
+            "owner_id": ctx.viewer_id if i % 3 == 0 else rng.choice(ctx.user_ids),
+            "team_id": rng.choice(ctx.team_ids) if i % 4 else None,
+            "visibility": "link_only" if public_id else "private", "public_id": public_id,
+            "created_at": _iso(now - timedelta(days=i)), "updated_at": _iso(now),
+        })
+        ctx.project_ids.append(project_id)
+        if public_id:
+            ctx.public_ids.append(public_id)
+        for j in range(scale["tasks_per_project"]):
+            tasks.append({
+                "id": str(uuid.uuid4()), "title": f"{rng.choice(WORDS).title()} item {i}-{j}",
+                "description": _sentence(rng, 20), "status": rng.choice(STATUSES),
+                "priority": rng.choice(PRIORITIES),
+                "due_date": _iso(now + timedelta(days=rng.randint(-10, 30))) if j % 2 else None,
+                "project_id": project_id,
+                "creator_id": ctx.viewer_id if j % 7 == 0 else rng.choice(ctx.user_ids),
+                "assignee_id": rng.choice(ctx.user_ids) if j % 3 else None,
+                "created_at": _iso(now - timedelta(minutes=j)), "updated_at": _iso(now),
+            })
+    fake.seed("projects", projects)
+    fake.seed("tasks", tasks)
+    ctx.task_ids = [task["id"] for task in tasks if task["creator_id"] == ctx.viewer_id]
+
+    documents, comments = [], []
+    body = (_sentence(rng, 200) + "\n") * (scale["document_kb"] * 1024 // 1300 + 1)
+    for i in range(scale["documents"]):
+        document_id = str(uuid.uuid4())
+        documents.append({
+            "id": document_id, "title": f"Spec {i}", "content": body[:scale["document_kb"] * 1024],
+            "type": "text", "project_id": rng.choice(ctx.project_ids), "team_id": None,
+            "owner_id": ctx.viewer_id, "version": 1, "last_modified_by": ctx.viewer_id,
+            "created_at": _iso(now), "updated_at": _iso(now),
+        })
+        ctx.document_ids.append(document_id)
+        top_level: List[str] = []
+        for j in range(scale["comments_per_document"]):
+            comment_id = str(uuid.uuid4())
+            parent = rng.choice(top_level) if top_level and j % 3 else None
+            comments.append({
+                "id": comment_id, "document_id": document_id, "content": _sentence(rng, 15),
+                "created_by": rng.choice(ctx.user_ids), "parent_id": parent, "thread_id": parent or comment_id,
+                "resolved": j % 10 == 0,
+                "created_at": _iso(now - timedelta(minutes=scale["comments_per_document"] - j)),
+            })
+            if parent is None:
+                top_level.append(comment_id)
+    fake.seed("documents", documents)
+    fake.seed("document_comments", comments)
+    storage = DocumentStorage(fake)
+    for document in documents:
+        storage.write_document(document["id"], document["content"])
+
+    fake.seed("activities", [{
+        "id": str(uuid.uuid4()), "type": "task_updated", "target_id": rng.choice(ctx.project_ids),
+        "target_name": f"Task {i}", "user_id": rng.choice(ctx.user_ids),
+        "metadata": json.dumps({"project_id": rng.choice(ctx.project_ids)}),
+        "created_at": _iso(now - timedelta(seconds=i)),
+    } for i in range(scale["activities"])])
+    return ctx
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[Context], str]
+    request: Callable[[Context], Dict[str, Any]] = lambda ctx: {}
+    expect: int = 200
+
+def _csv_upload(ctx: Context) -> Dict[str, Any]:
+    rows = "\n".join(f"Imported {i},{_sentence(ctx.rng, 8)},todo,medium" for i in range(200))
+    return {
+        "data": {"project_id": ctx.project_ids[0]},
+        "files": {"file": ("tasks.csv", f"title,description,status,priority\n{rows}\n", "text/csv")},
+    }
+
+def _viewer_task(ctx: Context) -> str:
+    return ctx.new_row("tasks", title="Scratch", description=None, status="todo", priority="low",
+                       due_date=None, project_id=ctx.project_ids[0], creator_id=ctx.viewer_id, assignee_id=None)
+
+def _member_to_remove(ctx: Context) -> str:
+    user_id = ctx.new_row("profiles", email=f"remove{next(ctx.counter)}@example.com", full_name="Leaving")
+    ctx.fake.seed("team_members", [{"team_id": ctx.team_ids[0], "user_id": user_id, "role": "member"}])
+    return user_id
+
+SCENARIOS: List[Scenario] = [
+    # Auth
+    Scenario("POST /auth/register", "POST", lambda ctx: "/auth/register", lambda ctx: {"json": {
+        "email": f"new{next(ctx.counter)}-{uuid.uuid4().hex[:6]}@example.com", "full_name": "New User",
+        "password": "password"}}),
+    Scenario("POST /auth/login", "POST", lambda ctx: "/auth/login",
+             lambda ctx: {"data": {"email": "user0@example.com", "password": "password"}}),
+    Scenario("POST /auth/token", "POST", lambda ctx: "/auth/token",
+             lambda ctx: {"data": {"username": "user0@example.com", "password": "password"}}),
+    Scenario("POST /auth/logout", "POST", lambda ctx: "/auth/logout"),
+    # Users
+    Scenario("GET /users/profile/{id}", "GET", lambda ctx: f"/users/profile/{ctx.rng.choice(ctx.user_ids)}"),
+    Scenario("GET /users/search", "GET", lambda ctx: "/users/search",
+             lambda ctx: {"params": {"email": f"user{ctx.rng.randint(0, 99)}"}}),
+    # Projects
+    Scenario("POST /projects/", "POST", lambda ctx: "/projects/", lambda ctx: {"json": {
+        "name": "Benchmark project", "description": "Created by the benchmark"}}),
+    Scenario("GET /projects/", "GET", lambda ctx: "/projects/"),
+    Scenario("GET /projects/{id}", "GET", lambda ctx: f"/projects/{ctx.project_ids[0]}"),
+    Scenario("PUT /projects/{id}", "PUT", lambda ctx: f"/projects/{ctx.project_ids[0]}",
+             lambda ctx: {"json": {"status": "in_progress"}}),
+    Scenario("DELETE /projects/{id}", "DELETE", lambda ctx: "/projects/" + ctx.new_row(
+        "projects", name="Doomed", description="", status="planning", owner_id=ctx.viewer_id, team_id=None)),
+    Scenario("GET /projects/{id}/export", "GET", lambda ctx: f"/projects/{ctx.project_ids[0]}/export",
+             lambda ctx: {"params": {"format": "ndjson"}}),
+    Scenario("POST /projects/{id}/share", "POST", lambda ctx: f"/projects/{ctx.project_ids[0]}/share"),
+    Scenario("GET /projects/public/{id}", "GET", lambda ctx: f"/projects/public/{ctx.rng.choice(ctx.public_ids)}"),
+    Scenario("GET /projects/public/{id}/tasks", "GET",
+             lambda ctx: f"/projects/public/{ctx.rng.choice(ctx.public_ids)}/tasks"),
+    # Tasks
+    Scenario("POST /tasks/", "POST", lambda ctx: "/tasks/", lambda ctx: {"json": {
+        "title": "Benchmark task", "project_id": ctx.project_ids[0], "priority": "high"}}),
+    Scenario("GET /tasks/", "GET", lambda ctx: "/tasks/"),
+    Scenario("POST /tasks/import", "POST", lambda ctx: "/tasks/import", _csv_upload, expect=202),
+    Scenario("GET /tasks/import/{id}", "GET",
+             lambda ctx: f"/tasks/import/{import_jobs.create(ctx.fake, ctx.project_ids[0], ctx.viewer_id).id}"),
+    Scenario("GET /tasks/{id}", "GET", lambda ctx: f"/tasks/{ctx.rng.choice(ctx.task_ids)}"),
+    Scenario("PUT /tasks/{id}", "PUT", lambda ctx: f"/tasks/{ctx.rng.choice(ctx.task_ids)}",
+             lambda ctx: {"json": {"status": ctx.rng.choice(STATUSES)}}),
+    Scenario("DELETE /tasks/{id}", "DELETE", lambda ctx: f"/tasks/{_viewer_task(ctx)}"),
+    # Teams
+    Scenario("POST /teams/", "POST", lambda ctx: "/teams/", lambda ctx: {"json": {"name": "Benchmark team"}}),
+    Scenario("GET /teams/", "GET", lambda ctx: "/teams/"),
+    Scenario("GET /teams/{id}", "GET", lambda ctx: f"/teams/{ctx.team_ids[0]}"),
+    Scenario("PUT /teams/{id}", "PUT", lambda ctx: f"/teams/{ctx.team_ids[0]}",
+             lambda ctx: {"json": {"description": "Updated by the benchmark"}}),
+    Scenario("DELETE /teams/{id}", "DELETE", lambda ctx: "/teams/" + ctx.new_row(
+        "teams", name="Doomed", description=None, owner_id=ctx.viewer_id)),
+    Scenario("POST /teams/{id}/members", "POST", lambda ctx: f"/teams/{ctx.team_ids[0]}/members",
+             lambda ctx: {"json": {"user_id": ctx.new_row(
+                 "profiles", email=f"join{next(ctx.counter)}@example.com", full_name="Joining")}},
+             expect=201),
+    Scenario("GET /teams/{id}/members", "GET", lambda ctx: f"/teams/{ctx.team_ids[0]}/members"),
+    Scenario("DELETE /teams/{id}/members/{user}", "DELETE",
+             lambda ctx: f"/teams/{ctx.team_ids[0]}/members/{_member_to_remove(ctx)}"),
+    # Activities
+    Scenario("GET /activities/recent", "GET", lambda ctx: "/activities/recent", lambda ctx: {"params": {"limit": 20}}),
+    # Documents
+    Scenario("GET /documents/{id}/comments", "GET", lambda ctx: f"/documents/{ctx.rng.choice(ctx.document_ids)}/comments"),
+    Scenario("GET /documents/{id}/manifest", "GET", lambda ctx: f"/documents/{ctx.rng.choice(ctx.document_ids)}/manifest"),
+    Scenario("GET /documents/{id}/content", "GET", lambda ctx: f"/documents/{ctx.rng.choice(ctx.document_ids)}/content"),
+    Scenario("GET /documents/{id}/content range", "GET",
+             lambda ctx: f"/documents/{ctx.rng.choice(ctx.document_ids)}/content",
+             lambda ctx: {"headers": {"Range": "bytes=0-4095"}}, expect=206),
+    Scenario("GET /documents/{id}/chunks/{i}", "GET", lambda ctx: f"/documents/{ctx.rng.choice(ctx.document_ids)}/chunks/0"),
+    Scenario("PUT /documents/{id}/chunks/{i}", "PUT", lambda ctx: f"/documents/{ctx.document_ids[0]}/chunks/0",
+             lambda ctx: {"json": {"content": _sentence(ctx.rng, 50)}}),
+    # Search
+    Scenario("GET /search/", "GET", lambda ctx: "/search/", lambda ctx: {"params": {"q": ctx.rng.choice(WORDS)}}),
+    # Bootstrap
+    Scenario("GET /bootstrap/", "GET", lambda ctx: "/bootstrap/"),
+]
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    ctx: Context,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        # Path and body are built (and any rows seeded) before timing starts
+        path = scenario.path(ctx)
+        kwargs = scenario.request(ctx)
+        headers = {**ctx.headers, **kwargs.pop("headers", {})}
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, API + path, headers=headers, **kwargs)
+            except QueryBudgetExceeded as e:
+                if len(errors) < 3:
+                    errors.append(str(e))
+                return
+            finally:
+                latencies.append(time.perf_counter() - started)
+        if response.status_code != scenario.expect and len(errors) < 3:
+            errors.append(f"{response.status_code}: {response.text[:200]}")
+
+    await one()  # Warm-up
+    await job_queue.drain()
+    calls_before, busy_before = ctx.fake.calls, ctx.fake.busy_seconds
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    # Deferred side effects still count towards the scenario's calls, not its latency
+    await job_queue.drain()
+    latencies = latencies[1:]
+    latencies.sort()
+
+    return {
+        "route": scenario.name,
+        "requests": requests,
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "calls_per_request": (ctx.fake.calls - calls_before) / requests,
+        "fake_ms_per_request": (ctx.fake.busy_seconds - busy_before) / requests * 1000,
+        "errors": errors,
+    }
+
+async def run_scale(name: str, args) -> List[Dict[str, Any]]:
+    fake = FakeSupabase(latency_ms=args.latency_ms, auth_latency_ms=args.auth_latency_ms)
+    ctx = seed(fake, SCALES[name], random.Random(args.seed))
+    client_wrapper = InstrumentedClient(fake)
+    app.dependency_overrides[get_supabase_client] = lambda: client_wrapper
+    app.dependency_overrides[get_auth_client] = lambda: client_wrapper
+    job_queue.client_factory = lambda: client_wrapper
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for scenario in SCENARIOS:
+            if args.only and not any(part in scenario.name for part in args.only):
+                continue
+            result = await run_scenario(client, ctx, scenario, args.requests, args.concurrency)
+            result["scale"] = name
+            results.append(result)
+            print(
+                f"{name:<7} {result['route']:<38} {result['rps']:>8.1f} {result['p50_ms']:>8.1f} "
+                f"{result['p99_ms']:>8.1f} {result['calls_per_request']:>6.1f} {result['fake_ms_per_request']:>8.2f}"
+                + (f"  UNEXPECTED {result['errors'][0]}" if result["errors"] else "")
+            )
+    app.dependency_overrides.clear()
+    job_queue.client_factory = get_supabase_client
+    return results
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> int:
+    with open(baseline_path) as f:
+        baseline = {(r["scale"], r["route"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        before = baseline.get((result["scale"], result["route"]))
+        if before is None:
+            continue
+        if result["calls_per_request"] > before["calls_per_request"] + 0.01:
+            regressions.append(f"{result['scale']} {result['route']}: upstream calls "
+                               f"{before['calls_per_request']:.1f} -> {result['calls_per_request']:.1f}")
+        if result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{result['scale']} {result['route']}: p50 "
+                               f"{before['p50_ms']:.1f}ms -> {result['p50_ms']:.1f}ms")
+
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--requests", type=int, default=50, help="measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="injected latency per PostgREST call")
+    parser.add_argument("--auth-latency-ms", type=float, default=None, help="per auth call (defaults to --latency-ms)")
+    parser.add_argument("--only", nargs="+", help="run routes whose name contains any of these")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown (fraction)")
+    parser.add_argument("--check-budgets", action="store_true", help="fail requests that exceed their query budget")
+    args = parser.parse_args()
+
+    if args.check_budgets:
+        get_settings().QUERY_BUDGET_STRICT = True
+
+    print(f"{'scale':<7} {'route':<38} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'calls':>6} {'fake ms':>8}")
+    results = []
+    for name in args.scales:
+        results += asyncio.run(run_scale(name, args))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"latency_ms": args.latency_ms, "concurrency": args.concurrency, "results": results}, f, indent=2)
+
+    exit_code = 0
+    if args.compare:
+        exit_code = compare(results, args.compare, args.tolerance)
+    if any(result["errors"] for result in results):
+        exit_code = exit_code or 2
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,577 @@
+"""
+In-process stand-in for the supabase client, for benchmarks.
+
+Implements the subset of the PostgREST query builder and Auth API the routes
+use: filters (including `or_` strings), ordering, limits, embedded
+`table(columns)` selects, insert/update/upsert/delete, rpc and the auth
+calls. Every upstream call sleeps for the configured latency, so the time
+a route spends waiting on Supabase is modelled instead of hidden.
+
+Queries are evaluated by scanning Python lists. `busy_seconds` accumulates
+that CPU time so it can be separated from the app's own cost.
+"""
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Composite primary keys; every other table is keyed by "id"
+PRIMARY_KEYS: Dict[str, Tuple[str, ...]] = {
+    "team_members": ("team_id", "user_id"),
+    "document_chunks": ("document_id", "chunk_index"),
+    "document_collaborators": ("document_id", "user_id"),
+    "document_shares": ("document_id", "user_id"),
+}
+
+# Embeds without a `!constraint` hint: (table, embedded table) -> foreign key column
+FOREIGN_KEYS: Dict[Tuple[str, str], str] = {
+    ("team_members", "profiles"): "user_id",
+    ("activities", "profiles"): "user_id",
+    ("tasks", "projects"): "project_id",
+}
+
+_FILTER = re.compile(r"^([\w.]+)\.(not\.)?(eq|neq|gt|gte|lt|lte|in|like|ilike|is)\.(.*)$", re.S)
+_EMBED = re.compile(r"^(\w+)(?:!(\w+))?\((.*)\)$", re.S)
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses or double-quoted values"""
+    parts, depth, current = [], 0, []
+    quoted = escaped = False
+    for char in text:
+        if quoted:
+            quoted = escaped or char != '"'
+            escaped = not escaped and char == "\\"
+        elif char == '"':
+            quoted = True
+        elif char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        else:
+            depth += char == "("
+            depth -= char == ")"
+        current.append(char)
+    if current:
+        parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+def _unquote(raw: str) -> str:
+    """PostgREST double-quoted filter value, with backslash escapes"""
+    if len(raw) >= 2 and raw.startswith('"') and raw.endswith('"'):
+        return re.sub(r"\\(.)", r"\1", raw[1:-1], flags=re.S)
+    return raw
+
+def _like(value: Any, pattern: str, case_insensitive: bool) -> bool:
+    if value is None:
+        return False
+    regex, chars = ["^"], iter(pattern)
+    for char in chars:
+        if char == "\\":
+            regex.append(re.escape(next(chars, "\\")))
+        elif char in "*%":
+            regex.append(".*")
+        elif char == "_":
+            regex.append(".")
+        else:
+            regex.append(re.escape(char))
+    regex.append("$")
+    return re.match("".join(regex), str(value), re.I | re.S if case_insensitive else re.S) is not None
+
+def _compare(op: str, value: Any, target: Any) -> bool:
+    if op == "eq":
+        return value is not None and str(value) == str(target)
+    if op == "neq":
+        return value is None or str(value) != str(target)
+    if op == "is":
+        return value is None if str(target).lower() == "null" else str(value).lower() == str(target).lower()
+    if op == "in":
+        return value is not None and str(value) in {str(t) for t in target}
+    if op in ("like", "ilike"):
+        return _like(value, target, op == "ilike")
+    if value is None:
+        return False
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        target = type(value)(target)
+    else:
+        value, target = str(value), str(target)
+    return {"gt": value > target, "gte": value >= target, "lt": value < target, "lte": value <= target}[op]
+
+def _parse_condition(condition: str) -> Callable[[Dict[str, Any]], bool]:
+    """
+    One `or_` term such as `creator_id.eq.x` or `project_id.in.(a,b)`.
+
+    Terms PostgREST would reject (the subqueries some routes embed) match
+    nothing, so the rest of the `or` still applies.
+    """
+    match = _FILTER.match(condition)
+    if not match:
+        return lambda row: False
+    column, negate, op, raw = match.groups()
+    if op == "in":
+        if not (raw.startswith("(") and raw.endswith(")")) or "select " in raw:
+            return lambda row: False
+        target: Any = [item.strip().strip('"') for item in _split_top_level(raw[1:-1])]
+    else:
+        target = _unquote(raw)
+    if negate:
+        return lambda row: not _compare(op, row.get(column), target)
+    return lambda row: _compare(op, row.get(column), target)
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+class FakeQuery:
+    """Chainable query against one table; evaluated when `execute()` is called"""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._action = "select"
+        self._columns = "*"
+        self._count: Optional[str] = None
+        self._head = False
+        self._values: Any = None
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        # Applied after the plain filters, which are cheap and usually narrow the rows first
+        self._embedded_filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single = False
+
+    # Actions
+    def select(self, columns: str = "*", count: Optional[str] = None, head: Optional[bool] = None, **kwargs) -> "FakeQuery":
+        if self._action == "select":
+            self._columns = columns
+        self._count = count
+        self._head = bool(head)
+        return self
+
+    def insert(self, values: Any, **kwargs) -> "FakeQuery":
+        self._action, self._values = "insert", values
+        return self
+
+    def upsert(self, values: Any, **kwargs) -> "FakeQuery":
+        self._action, self._values = "upsert", values
+        return self
+
+    def update(self, values: Dict[str, Any], **kwargs) -> "FakeQuery":
+        self._action, self._values = "update", values
+        return self
+
+    def delete(self, **kwargs) -> "FakeQuery":
+        self._action = "delete"
+        return self
+
+    # Filters
+    def _add(self, column: str, op: str, target: Any) -> "FakeQuery":
+        if "." in column:
+            # Filter on an embedded table, e.g. `projects.deleted_at`
+            embedded, field = column.split(".", 1)
+            self._embedded_filters.append(lambda row: _compare(
+                op, (self._db._embedded(self._table, embedded, None, row) or {}).get(field), target
+            ))
+            return self
+        self._filters.append(lambda row: _compare(op, row.get(column), target))
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(column, "lte", value)
+
+    def like(self, column: str, pattern: str) -> "FakeQuery":
+        return self._add(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        return self._add(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        return self._add(column, "is", "null" if value is None else value)
+
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        return self._add(column, "in", list(values))
+
+    def or_(self, filters: str, **kwargs) -> "FakeQuery":
+        conditions = [_parse_condition(term) for term in _split_top_level(filters)]
+        self._filters.append(lambda row: any(condition(row) for condition in conditions))
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False, **kwargs) -> "FakeQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs) -> "FakeQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> "FakeQuery":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self) -> "FakeQuery":
+        self._single = True
+        return self
+
+    maybe_single = single
+
+    def execute(self) -> FakeResponse:
+        return self._db._execute(self)
+
+class FakeAuth:
+    """Password auth against an in-memory user list; tokens never expire"""
+
+    def __init__(self, db: "FakeSupabase"):
+        self._db = db
+        self._users: Dict[str, Dict[str, Any]] = {}  # Format: {email: {"user": ..., "password": ...}}
+        self._tokens: Dict[str, SimpleNamespace] = {}
+
+    def add_user(self, user_id: str, email: str, password: str = "password", full_name: str = "") -> str:
+        """Register a user without a simulated round trip; returns an access token"""
+        user = SimpleNamespace(id=user_id, email=email, user_metadata={"full_name": full_name})
+        self._users[email] = {"user": user, "password": password}
+        token = f"token-{user_id}"
+        self._tokens[token] = user
+        return token
+
+    def get_user(self, jwt: Optional[str] = None):
+        self._db._round_trip(self._db.auth_latency)
+        user = self._tokens.get(jwt)
+        if user is None:
+            raise ValueError("Invalid JWT")
+        return SimpleNamespace(user=user)
+
+    def sign_up(self, credentials: Dict[str, Any]):
+        self._db._round_trip(self._db.auth_latency)
+        email = credentials["email"]
+        if email in self._users:
+            raise ValueError("User already registered")
+        user_id = str(uuid.uuid4())
+        self.add_user(user_id, email, credentials["password"], credentials.get("data", {}).get("full_name", ""))
+        return SimpleNamespace(user=self._users[email]["user"], session=None)
+
+    def sign_in_with_password(self, credentials: Dict[str, Any]):
+        self._db._round_trip(self._db.auth_latency)
+        entry = self._users.get(credentials["email"])
+        if entry is None or entry["password"] != credentials["password"]:
+            raise ValueError("Invalid login credentials")
+        user = entry["user"]
+        return SimpleNamespace(user=user, session=SimpleNamespace(access_token=f"token-{user.id}"))
+
+    def sign_out(self):
+        self._db._round_trip(self._db.auth_latency)
+
+class FakeSupabase:
+    """
+    Fake supabase client.
+
+    `latency_ms` is slept on every table or rpc call and `auth_latency_ms` on
+    every auth call. Like the real client, the sleep blocks the calling
+    thread. `calls` counts upstream round trips.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, auth_latency_ms: Optional[float] = None):
+        self.latency = latency_ms / 1000
+        self.auth_latency = (latency_ms if auth_latency_ms is None else auth_latency_ms) / 1000
+        self.tables: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.functions: Dict[str, Callable[["FakeSupabase", Dict[str, Any]], Any]] = {
+            "search_workspace": search_workspace,
+            "update_task_checked": update_task_checked,
+            "delete_task_checked": delete_task_checked,
+            "delete_project_checked": delete_project_checked,
+            "delete_team_checked": delete_team_checked,
+            "purge_deleted_projects": purge_deleted_projects,
+        }
+        self.auth = FakeAuth(self)
+        self.calls = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def table(self, table_name: str) -> FakeQuery:
+        return FakeQuery(self, table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        db = self
+
+        class _Call:
+            def execute(self) -> FakeResponse:
+                db._round_trip(db.latency)
+                started = time.perf_counter()
+                with db._lock:
+                    data = db.functions[fn](db, params or {})
+                db.busy_seconds += time.perf_counter() - started
+                return FakeResponse(data)
+
+        return _Call()
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]):
+        """Load rows directly, without a round trip or defaults"""
+        self.tables[table].extend(rows)
+
+    def _round_trip(self, latency: float):
+        with self._lock:
+            self.calls += 1
+        if latency:
+            time.sleep(latency)
+
+    def _key(self, table: str, row: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(row.get(column) for column in PRIMARY_KEYS.get(table, ("id",)))
+
+    def _with_defaults(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(row)
+        if PRIMARY_KEYS.get(table, ("id",)) == ("id",):
+            row.setdefault("id", str(uuid.uuid4()))
+        now = _now()
+        row.setdefault("created_at", now)
+        row.setdefault("updated_at", now)
+        return row
+
+    def _execute(self, query: FakeQuery) -> FakeResponse:
+        self._round_trip(self.latency)
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                return self._evaluate(query)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+    def _evaluate(self, query: FakeQuery) -> FakeResponse:
+        table = query._table
+        rows = self.tables[table]
+        values = query._values
+
+        if query._action in ("insert", "upsert"):
+            new_rows = [self._with_defaults(table, row) for row in (values if isinstance(values, list) else [values])]
+            if query._action == "upsert":
+                index = {self._key(table, row): i for i, row in enumerate(rows)}
+                for row in new_rows:
+                    position = index.get(self._key(table, row))
+                    if position is None:
+                        rows.append(row)
+                    else:
+                        rows[position] = {**rows[position], **row}
+            else:
+                rows.extend(new_rows)
+            return FakeResponse([dict(row) for row in new_rows])
+
+        matched = [row for row in rows if all(f(row) for f in query._filters)]
+        matched = [row for row in matched if all(f(row) for f in query._embedded_filters)]
+        # `table!inner(...)` embeds drop rows without a match
+        for column in _split_top_level(query._columns):
+            embed = _EMBED.match(column)
+            if embed and embed.group(2) == "inner":
+                matched = [row for row in matched if self._embedded(table, embed.group(1), None, row)]
+
+        if query._action == "update":
+            for row in matched:
+                row.update(values)
+                row["updated_at"] = _now()
+            return FakeResponse([dict(row) for row in matched])
+
+        if query._action == "delete":
+            removed = {id(row) for row in matched}
+            self.tables[table] = [row for row in rows if id(row) not in removed]
+            return FakeResponse([dict(row) for row in matched])
+
+        for column, desc in reversed(query._order):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        total = len(matched)
+        end = None if query._limit is None else query._offset + query._limit
+        matched = [] if query._head else matched[query._offset:end]
+        data = [self._project(table, row, query._columns) for row in matched]
+
+        if query._single:
+            return FakeResponse(data[0] if data else None, total if query._count else None)
+        return FakeResponse(data, total if query._count else None)
+
+    def _project(self, table: str, row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        for column in _split_top_level(columns):
+            embed = _EMBED.match(column)
+            if embed:
+                name, hint, embedded_columns = embed.groups()
+                target = self._embedded(table, name, hint, row)
+                result[name] = self._project(name, target, embedded_columns) if target else None
+            elif column == "*":
+                result.update(row)
+            else:
+                result[column] = row.get(column)
+        return result
+
+    def _embedded(self, table: str, embedded: str, hint: Optional[str], row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        fk = self._foreign_key(table, embedded, hint)
+        return next((r for r in self.tables[embedded] if r.get("id") == row.get(fk)), None)
+
+    def _foreign_key(self, table: str, embedded: str, hint: Optional[str]) -> str:
+        if hint and hint.startswith(f"{table}_") and hint.endswith("_fkey"):
+            return hint[len(table) + 1:-len("_fkey")]
+        return FOREIGN_KEYS.get((table, embedded), f"{embedded.rstrip('s')}_id")
+
+def search_workspace(db: FakeSupabase, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Substring match standing in for the full-text `search_workspace` function (migrations 003, 006, 008)"""
+    term = params["p_query"].lower()
+    user_id = params["p_user_id"]
+    project_ids = set(params.get("p_project_ids") or [])
+    team_ids = set(params.get("p_team_ids") or [])
+    types = set(params.get("p_types") or ["task", "project", "document"])
+
+    results = []
+    if "task" in types:
+        for task in _active_tasks(db):
+            if task.get("project_id") in project_ids or user_id in (task.get("creator_id"), task.get("assignee_id")):
+                text = f"{task.get('title', '')} {task.get('description') or ''}"
+                if term in text.lower():
+                    results.append(("task", task["id"], task["title"], text, task.get("project_id")))
+    if "project" in types:
+        for project in db.tables["projects"]:
+            if project["id"] in project_ids:
+                text = f"{project.get('name', '')} {project.get('description') or ''}"
+                if term in text.lower():
+                    results.append(("project", project["id"], project["name"], text, project["id"]))
+    if "document" in types:
+        # Chunked bodies are searched through their chunks, others through documents.content
+        bodies: Dict[str, List[Tuple[int, str]]] = {}
+        for chunk in db.tables["document_chunks"]:
+            bodies.setdefault(chunk["document_id"], []).append((chunk["chunk_index"], chunk["content"]))
+        for document in db.tables["documents"]:
+            if (
+                document.get("owner_id") == user_id
+                or document.get("project_id") in project_ids
+                or document.get("team_id") in team_ids
+            ):
+                chunks = bodies.get(document["id"])
+                body = "".join(content for _, content in sorted(chunks)) if chunks else document.get("content") or ""
+                text = f"{document.get('title', '')} {body}"
+                if term in text.lower():
+                    results.append(("document", document["id"], document["title"], text, document.get("project_id")))
+
+    offset, limit = params.get("p_offset", 0), params.get("p_limit", 20)
+    return [
+        {
+            "type": kind,
+            "id": row_id,
+            "title": title,
+            "highlight": text[:120],
+            "project_id": project_id,
+            "rank": 1.0,
+            "total_count": len(results),
+        }
+        for kind, row_id, title, text, project_id in results[offset:offset + limit]
+    ]
+
+def _find(rows: List[Dict[str, Any]], row_id: str) -> Optional[Dict[str, Any]]:
+    return next((row for row in rows if row["id"] == row_id), None)
+
+def _active_tasks(db: FakeSupabase) -> List[Dict[str, Any]]:
+    live_project_ids = {p["id"] for p in db.tables["projects"] if not p.get("deleted_at")}
+    return [task for task in db.tables["tasks"] if task.get("project_id") in live_project_ids]
+
+def update_task_checked(db: FakeSupabase, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Checked task update (migrations 005, 006)"""
+    task = _find(_active_tasks(db), params["p_task_id"])
+    if task is None:
+        return {"outcome": "not_found"}
+    user_id = params["p_user_id"]
+    project = _find(db.tables["projects"], task["project_id"]) or {}
+    if user_id not in (task.get("creator_id"), task.get("assignee_id"), project.get("owner_id")):
+        return {"outcome": "forbidden"}
+
+    previous_status = task.get("status")
+    task.update(params["p_changes"])
+    return {
+        "outcome": "updated",
+        "task": dict(task),
+        "previous_status": previous_status,
+        "project_name": project.get("name"),
+        "public_id": project.get("public_id"),
+    }
+
+def delete_task_checked(db: FakeSupabase, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Checked task delete (migrations 005, 006)"""
+    task = _find(_active_tasks(db), params["p_task_id"])
+    if task is None:
+        return {"outcome": "not_found"}
+    project = _find(db.tables["projects"], task["project_id"]) or {}
+    if params["p_user_id"] not in (task.get("creator_id"), project.get("owner_id")):
+        return {"outcome": "forbidden"}
+
+    db.tables["tasks"].remove(task)
+    return {"outcome": "deleted", "project_id": task["project_id"], "public_id": project.get("public_id")}
+
+def delete_project_checked(db: FakeSupabase, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Checked project delete, soft above the task threshold (migration 006)"""
+    project_id = params["p_project_id"]
+    project = _find(db.tables["projects"], project_id)
+    if project is None or project.get("deleted_at"):
+        return {"outcome": "not_found"}
+    if project.get("owner_id") != params["p_user_id"]:
+        return {"outcome": "forbidden"}
+
+    task_ids = [task["id"] for task in db.tables["tasks"] if task.get("project_id") == project_id]
+    if len(task_ids) > params.get("p_soft_delete_threshold", 1000):
+        project["deleted_at"] = _now()
+        return {"outcome": "deleted", "soft": True, "task_ids": [], "public_id": project.get("public_id")}
+
+    db.tables["tasks"] = [task for task in db.tables["tasks"] if task.get("project_id") != project_id]
+    db.tables["projects"].remove(project)
+    return {"outcome": "deleted", "soft": False, "task_ids": task_ids, "public_id": project.get("public_id")}
+
+def purge_deleted_projects(db: FakeSupabase, params: Dict[str, Any]) -> Dict[str, Any]:
+    """One bounded purge step (migration 006)"""
+    pending = sorted((p for p in db.tables["projects"] if p.get("deleted_at")), key=lambda p: p["deleted_at"])
+    if not pending:
+        return {"project_id": None, "task_ids": [], "project_deleted": False}
+
+    project = pending[0]
+    batch_size = params.get("p_batch_size", 1000)
+    task_ids = [task["id"] for task in db.tables["tasks"] if task.get("project_id") == project["id"]][:batch_size]
+    removed = set(task_ids)
+    db.tables["tasks"] = [task for task in db.tables["tasks"] if task["id"] not in removed]
+    project_deleted = len(task_ids) < batch_size
+    if project_deleted:
+        db.tables["projects"].remove(project)
+    return {"project_id": project["id"], "task_ids": task_ids, "project_deleted": project_deleted}
+
+def delete_team_checked(db: FakeSupabase, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Checked team delete, detaching its projects (migration 005)"""
+    team_id = params["p_team_id"]
+    team = _find(db.tables["teams"], team_id)
+    if team is None:
+        return {"outcome": "not_found"}
+    if team.get("owner_id") != params["p_user_id"]:
+        return {"outcome": "forbidden"}
+
+    project_ids = []
+    for project in db.tables["projects"]:
+        if project.get("team_id") == team_id:
+            project["team_id"] = None
+            project_ids.append(project["id"])
+    member_ids = [member["user_id"] for member in db.tables["team_members"] if member.get("team_id") == team_id]
+    db.tables["team_members"] = [member for member in db.tables["team_members"] if member.get("team_id") != team_id]
+    db.tables["teams"].remove(team)
+    return {"outcome": "deleted", "project_ids": project_ids, "member_ids": member_ids}
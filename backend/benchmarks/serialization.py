@@ -0,0 +1,90 @@
+"""
+Per-row cost of serializing task lists.
+
+Compares the default FastAPI response_model path (validate, jsonable_encoder,
+json.dumps) against the prebuilt TypeAdapter path and trusted passthrough
+used by the list routes.
+
+    cd backend && python -m benchmarks.serialization --rows 100 1000 10000
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.responses import dumps, orjson
+from app.models.task import TaskResponse
+
+STATUSES = ["backlog", "todo", "in_progress", "review", "done"]
+PRIORITIES = ["low", "medium", "high", "urgent"]
+
+def make_rows(count: int) -> List[dict]:
+    """Rows shaped like PostgREST's `select("*")` on tasks"""
+    now = datetime.now(timezone.utc)
+    project_id = str(uuid.uuid4())
+    user_id = str(uuid.uuid4())
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": f"Task {i}",
+            "description": "Synthetic task description " * 4,
+            "status": STATUSES[i % len(STATUSES)],
+            "priority": PRIORITIES[i % len(PRIORITIES)],
+            "due_date": (now + timedelta(days=i % 30)).isoformat() if i % 3 else None,
+            "project_id": project_id,
+            "creator_id": user_id,
+            "assignee_id": user_id if i % 2 else None,
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+        }
+        for i in range(count)
+    ]
+
+def fastapi_default(rows: List[dict]) -> bytes:
+    # What response_model=List[TaskResponse] + JSONResponse amounts to per request
+    adapter = TypeAdapter(List[TaskResponse])
+    content = jsonable_encoder(adapter.validate_python(rows))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+_prebuilt = TypeAdapter(List[TaskResponse])
+
+def prebuilt_adapter(rows: List[dict]) -> bytes:
+    return _prebuilt.dump_json(_prebuilt.validate_python(rows))
+
+def trusted(rows: List[dict]) -> bytes:
+    return dumps(rows)
+
+def measure(fn: Callable[[List[dict]], bytes], rows: List[dict], repeat: int) -> float:
+    fn(rows)  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'rows':>8} {'path':<20} {'total ms':>10} {'us/row':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        for name, fn in (
+            ("fastapi default", fastapi_default),
+            ("prebuilt adapter", prebuilt_adapter),
+            ("trusted passthrough", trusted),
+        ):
+            elapsed = measure(fn, rows, args.repeat)
+            print(f"{count:>8} {name:<20} {elapsed * 1000:>10.2f} {elapsed / count * 1e6:>8.2f}")
+
+if __name__ == "__main__":
+    main()
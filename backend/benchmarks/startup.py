@@ -0,0 +1,166 @@
+"""
+Cold start cost of the API process.
+
+`imports` re-imports app.main in fresh interpreters, reports the slowest
+modules and fails (exit 1) when the median exceeds the budget or a module
+that should be deferred was imported:
+
+    cd backend && python -m benchmarks.startup imports
+
+`serve` launches uvicorn and reports the time from process launch to the
+first served /health and, given a token, the first authenticated request
+(which is when the Supabase client is built):
+
+    cd backend && python -m benchmarks.startup serve --token "$TOKEN"
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+# Only needed once a request touches the database or auth
+DEFERRED_MODULES = ["supabase", "gotrue", "postgrest", "storage3", "realtime"]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Settings only need to parse; nothing is contacted at import time
+    env.setdefault("SUPABASE_URL", "http://localhost:54321")
+    env.setdefault("SUPABASE_KEY", "benchmark")
+    return env
+
+def measure_imports() -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """Import app.main once in a fresh interpreter: (total ms, top-level modules by ms, deferred modules loaded)"""
+    check = f"import sys, app.main; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        capture_output=True,
+        text=True,
+        env=_env(),
+        check=True
+    )
+
+    total = 0.0
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = len(match.group(3)) // 2
+        if match.group(4) == "app.main":
+            total = cumulative_ms
+        elif depth <= 2:
+            modules.append((cumulative_ms, match.group(4)))
+
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return total, sorted(modules, reverse=True), loaded
+
+def run_imports(args) -> int:
+    totals = []
+    modules: List[Tuple[float, str]] = []
+    loaded: List[str] = []
+    for _ in range(args.repeat):
+        total, modules, loaded = measure_imports()
+        totals.append(total)
+
+    median = statistics.median(totals)
+    print(f"import app.main: median {median:.0f}ms, min {min(totals):.0f}ms over {args.repeat} runs")
+    print(f"{'ms':>8}  module")
+    for ms, name in modules[:args.top]:
+        print(f"{ms:>8.1f}  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: imported at startup but should be deferred: {', '.join(loaded)}")
+        failed = True
+    if args.budget_ms and median > args.budget_ms:
+        print(f"FAIL: median {median:.0f}ms exceeds budget of {args.budget_ms:.0f}ms")
+        failed = True
+    return 1 if failed else 0
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _get(url: str, token: Optional[str] = None) -> Optional[int]:
+    request = urllib.request.Request(url)
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError):
+        return None
+
+def run_serve(args) -> int:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env()
+    )
+    try:
+        status = None
+        while status != 200:
+            if process.poll() is not None:
+                print("FAIL: server exited before serving /health")
+                return 1
+            if time.perf_counter() - started > args.timeout:
+                print(f"FAIL: /health not served within {args.timeout:.0f}s")
+                return 1
+            status = _get(f"{base}/health")
+            if status != 200:
+                time.sleep(0.005)
+        print(f"first /health:          {(time.perf_counter() - started) * 1000:>8.0f}ms after launch")
+
+        if not args.token:
+            print("first authenticated:    skipped (pass --token against a real Supabase project)")
+            return 0
+
+        request_started = time.perf_counter()
+        status = _get(f"{base}{args.auth_path}", args.token)
+        now = time.perf_counter()
+        print(f"first authenticated:    {(now - started) * 1000:>8.0f}ms after launch "
+              f"({(now - request_started) * 1000:.0f}ms for the request, status {status})")
+
+        request_started = time.perf_counter()
+        status = _get(f"{base}{args.auth_path}", args.token)
+        print(f"second authenticated:   {(time.perf_counter() - request_started) * 1000:>8.0f}ms (status {status})")
+        return 0
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports = commands.add_parser("imports", help="import-time budget check")
+    imports.add_argument("--repeat", type=int, default=5)
+    imports.add_argument("--top", type=int, default=15)
+    imports.add_argument("--budget-ms", type=float, default=600, help="fail above this median (0 disables)")
+
+    serve = commands.add_parser("serve", help="time to first served requests")
+    serve.add_argument("--token", help="access token for the authenticated request")
+    serve.add_argument("--auth-path", default="/api/v1/projects/")
+    serve.add_argument("--timeout", type=float, default=30.0)
+
+    args = parser.parse_args()
+    sys.exit(run_imports(args) if args.command == "imports" else run_serve(args))
+
+if __name__ == "__main__":
+    main()
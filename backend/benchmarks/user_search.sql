@@ -0,0 +1,62 @@
+-- User search benchmark over a large synthetic profiles table.
+--
+-- Run against a scratch database (never production):
+--     psql "$DATABASE_URL" -v rows=1000000 -f backend/benchmarks/user_search.sql
+--
+-- It builds bench.profiles with the same shape as public.profiles, times the
+-- GET /users/search query without indexes, then again with the trigram indexes
+-- from app/db/migrations/004_profiles_trigram_search.sql.
+
+\if :{?rows}
+\else
+\set rows 1000000
+\endif
+
+create extension if not exists pg_trgm;
+drop schema if exists bench cascade;
+create schema bench;
+
+create table bench.profiles (
+    id uuid primary key default gen_random_uuid(),
+    email text not null,
+    full_name text not null,
+    created_at timestamptz not null default now()
+);
+
+insert into bench.profiles (email, full_name)
+select
+    'user' || g || '.' || substr(md5(g::text), 1, 6) || '@example' || (g % 97) || '.com',
+    initcap(substr(md5((g * 7)::text), 1, 7)) || ' ' || initcap(substr(md5((g * 13)::text), 1, 9))
+from generate_series(1, :rows) as g;
+
+analyze bench.profiles;
+
+\timing on
+\echo '--- without trigram indexes ---'
+explain (analyze, buffers)
+select * from bench.profiles
+where email ilike '%user4242%' or full_name ilike '%user4242%'
+limit 10;
+
+explain (analyze, buffers)
+select * from bench.profiles
+where email ilike '%abc%' or full_name ilike '%abc%'
+limit 10;
+
+create index profiles_email_trgm_idx on bench.profiles using gin (email gin_trgm_ops);
+create index profiles_full_name_trgm_idx on bench.profiles using gin (full_name gin_trgm_ops);
+analyze bench.profiles;
+
+\echo '--- with trigram indexes ---'
+explain (analyze, buffers)
+select * from bench.profiles
+where email ilike '%user4242%' or full_name ilike '%user4242%'
+limit 10;
+
+explain (analyze, buffers)
+select * from bench.profiles
+where email ilike '%abc%' or full_name ilike '%abc%'
+limit 10;
+\timing off
+
+drop schema bench cascade;
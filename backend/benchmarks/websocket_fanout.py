@@ -0,0 +1,264 @@
+"""
+WebSocket fan-out load test for core.websocket.ConnectionManager.
+
+Starts a uvicorn server in a subprocess. The server exposes chat and
+document rooms backed by the shared ConnectionManager. The benchmark then
+opens many local clients spread across the rooms. One client per room
+publishes at a fixed rate, and the server relays each message with
+broadcast_to_chat / broadcast_to_document. A share of clients read slowly,
+so their socket buffers fill and sends to them back up.
+
+Reports:
+- delivery latency percentiles for normal and slow readers
+- delivered messages per second and how many were lost
+- server time per broadcast call
+- server memory per open connection
+- how many connections the manager evicted
+
+    cd backend && python -m benchmarks.websocket_fanout --clients 2000 --rooms 100 --slow-fraction 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+def _rss_kb() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None  # Not Linux; memory per connection is not reported
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def build_server_app():
+    """Benchmark-only app exposing the shared ConnectionManager over real sockets"""
+    from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+    from app.core.websocket import manager
+
+    server = FastAPI()
+    broadcast_seconds: List[float] = []
+    connected = {"total": 0}
+
+    @server.websocket("/ws/{kind}/{room_id}/{user_id}")
+    async def room(websocket: WebSocket, kind: str, room_id: str, user_id: str):
+        await manager.connect(websocket, room_id, user_id)
+        connected["total"] += 1
+        broadcast = manager.broadcast_to_chat if kind == "chat" else manager.broadcast_to_document
+        try:
+            while True:
+                message = await websocket.receive_json()
+                started = time.perf_counter()
+                await broadcast(room_id, message, exclude_user=user_id)
+                broadcast_seconds.append(time.perf_counter() - started)
+        except WebSocketDisconnect:
+            manager.disconnect(websocket, room_id, user_id)
+
+    @server.get("/stats")
+    async def stats():
+        return {
+            "rss_kb": _rss_kb(),
+            "rooms": len(manager.active_connections),
+            "connections": sum(len(members) for members in manager.active_connections.values()),
+            "connected_total": connected["total"],
+            "broadcasts": len(broadcast_seconds),
+            "broadcast_p50_ms": _percentile(broadcast_seconds, 0.5) * 1000,
+            "broadcast_p99_ms": _percentile(broadcast_seconds, 0.99) * 1000,
+            "broadcast_max_ms": max(broadcast_seconds, default=0.0) * 1000,
+        }
+
+    return server
+
+def serve(port: int):
+    import uvicorn
+
+    uvicorn.run(build_server_app(), host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+@dataclass
+class ClientStats:
+    latencies: Dict[bool, List[float]] = field(default_factory=lambda: {False: [], True: []})
+    received: int = 0
+    sent: int = 0
+    expected: int = 0
+    connect_failures: int = 0
+    closed_by_server: int = 0
+
+def _get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return json.loads(response.read())
+
+def _raise_fd_limit(needed: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = min(hard, max(soft, needed))
+    if target > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    if target < needed:
+        print(f"warning: open file limit {target} is below the {needed} sockets needed")
+
+async def run(args) -> int:
+    from websockets.asyncio.client import connect
+    from websockets.exceptions import ConnectionClosed
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    # Each client needs a socket on both ends
+    _raise_fd_limit(args.clients * 2 + 256)
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.websocket_fanout", "serve", "--port", str(port)])
+    base = f"127.0.0.1:{port}"
+    try:
+        for _ in range(600):
+            try:
+                idle = _get_json(f"http://{base}/stats")
+                break
+            except OSError:
+                await asyncio.sleep(0.05)
+        else:
+            print("FAIL: server did not start")
+            return 1
+
+        rng = random.Random(args.seed)
+        rooms = [("chat" if i % 2 == 0 else "document", f"room-{i}") for i in range(args.rooms)]
+        members: Dict[str, int] = {room_id: 0 for _, room_id in rooms}
+        stats = ClientStats()
+        padding = "x" * args.message_bytes
+        connect_gate = asyncio.Semaphore(200)
+        all_connected = asyncio.Event()
+        publishing_done = asyncio.Event()
+        connected_count = 0
+
+        async def client(index: int):
+            nonlocal connected_count
+            kind, room_id = rooms[index % len(rooms)]
+            publisher = index < len(rooms)
+            slow = not publisher and rng.random() < args.slow_fraction
+            url = f"ws://{base}/ws/{kind}/{room_id}/user-{index}"
+            try:
+                async with connect_gate:
+                    # A slow reader only buffers a couple of frames, then stops reading the socket
+                    websocket = await connect(url, max_queue=2 if slow else 64, open_timeout=60)
+            except Exception:
+                stats.connect_failures += 1
+                connected_count += 1
+                if connected_count == args.clients:
+                    all_connected.set()
+                return
+
+            members[room_id] += 1
+            connected_count += 1
+            if connected_count == args.clients:
+                all_connected.set()
+
+            try:
+                await all_connected.wait()
+                if publisher:
+                    interval = 1.0 / args.rate
+                    deadline = time.monotonic() + args.duration
+                    seq = 0
+                    while time.monotonic() < deadline:
+                        await websocket.send(json.dumps({"seq": seq, "sent": time.time(), "pad": padding}))
+                        stats.sent += 1
+                        stats.expected += members[room_id] - 1
+                        seq += 1
+                        await asyncio.sleep(interval)
+                    await publishing_done.wait()
+                else:
+                    while True:
+                        message = await websocket.recv()
+                        stats.latencies[slow].append(time.time() - json.loads(message)["sent"])
+                        stats.received += 1
+                        if slow:
+                            await asyncio.sleep(args.slow_delay_ms / 1000)
+            except ConnectionClosed:
+                if not publishing_done.is_set():
+                    stats.closed_by_server += 1
+            finally:
+                await websocket.close()
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(client(i)) for i in range(args.clients)]
+        await all_connected.wait()
+        connect_seconds = time.perf_counter() - started
+        loaded = _get_json(f"http://{base}/stats")
+
+        publish_started = time.perf_counter()
+        await asyncio.sleep(args.duration + args.drain)
+        elapsed = time.perf_counter() - publish_started
+        final = _get_json(f"http://{base}/stats")
+        publishing_done.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        open_connections = args.clients - stats.connect_failures
+        print(f"clients {args.clients} in {args.rooms} rooms, {args.slow_fraction:.0%} slow readers "
+              f"({args.slow_delay_ms:.0f}ms per message), {args.rate:g} msg/s per room for {args.duration:g}s")
+        print(f"connect:           {open_connections} open in {connect_seconds:.1f}s, {stats.connect_failures} failed")
+        if idle["rss_kb"] and loaded["rss_kb"] and open_connections:
+            print(f"memory:            {(loaded['rss_kb'] - idle['rss_kb']) / open_connections:.1f} KiB RSS per connection")
+        print(f"published:         {stats.sent} messages, {stats.expected} deliveries expected")
+        print(f"delivered:         {stats.received} ({stats.received / max(stats.expected, 1):.1%}), "
+              f"{stats.received / elapsed:.0f} msg/s")
+        for slow, label in ((False, "normal readers"), (True, "slow readers")):
+            latencies = stats.latencies[slow]
+            if latencies:
+                print(f"latency {label + ':':<15} p50 {statistics.median(latencies) * 1000:.1f}ms  "
+                      f"p90 {_percentile(latencies, 0.9) * 1000:.1f}ms  p99 {_percentile(latencies, 0.99) * 1000:.1f}ms  "
+                      f"max {max(latencies) * 1000:.1f}ms")
+        print(f"broadcast call:    p50 {final['broadcast_p50_ms']:.2f}ms  p99 {final['broadcast_p99_ms']:.2f}ms  "
+              f"max {final['broadcast_max_ms']:.2f}ms over {final['broadcasts']} broadcasts")
+        print(f"evictions:         {open_connections - final['connections']} removed by the manager, "
+              f"{stats.closed_by_server} closed by the server")
+        return 0
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command")
+
+    server = commands.add_parser("serve", help=argparse.SUPPRESS)
+    server.add_argument("--port", type=int, required=True)
+
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--rooms", type=int, default=100, help="half chat rooms, half document rooms")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-delay-ms", type=float, default=250.0, help="pause after each message a slow reader takes")
+    parser.add_argument("--rate", type=float, default=5.0, help="messages per second published in each room")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--drain", type=float, default=2.0, help="seconds to wait for deliveries after publishing stops")
+    parser.add_argument("--message-bytes", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.port)
+    else:
+        sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
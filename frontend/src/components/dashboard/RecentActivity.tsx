@@ -90,8 +90,12 @@ const getActivityText = (activity: Activity): string => {
   }
 };
 
-export const RecentActivity: React.FC = () => {
-  const { data: activities, isLoading, error } = useActivities(8);
+interface RecentActivityProps {
+  limit?: number;
+}
+
+export const RecentActivity: React.FC<RecentActivityProps> = ({ limit = 8 }) => {
+  const { data: activities, isLoading, error } = useActivities(limit);
 
   return (
     <div className="bg-white dark:bg-gray-800 shadow-sm rounded-lg border border-gray-200 dark:border-gray-700">
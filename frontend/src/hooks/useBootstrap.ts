@@ -0,0 +1,21 @@
+import { useQuery, useQueryClient } from '@tanstack/react-query';
+import api from '../services/api';
+import { Bootstrap } from '../types';
+
+export const useBootstrap = (activityLimit: number = 10) => {
+  const queryClient = useQueryClient();
+
+  return useQuery<Bootstrap>({
+    queryKey: ['bootstrap', activityLimit],
+    queryFn: async () => {
+      const response = await api.get('/bootstrap/', { params: { activity_limit: activityLimit } });
+      const data: Bootstrap = response.data;
+      // Seed the per-resource queries so widgets mounted below don't refetch them
+      queryClient.setQueryData(['projects'], data.projects);
+      queryClient.setQueryData(['teams'], data.teams);
+      queryClient.setQueryData(['activities', activityLimit], data.activities);
+      return data;
+    },
+    retry: 1,
+  });
+};
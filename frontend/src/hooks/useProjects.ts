@@ -15,6 +15,7 @@ export const useProjects = () => {
     mutationFn: (project: Partial<Project>) => projectService.createProject(project),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['projects'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Project created successfully');
     },
     onError: () => {
@@ -27,6 +28,7 @@ export const useProjects = () => {
       projectService.updateProject(id, project),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['projects'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Project updated successfully');
     },
     onError: () => {
@@ -38,6 +40,7 @@ export const useProjects = () => {
     mutationFn: (id: string) => projectService.deleteProject(id),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['projects'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Project deleted successfully');
     },
     onError: () => {
@@ -42,6 +42,7 @@ export const useTasks = (projectId?: string) => {
     },
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['tasks'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Task created successfully');
     },
     onError: (error: AxiosError<ErrorResponse>) => {
@@ -56,6 +57,7 @@ export const useTasks = (projectId?: string) => {
       taskService.updateTask(id, task),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['tasks'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Task updated successfully');
     },
     onError: (error: AxiosError<ErrorResponse>) => {
@@ -68,6 +70,7 @@ export const useTasks = (projectId?: string) => {
     mutationFn: (id: string) => taskService.deleteTask(id),
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['tasks'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Task deleted successfully');
     },
     onError: (error: AxiosError<ErrorResponse>) => {
@@ -25,6 +25,7 @@ export const useCreateTeam = () => {
     mutationFn: teamService.createTeam,
     onSuccess: (newTeam) => {
       queryClient.invalidateQueries({ queryKey: ['teams'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Team created successfully!');
     },
     onError: (error: any) => {
@@ -42,6 +43,7 @@ export const useUpdateTeam = () => {
       teamService.updateTeam(id, team),
     onSuccess: (updatedTeam) => {
       queryClient.invalidateQueries({ queryKey: ['teams'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       queryClient.invalidateQueries({ queryKey: ['teams', updatedTeam.id] });
       toast.success('Team updated successfully!');
     },
@@ -59,6 +61,7 @@ export const useDeleteTeam = () => {
     mutationFn: teamService.deleteTeam,
     onSuccess: () => {
       queryClient.invalidateQueries({ queryKey: ['teams'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Team deleted successfully!');
     },
     onError: (error: any) => {
@@ -84,6 +87,7 @@ export const useAddTeamMember = () => {
       teamService.addTeamMember(teamId, userId),
     onSuccess: (_, { teamId }) => {
       queryClient.invalidateQueries({ queryKey: ['teams', teamId, 'members'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Team member added successfully!');
     },
     onError: (error: any) => {
@@ -101,6 +105,7 @@ export const useRemoveTeamMember = () => {
       teamService.removeTeamMember(teamId, userId),
     onSuccess: (_, { teamId }) => {
       queryClient.invalidateQueries({ queryKey: ['teams', teamId, 'members'] });
+      queryClient.invalidateQueries({ queryKey: ['bootstrap'] });
       toast.success('Team member removed successfully!');
     },
     onError: (error: any) => {
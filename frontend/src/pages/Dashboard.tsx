@@ -2,16 +2,18 @@ import React from 'react';
 import { FolderOpen, CheckSquare, Users, Clock } from 'lucide-react';
 import { StatsCard } from '../components/dashboard/StatsCard';
 import { RecentActivity } from '../components/dashboard/RecentActivity';
-import { useProjects } from '../hooks/useProjects';
-import { useTasks } from '../hooks/useTasks';
+import { useBootstrap } from '../hooks/useBootstrap';
 import { LoadingSpinner } from '../components/common/LoadingSpinner';
 
+// Shared with RecentActivity so it reads the activities bootstrap seeded
+const RECENT_ACTIVITY_LIMIT = 8;
+
 export const Dashboard: React.FC = () => {
-  const { projects, isLoading: projectsLoading, error: projectsError } = useProjects();
-  const { tasks, isLoading: tasksLoading, error: tasksError } = useTasks();
+  // One request for projects, tasks, teams, activity and the stats below
+  const { data, isLoading, error } = useBootstrap(RECENT_ACTIVITY_LIMIT);
 
   // Show loading state
-  if (projectsLoading || tasksLoading) {
+  if (isLoading) {
     return (
       <div className="flex items-center justify-center h-64">
         <LoadingSpinner size="lg" />
@@ -20,11 +22,11 @@ export const Dashboard: React.FC = () => {
   }
 
   // Show error state
-  if (projectsError || tasksError) {
+  if (error || !data) {
     return (
       <div className="flex flex-col items-center justify-center h-64 text-center">
         <p className="text-error-600 dark:text-error-400 text-lg mb-4">
-          {projectsError ? 'Failed to load projects' : 'Failed to load tasks'}
+          Failed to load dashboard
         </p>
         <p className="text-gray-600 dark:text-gray-400">
           Please try refreshing the page
@@ -33,15 +35,7 @@ export const Dashboard: React.FC = () => {
     );
   }
 
-  // Initialize with empty arrays if data is undefined
-  const projectsList = projects || [];
-  const tasksList = tasks || [];
-
-  const activeProjects = projectsList.filter(p => p.status === 'in_progress').length;
-  const completedTasks = tasksList.filter(t => t.status === 'done').length;
-  const overdueTasks = tasksList.filter(t => 
-    t.due_date && new Date(t.due_date) < new Date() && t.status !== 'done'
-  ).length;
+  const { stats } = data;
 
   return (
     <div className="space-y-8">
@@ -58,25 +52,25 @@ export const Dashboard: React.FC = () => {
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
         <StatsCard
           title="Total Projects"
-          value={projectsList.length}
+          value={stats.total_projects}
           icon={FolderOpen}
           color="blue"
         />
         <StatsCard
           title="Active Projects"
-          value={activeProjects}
+          value={stats.active_projects}
           icon={Clock}
           color="green"
         />
         <StatsCard
           title="Total Tasks"
-          value={tasksList.length}
+          value={stats.total_tasks}
           icon={CheckSquare}
           color="yellow"
         />
         <StatsCard
           title="Overdue Tasks"
-          value={overdueTasks}
+          value={stats.overdue_tasks}
           icon={Clock}
           color="red"
         />
@@ -84,7 +78,7 @@ export const Dashboard: React.FC = () => {
 
       {/* Recent Activity */}
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-8">
-        <RecentActivity />
+        <RecentActivity limit={RECENT_ACTIVITY_LIMIT} />
         
         <div className="bg-white dark:bg-gray-800 shadow-sm rounded-lg border border-gray-200 dark:border-gray-700">
           <div className="px-6 py-4 border-b border-gray-200 dark:border-gray-700">
@@ -88,4 +88,22 @@ export interface Activity {
   created_at: string;
   user_name?: string;
   user_email?: string;
-}
\ No newline at end of file
+}
+export interface TaskSummary {
+  id: string;
+  title: string;
+  status: Task['status'];
+  priority: Task['priority'];
+  project_id: string;
+  assignee_id?: string;
+  due_date?: string;
+  updated_at: string;
+}
+
+export interface Bootstrap {
+  projects: Project[];
+  tasks: TaskSummary[];
+  teams: Team[];
+  activities: Activity[];
+  stats: DashboardStats;
+}